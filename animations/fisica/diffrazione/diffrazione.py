@@ -20,6 +20,7 @@ import numpy as np
 # calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 from animations.vertical_template import VerticalTemplate
+from animations.fourier_module import FourierSynthesis
 
 
 # ============================================================================
@@ -57,12 +58,10 @@ def onda_quadra_parziale(n_armoniche, ampiezza=1.0):
     prime ``n_armoniche`` armoniche dispari si ottiene un'approssimazione che
     migliora all'aumentare dei termini.
     """
+    k = 2 * np.arange(n_armoniche) + 1
+
     def f(x):
-        s = 0.0
-        for i in range(n_armoniche):
-            k = 2 * i + 1
-            s += np.sin(k * x) / k
-        return ampiezza * (4.0 / PI) * s
+        return ampiezza * (4.0 / PI) * np.sum(np.sin(k * x) / k)
     return f
 
 
@@ -461,13 +460,16 @@ class SintesiOndaQuadra(Scene):
         cy = 2.4
         x_rng = [-3.4, 3.4, 0.01]
 
+        # Tutte le armoniche calcolate una volta sola sulla stessa griglia:
+        # ogni somma parziale è poi una riga della somma cumulativa.
+        sintesi = FourierSynthesis.square(x_rng, n_harmonics=60, amplitude=A)
+
         asse = Line([-3.4, cy, 0], [3.4, cy, 0], color=DARK_GRAY, stroke_width=2)
         self.play(Create(asse))
 
         # Bersaglio: l'onda quadra (tratteggiata, fissa)
         bersaglio = DashedVMobject(
-            FunctionGraph(onda_quadra_parziale(60, A), x_range=x_rng,
-                          color=DARK_GRAY, stroke_width=3).move_to(UP * cy),
+            sintesi.graph(60, color=DARK_GRAY, stroke_width=3).move_to(UP * cy),
             num_dashes=120,
         )
         lab_bersaglio = fit(Text("onda quadra (obiettivo)", font_size=22, color=DARK_GRAY))
@@ -489,16 +491,14 @@ class SintesiOndaQuadra(Scene):
         formula.move_to([0, -3.0, 0])
 
         # Prima approssimazione: una sola armonica (la fondamentale)
-        approx = FunctionGraph(onda_quadra_parziale(1, A), x_range=x_rng,
-                               color=RED_D, stroke_width=6).move_to(UP * cy)
+        approx = sintesi.graph(1, color=RED_D, stroke_width=6).move_to(UP * cy)
         self.play(Create(approx), FadeIn(contatore))
         self.play(Write(formula))
         self.wait(0.5)
 
         # Aggiunge armoniche dispari, una alla volta
         for n in (2, 3, 4, 6, 10):
-            nuova = FunctionGraph(onda_quadra_parziale(n, A), x_range=x_rng,
-                                  color=RED_D, stroke_width=6).move_to(UP * cy)
+            nuova = sintesi.graph(n, color=RED_D, stroke_width=6).move_to(UP * cy)
             self.play(
                 Transform(approx, nuova),
                 n_num.animate.set_value(n),
@@ -20,6 +20,7 @@ import numpy as np
 # calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 from animations.vertical_template import VerticalTemplate
+from animations.wave_module import ParticleRow
 
 
 # ============================================================================
@@ -152,14 +153,11 @@ class OndeTrasversaliLongitudinali(VerticalTemplate):
         # --- BLOCCO ALTO: onda trasversale (oscillazione verticale) ---
         cy_top = self.top_block_center
 
-        def trasversale():
-            dots = VGroup()
-            for bx in base_xs:
-                dy = 0.6 * np.sin(k * bx - w * t.get_value())
-                dots.add(Dot([bx, cy_top + dy, 0], radius=0.06, color=RED_D))
-            return dots
-
-        onda_t = always_redraw(trasversale)
+        # Le particelle si spostano in verticale: u(x, t) = 0.6 sin(kx - ωt)
+        onda_t = ParticleRow(
+            base_xs, cy_top, radius=0.06, color=RED_D, tracker=t,
+            displacement=lambda p, tt: UP * 0.6 * np.sin(k * p[:, :1] - w * tt),
+        )
         lab_t = fit(Text("Trasversale", font_size=26, color=RED_D, weight=BOLD))
         lab_t.move_to([0, cy_top + 1.6, 0])
         sub_t = fit(Text("oscillazione perpendicolare", font_size=20, color=DARK_GRAY))
@@ -175,14 +173,11 @@ class OndeTrasversaliLongitudinali(VerticalTemplate):
         # --- BLOCCO BASSO: onda longitudinale (oscillazione orizzontale) ---
         cy_bot = self.bottom_block_center
 
-        def longitudinale():
-            dots = VGroup()
-            for bx in base_xs:
-                dx = 0.32 * np.sin(k * bx - w * t.get_value())
-                dots.add(Dot([bx + dx, cy_bot, 0], radius=0.07, color=DARK_BLUE))
-            return dots
-
-        onda_l = always_redraw(longitudinale)
+        # Stesso campo, ma lo spostamento è lungo la propagazione
+        onda_l = ParticleRow(
+            base_xs, cy_bot, radius=0.07, color=DARK_BLUE, tracker=t,
+            displacement=lambda p, tt: RIGHT * 0.32 * np.sin(k * p[:, :1] - w * tt),
+        )
         lab_l = fit(Text("Longitudinale", font_size=26, color=DARK_BLUE, weight=BOLD))
         lab_l.move_to([0, cy_bot + 1.4, 0])
         sub_l = fit(Text("oscillazione parallela", font_size=20, color=DARK_GRAY))
@@ -0,0 +1,163 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fourier Module - Precomputed Fourier partial sums for Manim animations
+
+This module provides a FourierSynthesis class that samples every harmonic of a
+Fourier series ONCE on a fixed x grid. Any partial sum is then a row of the
+cumulative-sum matrix, so showing "n harmonics" never re-evaluates sin(kx).
+
+Usage:
+    from animations.fourier_module import FourierSynthesis
+
+    sintesi = FourierSynthesis.square(x_range=[-3.4, 3.4, 0.01], n_harmonics=60)
+    target = sintesi.graph(60, color=DARK_GRAY)
+    approx = sintesi.graph(1, color=RED_D)
+    self.play(Transform(approx, sintesi.graph(3, color=RED_D)))
+
+    # Aggiungere un'armonica alla volta: una somma vettoriale per passo
+    for n, y in sintesi.iter_partial_sums():
+        ...
+"""
+
+from manim import *
+import numpy as np
+
+
+def sample_grid(x_range):
+    """
+    Campiona l'intervallo come fa FunctionGraph: ``[x_min, x_max, step]``
+    con l'estremo destro sempre incluso.
+    """
+    x_min, x_max, step = x_range
+    x = np.arange(x_min, x_max, step)
+    if x.size == 0 or x[-1] < x_max:
+        x = np.append(x, x_max)
+    return x
+
+
+class FourierSynthesis:
+    """
+    Serie di Fourier troncata, precalcolata su una griglia fissa.
+
+    La matrice dei termini ``terms[i] = b_i · basis(k_i · x)`` viene calcolata
+    una sola volta; le somme parziali sono la sua somma cumulativa lungo le
+    armoniche, per cui ``partial_sum(n)`` è un semplice slice.
+
+    Parameters:
+    -----------
+    x_range : list
+        Intervallo ``[x_min, x_max, step]`` (stessa convenzione di FunctionGraph)
+    harmonics : array-like
+        Indici k delle armoniche, nell'ordine in cui vengono sommate
+    coefficients : array-like
+        Coefficienti b_k, uno per armonica
+    basis : callable
+        Funzione base vettoriale (default: np.sin)
+    """
+
+    def __init__(self, x_range, harmonics, coefficients, basis=np.sin):
+        self.x = sample_grid(x_range)
+        self.harmonics = np.asarray(harmonics, dtype=float)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        if self.harmonics.shape != self.coefficients.shape:
+            raise ValueError("harmonics e coefficients devono avere la stessa lunghezza")
+
+        # Matrice (n_armoniche × n_punti): ogni riga è un'armonica già pesata
+        self.terms = self.coefficients[:, None] * basis(np.outer(self.harmonics, self.x))
+        # Riga i = somma delle prime i+1 armoniche
+        self._partial_sums = np.cumsum(self.terms, axis=0)
+
+    # ------------------------------------------------------------------
+    # Insiemi di coefficienti notevoli
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def square(cls, x_range, n_harmonics, amplitude=1.0):
+        """Onda quadra: (4A/π) Σ_{k dispari} sin(kx)/k."""
+        k = 2 * np.arange(n_harmonics) + 1
+        return cls(x_range, k, amplitude * 4.0 / PI / k)
+
+    @classmethod
+    def sawtooth(cls, x_range, n_harmonics, amplitude=1.0):
+        """Dente di sega: (2A/π) Σ_k (-1)^(k+1) sin(kx)/k."""
+        k = np.arange(1, n_harmonics + 1)
+        return cls(x_range, k, amplitude * 2.0 / PI * (-1.0) ** (k + 1) / k)
+
+    @classmethod
+    def triangle(cls, x_range, n_harmonics, amplitude=1.0):
+        """Onda triangolare: (8A/π²) Σ_{k dispari} (-1)^((k-1)/2) sin(kx)/k²."""
+        k = 2 * np.arange(n_harmonics) + 1
+        segni = (-1.0) ** ((k - 1) // 2)
+        return cls(x_range, k, amplitude * 8.0 / PI ** 2 * segni / k ** 2)
+
+    # ------------------------------------------------------------------
+    # Somme parziali
+    # ------------------------------------------------------------------
+
+    @property
+    def n_harmonics(self):
+        return len(self.harmonics)
+
+    def partial_sum(self, n):
+        """
+        Somma delle prime ``n`` armoniche sulla griglia (array di y).
+
+        ``n = 0`` restituisce la funzione nulla.
+        """
+        if not 0 <= n <= self.n_harmonics:
+            raise ValueError(
+                f"n deve essere tra 0 e {self.n_harmonics} (armoniche precalcolate)"
+            )
+        if n == 0:
+            return np.zeros_like(self.x)
+        return self._partial_sums[n - 1]
+
+    def iter_partial_sums(self):
+        """
+        Genera ``(n, y)`` per n = 1, 2, ...: ogni passo costa una sola somma
+        vettoriale (la nuova armonica sulla somma precedente).
+        """
+        y = np.zeros_like(self.x)
+        for i, termine in enumerate(self.terms):
+            y = y + termine
+            yield i + 1, y
+
+    def points(self, n):
+        """Punti 3D ``(x, y, 0)`` della somma parziale a ``n`` armoniche."""
+        return np.column_stack([self.x, self.partial_sum(n), np.zeros_like(self.x)])
+
+    # ------------------------------------------------------------------
+    # Mobject
+    # ------------------------------------------------------------------
+
+    def graph(self, n, **kwargs):
+        """
+        Curva della somma parziale a ``n`` armoniche.
+
+        Equivale a ``FunctionGraph(f, x_range=...)`` (stessi punti, stesso
+        smoothing) ma senza rivalutare la serie punto per punto.
+        """
+        curve = VMobject(**kwargs)
+        return self.update_graph(curve, n)
+
+    def update_graph(self, curve, n):
+        """Sostituisce in place i punti di ``curve`` con la somma parziale a ``n`` armoniche."""
+        center = curve.get_center() if curve.has_points() else None
+        curve.set_points_as_corners(self.points(n))
+        curve.make_smooth()
+        if center is not None:
+            curve.move_to(center)
+        return curve
@@ -13,12 +13,13 @@
 # limitations under the License.
 
 from manim import *
+import sys, os
 import numpy as np
 
-
-def punto(center, R, angle):
-    """Punto sulla circonferenza di centro `center` e raggio `R` all'angolo `angle`."""
-    return center + R * np.array([np.cos(angle), np.sin(angle), 0])
+# Rende importabile il package condiviso 'animations' (template, moduli, ...)
+# calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from animations.unit_circle_module import punto
 
 
 def estremo_aperto(p, color):
@@ -13,8 +13,14 @@
 # limitations under the License.
 
 from manim import *
+import sys, os
 import numpy as np
 
+# Rende importabile il package condiviso 'animations' (template, moduli, ...)
+# calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from animations.plot_module import plot_adaptive
+
 
 class MonotoniaELogaritmo(Scene):
     """L'idea chiave: il verso della disuguaglianza dipende dalla base."""
@@ -49,8 +55,10 @@ class MonotoniaELogaritmo(Scene):
         self.wait(0.3)
 
         # log in base 2 (crescente) e in base 1/2 (decrescente)
-        log2 = axes.plot(lambda x: np.log(x) / np.log(2), x_range=[0.12, 8], color=RED_D, stroke_width=5)
-        log12 = axes.plot(lambda x: np.log(x) / np.log(0.5), x_range=[0.12, 8], color=BLUE_D, stroke_width=5)
+        # Campionamento adattivo: le curve si fermano sul bordo degli assi
+        # vicino all'asintoto x = 0, senza scegliere a mano l'estremo sinistro
+        log2 = plot_adaptive(axes, lambda x: np.log(x) / np.log(2), x_range=[0, 8], color=RED_D, stroke_width=5)
+        log12 = plot_adaptive(axes, lambda x: np.log(x) / np.log(0.5), x_range=[0, 8], color=BLUE_D, stroke_width=5)
 
         lab2 = MathTex(r"\log_{2} x", color=RED_D, font_size=32).next_to(axes.c2p(8, 3), LEFT, buff=0.1)
         lab12 = MathTex(r"\log_{1/2} x", color=BLUE_D, font_size=32).next_to(axes.c2p(8, -3), LEFT, buff=0.1)
@@ -13,8 +13,15 @@
 # limitations under the License.
 
 from manim import *
+import sys, os
 import numpy as np
 
+# Rende importabile il package condiviso 'animations' (template, moduli, ...)
+# calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from animations.plot_module import RevealCurve, plot_adaptive
+from animations.unit_circle_module import UnitCircleRig
+
 
 def etichette_pi(ax, valori, y_buff=0.25):
     """Etichette in multipli di π posizionate sotto l'asse x degli `ax`."""
@@ -67,33 +74,22 @@ class GraficoSeno(Scene):
         # Tracker dell'angolo
         t = ValueTracker(0.0)
 
-        cdot = always_redraw(
-            lambda: Dot(cc + cR * np.array([np.cos(t.get_value()), np.sin(t.get_value()), 0]),
-                        color=RED_D, radius=0.06)
-        )
-        cradius = always_redraw(
-            lambda: Line(cc, cc + cR * np.array([np.cos(t.get_value()), np.sin(t.get_value()), 0]),
-                         color=BLACK, stroke_width=3)
-        )
-        # Proiezione verticale = seno
-        cproj = always_redraw(
-            lambda: Line(
-                cc + cR * np.cos(t.get_value()) * RIGHT,
-                cc + cR * np.array([np.cos(t.get_value()), np.sin(t.get_value()), 0]),
-                color=RED_D, stroke_width=5,
-            )
-        )
-        # Curva del seno che cresce con t
-        curva = always_redraw(
-            lambda: ax.plot(np.sin, x_range=[0, max(t.get_value(), 0.001)],
+        # Raggio, punto e proiezione verticale (= seno) in un unico rig
+        rig = UnitCircleRig(cc, cR, tracker=t, show_sin=True,
+                            dot_color=RED_D, dot_radius=0.06)
+        rig.radius_line.set_stroke(width=3)
+        rig.sin_seg.set_stroke(width=5)
+        cdot, cradius, cproj = rig.dot, rig.radius_line, rig.sin_seg
+        # Curva del seno che cresce con t: campionata una volta sola, a ogni
+        # frame se ne mostra solo la porzione fino a t
+        curva = RevealCurve(ax, np.sin, [0, 2 * PI], t,
                             color=RED_D, stroke_width=5)
+        gdot = Dot(color=RED_D, radius=0.06).add_updater(
+            lambda m: m.move_to(ax.c2p(t.get_value(), np.sin(t.get_value())))
         )
-        gdot = always_redraw(
-            lambda: Dot(ax.c2p(t.get_value(), np.sin(t.get_value())),
-                        color=RED_D, radius=0.06)
-        )
+        gdot.update()
         self.play(Create(cradius), FadeIn(cdot), Create(cproj))
-        self.add(curva, gdot)
+        self.add(rig, curva, gdot)
         self.wait(0.3)
 
         # Un giro completo: la curva si disegna
@@ -206,12 +202,10 @@ class GraficoTangente(Scene):
         self.play(Create(asintoti))
         self.wait(0.3)
 
-        # Rami della tangente (lontano dagli asintoti, per restare nel riquadro)
-        d = 0.2  # tan(π/2 - 0.2) ≈ 5
-        ramo1 = ax.plot(np.tan, x_range=[-PI / 2 + d, PI / 2 - d],
-                        color=GREEN_D, stroke_width=5)
-        ramo2 = ax.plot(np.tan, x_range=[PI / 2 + d, 3 * PI / 2 - d],
-                        color=GREEN_D, stroke_width=5)
+        # Rami della tangente: il campionamento adattivo spezza la curva sugli
+        # asintoti e la chiude esattamente sul bordo del riquadro (y = ±5)
+        ramo1, ramo2 = plot_adaptive(ax, np.tan, x_range=[-PI / 2, 3 * PI / 2],
+                                     color=GREEN_D, stroke_width=5)
         self.play(Create(ramo1), run_time=1.8)
         self.play(Create(ramo2), run_time=1.8)
         tan_lab = MathTex(r"y=\tan x", color=GREEN_D, font_size=32)
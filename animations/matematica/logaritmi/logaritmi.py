@@ -13,8 +13,14 @@
 # limitations under the License.
 
 from manim import *
+import sys, os
 import numpy as np
 
+# Rende importabile il package condiviso 'animations' (template, moduli, ...)
+# calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from animations.plot_module import plot_adaptive
+
 
 class DefinizioneLogaritmo(Scene):
     """Introduce la definizione di logaritmo a partire dall'esponenziale."""
@@ -146,14 +152,16 @@ class LogaritmoInversaEsponenziale(Scene):
         self.wait(0.5)
 
         # Curva esponenziale
-        exp_curve = axes.plot(lambda x: 2 ** x, x_range=[-4, 2], color=RED_D, stroke_width=5)
+        exp_curve = plot_adaptive(axes, lambda x: 2 ** x, x_range=[-4, 2], color=RED_D, stroke_width=5)
         self.play(Create(exp_curve), run_time=1.5)
         self.wait(0.5)
 
         # Curva logaritmica (riflessione rispetto a y=x)
-        log_curve = axes.plot(
-            lambda x: np.log(x) / np.log(2),
-            x_range=[0.0625, 4], color=BLUE_D, stroke_width=5,
+        # Nessun estremo da calcolare a mano: la curva viene ritagliata sul
+        # bordo degli assi (y = -4) vicino all'asintoto x = 0
+        log_curve = plot_adaptive(
+            axes, lambda x: np.log(x) / np.log(2),
+            x_range=[0, 4], color=BLUE_D, stroke_width=5,
         )
         self.play(Create(log_curve), run_time=1.5)
         self.wait(1)
@@ -13,6 +13,12 @@
 # limitations under the License.
 
 from manim import *
+import sys, os
+
+# Rende importabile il package condiviso 'animations' (template, moduli, ...)
+# calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from animations.plot_module import plot_adaptive
 
 
 class RipassoProprietaPotenze(Scene):
@@ -138,7 +144,7 @@ class ModelloEsponenzialeCrescente(Scene):
         self.play(Create(axes), Write(x_label), Write(y_label))
         self.wait(0.5)
 
-        curva = axes.plot(lambda x: 2 ** x, x_range=[0, 4], color=RED_D, stroke_width=5)
+        curva = plot_adaptive(axes, lambda x: 2 ** x, x_range=[0, 4], color=RED_D, stroke_width=5)
         self.play(Create(curva), run_time=2)
         self.wait(0.5)
 
@@ -216,7 +222,7 @@ class EsponenzialeDecrescente(Scene):
         self.play(Create(axes), Write(x_label), Write(y_label))
         self.wait(0.5)
 
-        curva = axes.plot(lambda x: 0.5 ** x, x_range=[0, 4], color=RED_D, stroke_width=5)
+        curva = plot_adaptive(axes, lambda x: 0.5 ** x, x_range=[0, 4], color=RED_D, stroke_width=5)
         self.play(Create(curva), run_time=2)
         self.wait(0.5)
 
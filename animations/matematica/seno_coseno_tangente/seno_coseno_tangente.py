@@ -13,12 +13,13 @@
 # limitations under the License.
 
 from manim import *
+import sys, os
 import numpy as np
 
-
-def punto(center, R, angle):
-    """Punto sulla circonferenza di centro `center` e raggio `R` all'angolo `angle`."""
-    return center + R * np.array([np.cos(angle), np.sin(angle), 0])
+# Rende importabile il package condiviso 'animations' (template, moduli, ...)
+# calcolando la root del progetto: niente path hardcoded, funziona in locale e in CI.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from animations.unit_circle_module import UnitCircleRig, punto
 
 
 class CirconferenzaGoniometrica(Scene):
@@ -128,46 +129,20 @@ class SenoCosenoInMovimento(Scene):
         circle = Circle(radius=R, color=DARK_GRAY, stroke_width=4).move_to(center)
         self.play(Create(x_axis), Create(y_axis), Create(circle))
 
-        # Tracker dell'angolo
+        # Tracker dell'angolo: un solo rig aggiorna raggio, punto, segmenti e
+        # valori numerici (cos/sin calcolati una volta per frame)
         theta = ValueTracker(35 * DEGREES)
-
-        radius = always_redraw(
-            lambda: Line(center, punto(center, R, theta.get_value()),
-                         color=BLACK, stroke_width=5)
-        )
-        dot = always_redraw(
-            lambda: Dot(punto(center, R, theta.get_value()), color=BLACK)
-        )
-        cos_seg = always_redraw(
-            lambda: Line(
-                center,
-                np.array([punto(center, R, theta.get_value())[0], center[1], 0]),
-                color=BLUE_D, stroke_width=7,
-            )
-        )
-        sin_seg = always_redraw(
-            lambda: Line(
-                np.array([punto(center, R, theta.get_value())[0], center[1], 0]),
-                punto(center, R, theta.get_value()),
-                color=RED_D, stroke_width=7,
-            )
-        )
-        self.play(Create(radius), FadeIn(dot), Create(cos_seg), Create(sin_seg))
+        rig = UnitCircleRig(center, R, tracker=theta, show_cos=True, show_sin=True,
+                            show_readouts=True)
+        self.play(Create(rig.radius_line), FadeIn(rig.dot),
+                  Create(rig.cos_seg), Create(rig.sin_seg))
 
         # Valori numerici aggiornati in tempo reale
-        cos_val = always_redraw(
-            lambda: MathTex(
-                r"\cos\alpha = " + f"{np.cos(theta.get_value()):.2f}",
-                color=BLUE_D, font_size=34,
-            ).next_to(circle, DOWN, buff=0.8)
-        )
-        sin_val = always_redraw(
-            lambda: MathTex(
-                r"\sin\alpha = " + f"{np.sin(theta.get_value()):.2f}",
-                color=RED_D, font_size=34,
-            ).next_to(cos_val, DOWN, buff=0.35)
-        )
+        cos_val, sin_val = rig.cos_val, rig.sin_val
+        cos_val.next_to(circle, DOWN, buff=0.8)
+        sin_val.next_to(cos_val, DOWN, buff=0.35)
         self.play(FadeIn(cos_val), FadeIn(sin_val))
+        self.add(rig)
         self.wait(0.5)
 
         # Giro completo: i valori oscillano tra -1 e 1
@@ -0,0 +1,286 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Plot Module - Shared plotting helpers for Manim animations
+
+This module provides adaptive sampling for function graphs: points are
+refined where the curve bends and kept sparse where it is flat, and the
+curve is split automatically at poles, jumps and domain boundaries.
+It also provides RevealCurve, a curve that is sampled once and progressively
+revealed by a ValueTracker without replotting every frame.
+
+Usage:
+    from animations.plot_module import RevealCurve, plot_adaptive
+
+    ax = Axes(x_range=[-2, 5, 1], y_range=[-5, 5, 1])
+    rami = plot_adaptive(ax, np.tan, x_range=[-PI / 2, 3 * PI / 2], color=GREEN_D)
+    self.play(Create(rami[0]))   # un ramo per ogni tratto continuo
+
+    t = ValueTracker(0)
+    curva = RevealCurve(ax, np.sin, [0, 2 * PI], t, color=RED_D)
+    self.add(curva)
+    self.play(t.animate.set_value(2 * PI), run_time=7, rate_func=linear)
+"""
+
+from manim import *
+import numpy as np
+
+
+def _evaluate(f, x):
+    """Valuta ``f`` su un array; se ``f`` non è vettoriale ripiega punto per punto.
+
+    Valori fuori dominio (eccezioni, log di numeri negativi, ...) diventano NaN.
+    """
+    with np.errstate(all="ignore"):
+        try:
+            y = np.asarray(f(x), dtype=float)
+            if y.shape == x.shape:
+                return y
+        except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+            pass
+        y = np.empty_like(x)
+        for i, xi in enumerate(x):
+            try:
+                y[i] = float(f(xi))
+            except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+                y[i] = np.nan
+        return y
+
+
+def adaptive_samples(f, x_range, y_range=None, initial_samples=16,
+                     max_depth=12, tolerance=5e-3, jump_tolerance=0.05):
+    """
+    Campiona ``f`` in modo adattivo e la spezza nei suoi tratti continui.
+
+    Ogni intervallo viene diviso a metà finché il punto medio si discosta
+    dalla corda più di ``tolerance`` (in frazione dell'ampiezza verticale):
+    è una stima della curvatura, quindi i tratti piatti restano con pochi
+    punti e quelli curvi vengono infittiti. Gli intervalli interamente fuori
+    da ``y_range`` dallo stesso lato non vengono raffinati.
+
+    Alla profondità massima un intervallo che presenta ancora un salto
+    maggiore di ``jump_tolerance`` (sempre relativo all'ampiezza verticale)
+    viene trattato come discontinuità o asintoto. I tratti che escono da
+    ``y_range`` o dal dominio vengono chiusi esattamente sul bordo, trovato
+    per bisezione.
+
+    Parameters:
+    -----------
+    f : callable
+        Funzione da campionare (vettoriale o scalare)
+    x_range : list
+        ``[x_min, x_max]`` (un eventuale passo viene ignorato)
+    y_range : list
+        ``[y_min, y_max]`` di ritaglio (default: nessun ritaglio)
+    initial_samples : int
+        Numero di intervalli uniformi di partenza
+    max_depth : int
+        Numero massimo di dimezzamenti per intervallo
+    tolerance : float
+        Scarto massimo punto medio/corda, relativo all'ampiezza verticale
+    jump_tolerance : float
+        Salto minimo (relativo) per riconoscere una discontinuità
+
+    Returns:
+    --------
+    list of np.ndarray
+        Un array ``(n, 2)`` di punti ``(x, y)`` per ogni tratto continuo
+    """
+    x_min, x_max = float(x_range[0]), float(x_range[1])
+    y_lo, y_hi = (-np.inf, np.inf) if y_range is None else map(float, y_range[:2])
+
+    xs = np.linspace(x_min, x_max, initial_samples + 1)
+    ys = _evaluate(f, xs)
+
+    if np.isfinite(y_hi - y_lo):
+        y_scale = y_hi - y_lo
+    else:
+        finite = ys[np.isfinite(ys)]
+        y_scale = np.ptp(finite) if finite.size > 1 else 1.0
+    y_scale = y_scale or 1.0
+
+    # done[i] = l'intervallo [xs[i], xs[i+1]] non va più raffinato
+    done = np.zeros(len(xs) - 1, dtype=bool)
+    for _ in range(max_depth):
+        ya, yb = ys[:-1], ys[1:]
+        fuori = ((ya > y_hi) & (yb > y_hi)) | ((ya < y_lo) & (yb < y_lo))
+        done |= fuori
+        todo = np.flatnonzero(~done)
+        if todo.size == 0:
+            break
+
+        mid = 0.5 * (xs[todo] + xs[todo + 1])
+        ym = _evaluate(f, mid)
+        corda = 0.5 * (ya[todo] + yb[todo])
+        with np.errstate(invalid="ignore"):
+            errore = np.abs(ym - corda) / y_scale
+        # NaN/inf (bordo del dominio, poli) richiedono sempre un raffinamento
+        serve = ~(errore <= tolerance)
+
+        done[todo[~serve]] = True
+        nuovi = todo[serve]
+        if nuovi.size == 0:
+            break
+
+        # Inserisce i punti medi e sdoppia i flag degli intervalli divisi
+        pos = nuovi + 1
+        xs = np.insert(xs, pos, mid[serve])
+        ys = np.insert(ys, pos, ym[serve])
+        done = np.insert(done, pos, False)
+
+    # Salti residui alla massima risoluzione: discontinuità o asintoti
+    with np.errstate(invalid="ignore"):
+        salto = ~done & (np.abs(np.diff(ys)) > jump_tolerance * y_scale)
+
+    def dentro(y):
+        return np.isfinite(y) & (y >= y_lo) & (y <= y_hi)
+
+    def bordo(x_in, x_out):
+        """Ultimo punto dentro il riquadro tra ``x_in`` (dentro) e ``x_out`` (fuori)."""
+        for _ in range(40):
+            m = 0.5 * (x_in + x_out)
+            if dentro(_evaluate(f, np.array([m]))[0]):
+                x_in = m
+            else:
+                x_out = m
+        y_in = _evaluate(f, np.array([x_in]))[0]
+        return [x_in, float(np.clip(y_in, y_lo, y_hi))]
+
+    visibile = dentro(ys)
+    pezzi = []
+    corrente = []
+    for i in range(len(xs)):
+        if i > 0 and not salto[i - 1]:
+            if visibile[i - 1] and not visibile[i]:
+                corrente.append(bordo(xs[i - 1], xs[i]))
+            elif not visibile[i - 1] and visibile[i]:
+                corrente.append(bordo(xs[i], xs[i - 1]))
+        if visibile[i]:
+            corrente.append([xs[i], ys[i]])
+        if not visibile[i] or (i < len(salto) and salto[i]):
+            if len(corrente) > 1:
+                pezzi.append(np.array(corrente))
+            corrente = []
+    if len(corrente) > 1:
+        pezzi.append(np.array(corrente))
+    return pezzi
+
+
+def plot_adaptive(ax, f, x_range=None, y_range=None, sampling=None, **kwargs):
+    """
+    Grafico di ``f`` sugli assi ``ax`` con campionamento adattivo.
+
+    Sostituisce ``ax.plot(f, x_range=...)`` quando la funzione ha asintoti,
+    salti o bordi di dominio: non serve più spezzare a mano ``x_range`` né
+    allontanarsi dai poli. Per default il ritaglio verticale è lo ``y_range``
+    degli assi, così la curva termina esattamente sul bordo del grafico.
+
+    Parameters:
+    -----------
+    ax : Axes
+        Assi su cui disegnare
+    f : callable
+        Funzione da disegnare
+    x_range : list
+        ``[x_min, x_max]`` (default: intervallo x degli assi)
+    y_range : list
+        ``[y_min, y_max]`` di ritaglio (default: intervallo y degli assi)
+    sampling : dict
+        Parametri extra per ``adaptive_samples`` (tolerance, max_depth, ...)
+    **kwargs
+        Stile delle curve (color, stroke_width, ...)
+
+    Returns:
+    --------
+    VGroup
+        Una curva per ogni tratto continuo, da sinistra a destra
+    """
+    if x_range is None:
+        x_range = ax.x_range
+    if y_range is None:
+        y_range = ax.y_range
+    pezzi = adaptive_samples(f, x_range, y_range, **(sampling or {}))
+
+    rami = VGroup()
+    for pezzo in pezzi:
+        punti = np.array([ax.c2p(x, y) for x, y in pezzo])
+        ramo = VMobject(**kwargs)
+        ramo.set_points_as_corners(punti)
+        ramo.make_smooth()
+        rami.add(ramo)
+    return rami
+
+
+class RevealCurve(VMobject):
+    """
+    Curva che si disegna progressivamente seguendo un ValueTracker.
+
+    La funzione viene campionata UNA volta su tutto ``x_range``; a ogni frame
+    la parte visibile è solo una sottocurva (``pointwise_become_partial``) della
+    curva completa, senza ricampionare né ricostruire il mobject. Il
+    campionamento è uniforme in x, quindi la frazione di curva visibile è
+    proporzionale all'ascissa raggiunta dal tracker.
+
+    Gli assi vanno posizionati prima di creare la curva: i punti vengono
+    calcolati una sola volta nelle coordinate di scena.
+
+    Parameters:
+    -----------
+    ax : Axes
+        Assi su cui disegnare
+    f : callable
+        Funzione da disegnare (vettoriale o scalare)
+    x_range : list
+        ``[x_min, x_max]`` o ``[x_min, x_max, step]`` (default step: 1/200
+        dell'intervallo)
+    tracker : ValueTracker
+        Ascissa fino a cui mostrare la curva; se None si usa ``reveal_to``
+    **kwargs
+        Stile della curva (color, stroke_width, ...)
+
+    Usage:
+        t = ValueTracker(0)
+        curva = RevealCurve(ax, np.sin, [0, 2 * PI], t, color=RED_D)
+        self.add(curva)
+        self.play(t.animate.set_value(2 * PI), run_time=7, rate_func=linear)
+    """
+
+    def __init__(self, ax, f, x_range, tracker=None, **kwargs):
+        super().__init__(**kwargs)
+        self.x_min, self.x_max = float(x_range[0]), float(x_range[1])
+        span = self.x_max - self.x_min
+        step = x_range[2] if len(x_range) > 2 else span / 200
+        n = max(int(np.ceil(span / step)), 1)
+
+        xs = np.linspace(self.x_min, self.x_max, n + 1)
+        ys = _evaluate(f, xs)
+        self.full_curve = VMobject()
+        self.full_curve.set_points_as_corners(
+            np.array([ax.c2p(x, y) for x, y in zip(xs, ys)])
+        )
+        self.full_curve.make_smooth()
+
+        self.tracker = tracker
+        if tracker is not None:
+            self.reveal_to(tracker.get_value())
+            self.add_updater(lambda m: m.reveal_to(m.tracker.get_value()))
+        else:
+            self.reveal_to(self.x_min)
+
+    def reveal_to(self, x):
+        """Mostra la curva da ``x_min`` fino all'ascissa ``x``."""
+        alpha = np.clip((x - self.x_min) / (self.x_max - self.x_min), 0, 1)
+        self.pointwise_become_partial(self.full_curve, 0, alpha)
+        return self
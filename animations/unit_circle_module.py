@@ -0,0 +1,200 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Circle Module - Shared goniometric circle for Manim animations
+
+This module provides the `punto` helper and a UnitCircleRig mobject: radius,
+point, cosine/sine segments, projections, tangent segment, angle arc and
+numeric readouts driven by one angle tracker. cos/sin are computed once per
+frame by a single updater and every part is updated in place.
+
+Usage:
+    from animations.unit_circle_module import UnitCircleRig, punto
+
+    theta = ValueTracker(35 * DEGREES)
+    rig = UnitCircleRig(center=UP * 1.3, radius=2.0, tracker=theta,
+                        show_cos=True, show_sin=True, show_readouts=True)
+    self.play(Create(rig.radius_line), FadeIn(rig.dot))
+    self.add(rig)  # l'updater unico gira solo se il rig è in scena
+    self.play(theta.animate.set_value(TAU), run_time=6, rate_func=linear)
+"""
+
+from manim import *
+import numpy as np
+
+
+def punto(center, R, angle):
+    """Punto sulla circonferenza di centro `center` e raggio `R` all'angolo `angle`."""
+    return center + R * np.array([np.cos(angle), np.sin(angle), 0])
+
+
+class _DashedSegment(VGroup):
+    """Segmento tratteggiato con numero di trattini fisso, spostabile in place."""
+
+    def __init__(self, num_dashes=20, positive_space_ratio=0.5, **kwargs):
+        super().__init__(**kwargs)
+        passo = 1.0 / num_dashes
+        self._proportions = [(i * passo, (i + positive_space_ratio) * passo)
+                             for i in range(num_dashes)]
+        for _ in self._proportions:
+            self.add(VMobject(**kwargs))
+
+    def put_start_and_end_on(self, start, end):
+        for dash, (a, b) in zip(self.submobjects, self._proportions):
+            dash.set_points_as_corners([start + a * (end - start),
+                                        start + b * (end - start)])
+        return self
+
+
+class UnitCircleRig(VGroup):
+    """
+    Circonferenza goniometrica con le parti che dipendono dall'angolo.
+
+    Tutte le parti (raggio, punto, segmenti di seno/coseno, proiezioni,
+    segmento della tangente, arco dell'angolo, valori numerici) sono
+    sottomobject del rig e vengono aggiornate da UN solo updater, che calcola
+    cos/sin una volta per frame e sposta i punti di ciascuna parte senza
+    ricrearla. Le parti assenti valgono None.
+
+    Parameters:
+    -----------
+    center : np.ndarray
+        Centro della circonferenza (default: ORIGIN)
+    radius : float
+        Raggio grafico, corrispondente a 1 (default: 2.0)
+    tracker : ValueTracker
+        Angolo in radianti; se None il rig resta fermo su ``angle``
+    angle : float
+        Angolo iniziale quando non c'è un tracker (default: 0)
+    show_circle, show_radius, show_dot : bool
+        Circonferenza, raggio OP e punto P
+    show_cos, show_sin : bool
+        Segmenti del coseno (sull'asse x) e del seno (verticale da x a P)
+    show_projections : bool
+        Proiezioni tratteggiate di P sugli assi
+    show_tangent : bool
+        Segmento della tangente sulla retta x = 1, limitato a ``tangent_limit``
+    show_arc : bool
+        Arco dell'angolo al centro, di raggio ``arc_radius``
+    show_readouts : bool
+        Valori numerici di cos e sin (DecimalNumber: nessun LaTeX per frame)
+    color, dot_color, dot_radius :
+        Colore di raggio e punto, colore e raggio del solo punto
+    """
+
+    def __init__(self, center=ORIGIN, radius=2.0, tracker=None, angle=0.0,
+                 show_circle=False, show_radius=True, show_dot=True,
+                 show_cos=False, show_sin=False, show_projections=False,
+                 show_tangent=False, show_arc=False, show_readouts=False,
+                 tangent_limit=3.0, arc_radius=0.5, color=BLACK,
+                 dot_color=None, dot_radius=DEFAULT_DOT_RADIUS,
+                 cos_color=BLUE_D, sin_color=RED_D, tan_color=GREEN_D,
+                 arc_color=GREEN_D, readout_font_size=34, **kwargs):
+        super().__init__(**kwargs)
+        self.center_point = np.array(center, dtype=float)
+        self.R = radius
+        self.tracker = tracker
+        self.current_angle = angle if tracker is None else tracker.get_value()
+        self.tangent_limit = tangent_limit
+
+        n_dashes = max(int(np.ceil(radius / 0.1)), 4)
+        self.circle = (Circle(radius=radius, color=DARK_GRAY, stroke_width=4)
+                       .move_to(self.center_point) if show_circle else None)
+        self.proj_v = (_DashedSegment(n_dashes, color=cos_color, stroke_width=3)
+                       if show_projections else None)
+        self.proj_h = (_DashedSegment(n_dashes, color=sin_color, stroke_width=3)
+                       if show_projections else None)
+        self.cos_seg = Line(color=cos_color, stroke_width=7) if show_cos else None
+        self.sin_seg = Line(color=sin_color, stroke_width=7) if show_sin else None
+        self.tan_seg = Line(color=tan_color, stroke_width=8) if show_tangent else None
+        self.radius_line = Line(color=color, stroke_width=5) if show_radius else None
+        self.dot = (Dot(color=dot_color or color, radius=dot_radius)
+                    if show_dot else None)
+
+        self.arc = None
+        if show_arc:
+            # Archi completi (antiorario e orario) calcolati una volta: per
+            # frame se ne mostra una parte
+            self._full_arc = Arc(radius=arc_radius, start_angle=0, angle=TAU,
+                                 arc_center=self.center_point)
+            self._full_arc_cw = Arc(radius=arc_radius, start_angle=0, angle=-TAU,
+                                    arc_center=self.center_point)
+            self.arc = VMobject(color=arc_color, stroke_width=4)
+
+        self.cos_val = self.sin_val = None
+        if show_readouts:
+            self.cos_num = DecimalNumber(0, num_decimal_places=2, color=cos_color,
+                                         font_size=readout_font_size)
+            self.sin_num = DecimalNumber(0, num_decimal_places=2, color=sin_color,
+                                         font_size=readout_font_size)
+            self.cos_val = VGroup(
+                MathTex(r"\cos\alpha =", color=cos_color, font_size=readout_font_size),
+                self.cos_num,
+            ).arrange(RIGHT, buff=0.15)
+            self.sin_val = VGroup(
+                MathTex(r"\sin\alpha =", color=sin_color, font_size=readout_font_size),
+                self.sin_num,
+            ).arrange(RIGHT, buff=0.15)
+
+        parts = [self.circle, self.proj_v, self.proj_h, self.cos_seg, self.sin_seg,
+                 self.tan_seg, self.arc, self.radius_line, self.dot,
+                 self.cos_val, self.sin_val]
+        self.add(*[p for p in parts if p is not None])
+
+        self.set_angle(self.current_angle)
+        if tracker is not None:
+            self.add_updater(lambda m: m.set_angle(m.tracker.get_value()))
+
+    def point_at(self, angle):
+        """Punto della circonferenza del rig all'angolo ``angle``."""
+        return punto(self.center_point, self.R, angle)
+
+    def get_point(self):
+        """Punto P corrente."""
+        return self.point_at(self.current_angle)
+
+    def set_angle(self, angle):
+        """Porta tutte le parti all'angolo ``angle`` (cos/sin calcolati una volta)."""
+        self.current_angle = angle
+        c, s = np.cos(angle), np.sin(angle)
+        O = self.center_point
+        P = O + self.R * np.array([c, s, 0])
+        Px = O + self.R * np.array([c, 0, 0])  # piede sull'asse x
+        Py = O + self.R * np.array([0, s, 0])  # piede sull'asse y
+
+        if self.radius_line is not None:
+            self.radius_line.set_points_as_corners([O, P])
+        if self.dot is not None:
+            self.dot.move_to(P)
+        if self.cos_seg is not None:
+            self.cos_seg.set_points_as_corners([O, Px])
+        if self.sin_seg is not None:
+            self.sin_seg.set_points_as_corners([Px, P])
+        if self.proj_v is not None:
+            self.proj_v.put_start_and_end_on(P, Px)
+            self.proj_h.put_start_and_end_on(P, Py)
+        if self.tan_seg is not None:
+            base = O + self.R * RIGHT
+            t = s / c if abs(c) > 1e-9 else np.sign(s) * self.tangent_limit
+            t = np.clip(t, -self.tangent_limit, self.tangent_limit)
+            self.tan_seg.set_points_as_corners([base, base + self.R * t * UP])
+        if self.arc is not None:
+            # Come Arc(angle=angle): orario se negativo, giro completo da TAU in su
+            full = self._full_arc if angle >= 0 else self._full_arc_cw
+            self.arc.pointwise_become_partial(full, 0, min(abs(angle), TAU) / TAU)
+        if self.cos_val is not None:
+            self.cos_num.set_value(c)
+            self.sin_num.set_value(s)
+        return self
@@ -0,0 +1,129 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Wave Module - Batched particle rows and lattices for wave animations
+
+This module provides ParticleLattice (and the 1D ParticleRow) to show the
+particles of a medium oscillating under a wave. Rest positions live in a
+NumPy array; a displacement field u(p, t) moves every particle with one
+vectorized call and all particles are drawn as a single VMobject, so the
+per-frame cost does not grow with Python-level work per particle.
+
+Usage:
+    from animations.wave_module import ParticleRow
+
+    t = ValueTracker(0)
+    fila = ParticleRow(np.linspace(-3.2, 3.2, 26), y=2.0, tracker=t,
+                       displacement=lambda p, t: UP * 0.6 * np.sin(2 * p[:, :1] - 2.5 * t))
+    self.add(fila)
+    self.play(t.animate.set_value(9), run_time=9, rate_func=linear)
+"""
+
+from manim import *
+import numpy as np
+
+
+class ParticleLattice(VMobject):
+    """
+    Insieme di particelle (punti) di un mezzo, disegnate come un unico mobject.
+
+    Ogni particella è un cerchio pieno come ``Dot``; i punti di Bézier di tutte
+    le particelle stanno in un solo array, ricalcolato in place sommando lo
+    spostamento di ciascuna particella alla sua posizione di riposo.
+
+    Parameters:
+    -----------
+    rest_positions : array-like
+        Posizioni di riposo, array (N, 3) (o (N, 2): z = 0)
+    radius : float
+        Raggio delle particelle (default: 0.06, come Dot con raggio piccolo)
+    color : Color
+        Colore (unico) delle particelle (default: DARK_BLUE)
+    displacement : callable
+        Campo di spostamento ``u(p, t)``: riceve le posizioni di riposo (N, 3)
+        e il tempo, restituisce gli spostamenti (N, 3) (o qualunque array
+        compatibile per broadcasting, es. ``UP * (N, 1)``)
+    tracker : ValueTracker
+        Tempo t del campo; se presente la lattice si aggiorna da sola
+    """
+
+    def __init__(self, rest_positions, radius=0.06, color=DARK_BLUE,
+                 displacement=None, tracker=None, **kwargs):
+        super().__init__(fill_color=color, fill_opacity=1.0, stroke_width=0, **kwargs)
+
+        rest = np.asarray(rest_positions, dtype=float)
+        if rest.shape[1] == 2:
+            rest = np.column_stack([rest, np.zeros(len(rest))])
+        self.rest_positions = rest
+        self.radius = radius
+        self.displacement = displacement
+        self.tracker = tracker
+
+        # Contorno di un Dot centrato nell'origine (stessi punti di Bézier)
+        self._shape = Dot(radius=radius).points.copy()
+        self.set_offsets(np.zeros_like(rest))
+
+        if tracker is not None and displacement is not None:
+            self.update_field(tracker.get_value())
+            self.add_updater(lambda m: m.update_field(m.tracker.get_value()))
+
+    @property
+    def num_particles(self):
+        return len(self.rest_positions)
+
+    def set_offsets(self, offsets):
+        """Sposta tutte le particelle di ``offsets`` rispetto al riposo."""
+        centri = self.rest_positions + offsets
+        self.centers = centri
+        self.points = (centri[:, None, :] + self._shape[None, :, :]).reshape(-1, 3)
+        return self
+
+    def update_field(self, t):
+        """Applica il campo di spostamento al tempo ``t``."""
+        offsets = np.broadcast_to(
+            self.displacement(self.rest_positions, t), self.rest_positions.shape
+        )
+        return self.set_offsets(offsets)
+
+    def get_particle_center(self, i):
+        """Posizione corrente della particella ``i``."""
+        return self.centers[i].copy()
+
+    @staticmethod
+    def grid(x_values, y_values, **kwargs):
+        """Reticolo 2D con le particelle a riposo sui nodi ``x_values × y_values``."""
+        xx, yy = np.meshgrid(np.asarray(x_values, float), np.asarray(y_values, float))
+        rest = np.column_stack([xx.ravel(), yy.ravel(), np.zeros(xx.size)])
+        return ParticleLattice(rest, **kwargs)
+
+
+class ParticleRow(ParticleLattice):
+    """
+    Fila di particelle allineate sull'orizzontale ``y`` (caso 1D).
+
+    Parameters:
+    -----------
+    x_values : array-like
+        Ascisse di riposo delle particelle
+    y : float
+        Ordinata della fila (default: 0)
+    **kwargs
+        Vedi ParticleLattice (radius, color, displacement, tracker)
+    """
+
+    def __init__(self, x_values, y=0.0, **kwargs):
+        xs = np.asarray(x_values, dtype=float)
+        rest = np.column_stack([xs, np.full_like(xs, y), np.zeros_like(xs)])
+        super().__init__(rest, **kwargs)
@@ -0,0 +1,294 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Bench - Reproducible render benchmarks on pinned scenes
+
+Renders a fixed set of representative scenes at ql and reports, per scene,
+frames per second, per-phase timings (Manim import, LaTeX, rendering,
+encoding) and peak memory as JSON:
+
+- particelle: TrasformazioneIsocora (gas_perfetto), many moving particles
+- latex: SostituzioneTeoriaEsempio (sistemi_lineari), many MathTex
+- always_redraw: EffettoFase (diffrazione), updaters redrawn every frame
+- curve: SintesiOndaQuadra (diffrazione), long parametric curves
+
+Every run is a fresh process with a fixed random seed and an empty temporary
+media directory, so Manim's partial-movie and Tex caches never hide work and
+two runs of the same tree do the same work. Each scene is rendered --repeat
+times and the median is reported.
+
+With --compare the results are checked against a saved baseline (e.g.
+benchmarks/baseline.json, written with --save-baseline): a benchmark whose
+time or memory grew, or whose fps dropped, by more than --tolerance is a
+regression and the exit code is 1.
+
+The orchestrator needs only the standard library; the renders run with the
+Python of the Manim virtualenv (--python, make bench passes it).
+
+Usage:
+    python3 benchmarks/bench.py --python ~/.virtualenvs/manim/bin/python
+    python3 benchmarks/bench.py --python ... --only latex --repeat 5
+    python3 benchmarks/bench.py --python ... --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent / "tools"
+sys.path.insert(0, str(TOOLS_DIR))
+
+from common import ROOT, find_topic, relative  # noqa: E402
+from telemetry import git_revision  # noqa: E402
+
+BENCH_DIR = ROOT / "benchmarks"
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+RESULTS_VERSION = 1
+
+QUALITY = "ql"
+SEED = 42
+
+# Scene fissate: cambiarle invalida il confronto con le baseline salvate
+BENCHMARKS = {
+    "particelle": ("gas_perfetto", "TrasformazioneIsocora"),
+    "latex": ("sistemi_lineari", "SostituzioneTeoriaEsempio"),
+    "always_redraw": ("diffrazione", "EffettoFase"),
+    "curve": ("diffrazione", "SintesiOndaQuadra"),
+}
+
+# Metrica -> True se "più alto è meglio"
+COMPARED = {"wall_seconds": False, "fps": True, "peak_rss_mb": False}
+
+
+# ----------------------------------------------------------------------------
+# Worker (Python del virtualenv di Manim, un processo per run)
+# ----------------------------------------------------------------------------
+
+def run_worker(topic_name, scene, media_dir, seed):
+    """Renderizza una scena nel processo corrente e restituisce le metriche."""
+    random.seed(seed)
+    start = time.perf_counter()
+    import numpy as np
+    import manim  # noqa: F401
+
+    import_seconds = time.perf_counter() - start
+    np.random.seed(seed)
+
+    import render_probe
+    from render_server import render_job
+
+    render_probe.install()
+    topic = find_topic(topic_name)
+    result = render_job({"file": str(topic.source), "scene": scene, "quality": QUALITY,
+                         "media_dir": media_dir})
+    if not result["ok"]:
+        return {"ok": False, "error": result["error"]}
+
+    metrics = result["metrics"] or {}
+    wall = metrics.get("wall_seconds") or result["seconds"]
+    latex = metrics.get("latex_seconds") or 0.0
+    encode = metrics.get("encode_seconds") or 0.0
+    return {
+        "ok": True,
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": metrics.get("cpu_seconds"),
+        "frames": metrics.get("frames"),
+        "fps": round(metrics["frames"] / wall, 2) if metrics.get("frames") and wall else None,
+        "phases": {
+            "import": round(import_seconds, 3),
+            "latex": round(latex, 3),
+            "render": round(max(wall - latex - encode, 0.0), 3),
+            "encode": round(encode, 3),
+        },
+        # Picco dell'intero processo (import compreso): un processo per run
+        "peak_rss_mb": metrics.get("peak_rss_mb"),
+    }
+
+
+# ----------------------------------------------------------------------------
+# Orchestratore
+# ----------------------------------------------------------------------------
+
+def run_once(python, topic_name, scene, seed):
+    with tempfile.TemporaryDirectory(prefix="bench-media-") as media_dir:
+        out = Path(media_dir) / "result.json"
+        proc = subprocess.run(
+            [python, __file__, "--worker", topic_name, scene, media_dir, str(seed), str(out)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0 or not out.is_file():
+            return {"ok": False, "error": (proc.stderr or proc.stdout).strip()[-2000:]}
+        return json.loads(out.read_text(encoding="utf-8"))
+
+
+def summarize(runs):
+    """Mediana delle metriche sui run riusciti (massimo per la memoria)."""
+    def median(key, source=None):
+        values = [(r if source is None else r[source])[key] for r in runs]
+        values = [v for v in values if v is not None]
+        return round(statistics.median(values), 3) if values else None
+
+    return {
+        "wall_seconds": median("wall_seconds"),
+        "cpu_seconds": median("cpu_seconds"),
+        "frames": median("frames"),
+        "fps": median("fps"),
+        "phases": {p: median(p, "phases") for p in ("import", "latex", "render", "encode")},
+        "peak_rss_mb": max((r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None),
+                           default=None),
+    }
+
+
+def run_suite(python, names, repeat=3, seed=SEED):
+    """
+    Esegue i benchmark ``names`` e restituisce i risultati (formato JSON).
+
+    Parameters:
+    -----------
+    python : str
+        Python del virtualenv di Manim
+    names : list of str
+        Chiavi di ``BENCHMARKS``
+    repeat : int
+        Run per benchmark (si riporta la mediana)
+    seed : int
+        Seed di ``random`` e ``numpy.random`` in ogni run
+    """
+    results = {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "quality": QUALITY,
+        "seed": seed,
+        "repeat": repeat,
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count(),
+                    "python": platform.python_version()},
+        "benchmarks": {},
+    }
+    for name in names:
+        topic_name, scene = BENCHMARKS[name]
+        runs = []
+        for i in range(repeat):
+            run = run_once(python, topic_name, scene, seed)
+            if not run["ok"]:
+                print(f"✗ {name} ({topic_name}:{scene}) run {i + 1}/{repeat}\n{run['error']}")
+                break
+            runs.append(run)
+            print(f"  {name} run {i + 1}/{repeat}: {run['wall_seconds']:.1f}s, "
+                  f"{run['fps']} fps, {run['peak_rss_mb']} MB", flush=True)
+        entry = {"topic": topic_name, "scene": scene, "ok": len(runs) == repeat, "runs": runs}
+        if runs:
+            entry.update(summarize(runs))
+        results["benchmarks"][name] = entry
+    return results
+
+
+def compare(results, baseline, tolerance=0.10):
+    """
+    Confronta con una baseline.
+
+    Returns:
+    --------
+    list of str
+        Descrizione delle regressioni (vuota se nessuna)
+    """
+    regressions = []
+    print(f"Confronto con la baseline {baseline.get('revision') or '-'} "
+          f"({baseline.get('created_at', '?')}), tolleranza {tolerance:.0%}:")
+    for name, current in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base or not base.get("ok") or not current.get("ok"):
+            print(f"  {name:<14} non confrontabile")
+            continue
+        parts = []
+        for metric, higher_is_better in COMPARED.items():
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            worse = -change if higher_is_better else change
+            flag = " ✗" if worse > tolerance else ""
+            parts.append(f"{metric} {old:g} -> {new:g} ({change:+.1%}){flag}")
+            if flag:
+                regressions.append(f"{name}: {metric} {old:g} -> {new:g} ({change:+.1%})")
+        print(f"  {name:<14} " + " · ".join(parts))
+    return regressions
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "--worker":
+        topic_name, scene, media_dir, seed, out = argv[1:6]
+        result = run_worker(topic_name, scene, media_dir, int(seed))
+        Path(out).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        return 0 if result["ok"] else 1
+
+    parser = argparse.ArgumentParser(description="Benchmark di rendering su scene fissate.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="Python del virtualenv di Manim (default: quello corrente)")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="esegui solo questo benchmark (ripetibile)")
+    parser.add_argument("--repeat", type=int, default=3, help="run per benchmark (default: 3)")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"seed (default: {SEED})")
+    parser.add_argument("--output", help="file JSON dei risultati "
+                                         "(default: benchmarks/results/<data>-<revisione>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="confronta con una baseline salvata")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="peggioramento tollerato nel confronto (default: 0.10)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"salva i risultati anche come {relative(BASELINE_PATH)}")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    print(f"Benchmark {', '.join(names)} a {QUALITY}, {args.repeat} run ciascuno, seed {args.seed}")
+    results = run_suite(args.python, names, args.repeat, args.seed)
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"{stamp}-{results['revision'] or 'norev'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(results, indent=2) + "\n"
+    output.write_text(text, encoding="utf-8")
+    print(f"Risultati: {output}")
+    if args.save_baseline:
+        BASELINE_PATH.write_text(text, encoding="utf-8")
+        print(f"Baseline salvata: {relative(BASELINE_PATH)}")
+
+    ok = all(b["ok"] for b in results["benchmarks"].values())
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressioni ({len(regressions)}):")
+            for item in regressions:
+                print(f"  ✗ {item}")
+            ok = False
+        else:
+            print("Nessuna regressione.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+// Lettore HLS leggero con Media Source Extensions, per i browser senza HLS
+// nativo (Safari e iOS lo hanno). Pensato per i pacchetti di
+// tools/package_hls.py: VOD, un solo flusso video fMP4 per variante, segmenti
+// allineati fra le varianti. Usa la famiglia di codec preferita fra quelle
+// che il browser decodifica (AV1 se può, altrimenti H.264), parte dalla sua
+// variante più leggera (avvio rapido) e sceglie la successiva in base alla
+// banda misurata sui segmenti scaricati.
+
+interface Variant {
+  bandwidth: number;
+  codecs: string;
+  uri: string;
+}
+
+interface Segment {
+  uri: string;
+  start: number;
+  duration: number;
+}
+
+interface Playlist {
+  init: string;
+  segments: Segment[];
+  duration: number;
+}
+
+// Secondi di video da tenere pronti oltre la posizione corrente
+const BUFFER_AHEAD = 20;
+// Quota della banda misurata che una variante può occupare
+const SAFETY = 0.7;
+// Peso della misura più recente nella media mobile della banda
+const EWMA_WEIGHT = 0.5;
+// Famiglie di codec in ordine di preferenza (prefisso di CODECS): AV1 pesa
+// meno a parità di qualità, H.264 lo decodifica qualunque browser
+const CODEC_PREFERENCE = ['av01', 'vp09', 'avc1'];
+
+export function parseMaster(text: string, base: string): Variant[] {
+  const lines = text.split(/\r?\n/).map((line) => line.trim());
+  const variants: Variant[] = [];
+  lines.forEach((line, i) => {
+    if (!line.startsWith('#EXT-X-STREAM-INF:')) return;
+    const uri = lines.slice(i + 1).find((next) => next && !next.startsWith('#'));
+    if (!uri) return;
+    variants.push({
+      bandwidth: Number(/[:,]BANDWIDTH=(\d+)/.exec(line)?.[1] ?? 0),
+      codecs: /CODECS="([^"]+)"/.exec(line)?.[1] ?? '',
+      uri: new URL(uri, base).href,
+    });
+  });
+  return variants.sort((a, b) => a.bandwidth - b.bandwidth);
+}
+
+export function parseMedia(text: string, base: string): Playlist {
+  const playlist: Playlist = { init: '', segments: [], duration: 0 };
+  let duration = 0;
+  for (const line of text.split(/\r?\n/).map((l) => l.trim())) {
+    if (line.startsWith('#EXT-X-MAP:')) {
+      playlist.init = new URL(/URI="([^"]+)"/.exec(line)?.[1] ?? '', base).href;
+    } else if (line.startsWith('#EXTINF:')) {
+      duration = parseFloat(line.slice('#EXTINF:'.length));
+    } else if (line && !line.startsWith('#')) {
+      playlist.segments.push({ uri: new URL(line, base).href, start: playlist.duration, duration });
+      playlist.duration += duration;
+    }
+  }
+  return playlist;
+}
+
+async function fetchOk(url: string): Promise<Response> {
+  const response = await fetch(url);
+  if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+  return response;
+}
+
+function mime(variant: Variant): string {
+  return `video/mp4; codecs="${variant.codecs}"`;
+}
+
+// Varianti della famiglia di codec preferita: si resta su un decoder, senza
+// passare fra AV1 e H.264 a ogni cambio di banda
+function preferredFamily(variants: Variant[]): Variant[] {
+  const family = CODEC_PREFERENCE.find((f) => variants.some((v) => v.codecs.startsWith(f)));
+  return family ? variants.filter((v) => v.codecs.startsWith(family)) : variants;
+}
+
+function once(target: EventTarget, type: string): Promise<void> {
+  return new Promise((resolve) => target.addEventListener(type, () => resolve(), { once: true }));
+}
+
+/**
+ * Riproduce in `video` la master playlist `url`. Si risolve appena il primo
+ * segmento della variante più leggera è nel buffer (il resto si scarica in
+ * background), così il play parte subito. Rifiuta se il pacchetto non si può
+ * leggere (playlist mancanti, codec non supportati, primo segmento non
+ * scaricabile): il chiamante ripiega sui video progressivi.
+ */
+export async function attachHls(video: HTMLVideoElement, url: string): Promise<void> {
+  const masterUrl = new URL(url, location.href).href;
+  const variants = preferredFamily(parseMaster(await (await fetchOk(masterUrl)).text(), masterUrl)
+    .filter((v) => MediaSource.isTypeSupported(mime(v))));
+  if (variants.length === 0) throw new Error(`${url}: nessuna variante riproducibile`);
+
+  const playlists = new Map<Variant, Promise<Playlist>>();
+  const playlistOf = (variant: Variant): Promise<Playlist> => {
+    if (!playlists.has(variant)) {
+      playlists.set(variant, fetchOk(variant.uri)
+        .then((r) => r.text())
+        .then((text) => parseMedia(text, variant.uri)));
+    }
+    return playlists.get(variant)!;
+  };
+  const first = await playlistOf(variants[0]);
+
+  const mediaSource = new MediaSource();
+  video.src = URL.createObjectURL(mediaSource);
+  await once(mediaSource, 'sourceopen');
+  mediaSource.duration = first.duration;
+  const buffer = mediaSource.addSourceBuffer(mime(variants[0]));
+
+  let level = 0;              // variante corrente, dalla più leggera
+  let initOf: Variant | null = null;
+  let next = 0;               // prossimo segmento da scaricare
+  let bandwidth = 0;          // bit/s, media mobile
+  let busy = false;
+
+  const append = async (data: ArrayBuffer): Promise<void> => {
+    try {
+      buffer.appendBuffer(data);
+    } catch (error) {
+      // Buffer pieno: si libera il video già visto e si riprova una volta
+      if (!(error instanceof DOMException && error.name === 'QuotaExceededError')) throw error;
+      buffer.remove(0, Math.max(video.currentTime - 10, 0));
+      await once(buffer, 'updateend');
+      buffer.appendBuffer(data);
+    }
+    await once(buffer, 'updateend');
+  };
+
+  const download = async (uri: string): Promise<ArrayBuffer> => {
+    const start = performance.now();
+    const data = await (await fetchOk(uri)).arrayBuffer();
+    const seconds = Math.max((performance.now() - start) / 1000, 0.001);
+    const sample = (data.byteLength * 8) / seconds;
+    bandwidth = bandwidth ? EWMA_WEIGHT * sample + (1 - EWMA_WEIGHT) * bandwidth : sample;
+    return data;
+  };
+
+  const bufferedAhead = (): number => {
+    const t = video.currentTime;
+    for (let i = 0; i < video.buffered.length; i++) {
+      if (video.buffered.start(i) <= t + 0.1 && t <= video.buffered.end(i)) {
+        return video.buffered.end(i) - t;
+      }
+    }
+    return 0;
+  };
+
+  const choose = (): number => {
+    let best = 0;
+    variants.forEach((v, i) => {
+      if (v.bandwidth <= SAFETY * bandwidth) best = i;
+    });
+    return best;
+  };
+
+  // Scarica fino a `limit` segmenti, finché il buffer non copre BUFFER_AHEAD
+  const fill = async (limit = Infinity): Promise<void> => {
+    if (busy) return;
+    busy = true;
+    try {
+      let count = 0;
+      while (count++ < limit && next < first.segments.length && bufferedAhead() < BUFFER_AHEAD) {
+        const variant = variants[level];
+        const playlist = await playlistOf(variant);
+        if (initOf !== variant) {
+          if (initOf && initOf.codecs !== variant.codecs) buffer.changeType?.(mime(variant));
+          await append(await download(playlist.init));
+          initOf = variant;
+        }
+        const index = next;
+        await append(await download(playlist.segments[index].uri));
+        // Un salto durante il download ha già spostato `next`
+        if (next === index) next = index + 1;
+        level = choose();
+      }
+      if (next >= first.segments.length && mediaSource.readyState === 'open') {
+        mediaSource.endOfStream();
+      }
+    } finally {
+      busy = false;
+    }
+  };
+
+  const background = (): void => {
+    fill().catch((error) => console.error('HLS:', error));
+  };
+
+  video.addEventListener('seeking', () => {
+    // Si riparte dal segmento che contiene la nuova posizione, o dalla fine
+    // del tratto già in memoria
+    const t = video.currentTime + bufferedAhead();
+    const index = first.segments.findIndex((s) => t < s.start + s.duration);
+    next = index === -1 ? first.segments.length : index;
+    background();
+  });
+  video.addEventListener('timeupdate', background);
+  // Avvio rapido: init e primo segmento, poi il resto senza attendere
+  await fill(1);
+  background();
+}
@@ -0,0 +1,132 @@
+// Video pubblicati, dal manifest dei media (media/media-manifest.json,
+// scritto da tools/media_manifest.py). Letto una volta in fase di build.
+import fs from 'node:fs';
+import path from 'node:path';
+
+// Video ricodificato per il web (tools/encode_web.py)
+export interface MediaRendition {
+  path: string;        // relativo a media/: fisica/web/onde/1920p60/IntroOnde.av1.mp4
+  url: string;
+  bytes: number;
+  sha256: string;
+  type: string;        // tipo MIME con codecs: video/webm; codecs="vp09.00.41.08"
+  profile: string;
+}
+
+export interface MediaVideo {
+  path: string;        // relativo a media/: fisica/videos/onde/1920p60/IntroOnde.mp4
+  url: string;         // nome pubblicato con hash del contenuto (immutabile)
+  bytes: number;
+  sha256: string;
+  width: number | null;
+  height: number | null;
+  fps: number | null;
+  codec: string | null;
+  renditions?: Record<string, MediaRendition>;
+}
+
+// Pacchetto HLS di una scena (tools/package_hls.py): master playlist in una
+// cartella con l'hash del contenuto
+export interface MediaStream {
+  path: string;        // relativo a media/: fisica/hls/onde/IntroOnde
+  url: string;         // /media/fisica/hls/onde/IntroOnde.<hash>/master.m3u8
+  bytes: number;
+  sha256: string;
+  variants: { quality: string; codec: string; resolution: string; bandwidth: number; codecs: string }[];
+}
+
+// Poster di una scena (tools/posters.py): frame in AVIF/WebP e, se c'è,
+// un'anteprima animata in loop
+export interface MediaImage {
+  path: string;        // relativo a media/: fisica/posters/onde/IntroOnde.avif
+  url: string;
+  bytes: number;
+  sha256: string;
+  type: string;        // image/avif, image/webp
+  format: string;
+}
+
+export interface MediaPoster {
+  width: number;
+  height: number;
+  images: MediaImage[];                               // in ordine di preferenza
+  preview?: { path: string; url: string; bytes: number; sha256: string; type: string };
+}
+
+export interface VideoSource {
+  src: string;
+  type: string;
+}
+
+interface Manifest {
+  topics: Record<string, {
+    scenes: Record<string, Record<string, MediaVideo>>;
+    hls?: Record<string, MediaStream>;
+    posters?: Record<string, MediaPoster>;
+  }>;
+}
+
+// Qualità in ordine di preferenza (4K escluso: troppo pesante per il web)
+export const QUALITY_ORDER = ['qh', 'qm', 'ql'];
+
+// Video web in ordine di preferenza (il browser usa il primo che supporta):
+// AV1 e VP9 pesano meno a parità di qualità, H.264 lo legge qualunque browser
+export const RENDITION_ORDER = ['av1', 'vp9', 'h264'];
+
+// public/media è un symlink a ../../media
+const MANIFEST_PATH = path.resolve('public/media/media-manifest.json');
+
+let manifest: Manifest | null | undefined;
+
+function loadManifest(): Manifest | null {
+  if (manifest === undefined) {
+    try {
+      manifest = JSON.parse(fs.readFileSync(MANIFEST_PATH, 'utf-8')) as Manifest;
+    } catch {
+      // Nessun manifest (es. sviluppo senza video): il player cerca i video da sé
+      manifest = null;
+    }
+  }
+  return manifest;
+}
+
+/** Video di una scena per qualità, in ordine di preferenza (vuoto se mancano). */
+export function sceneVideos(discipline: string, topic: string, scene: string): MediaVideo[] {
+  const byQuality = loadManifest()?.topics[`${discipline}/${topic}`]?.scenes[scene] ?? {};
+  return QUALITY_ORDER.filter((q) => q in byQuality).map((q) => byQuality[q]);
+}
+
+/**
+ * URL da usare nella pagina: in build il nome con hash (pubblicato da
+ * `deploy_media.py stage`), in sviluppo il percorso reale in public/media.
+ */
+export function videoUrl(video: { path: string; url: string }): string {
+  return import.meta.env.DEV ? `/media/${video.path}` : video.url;
+}
+
+/**
+ * Elementi `<source>` di un video: i video web in ordine di preferenza, con
+ * tipo e codecs, oppure l'output di Manim se la scena non è stata ricodificata.
+ */
+export function videoSources(video: MediaVideo): VideoSource[] {
+  const renditions = RENDITION_ORDER.flatMap((name) => video.renditions?.[name] ?? []);
+  if (renditions.length === 0) {
+    return [{ src: videoUrl(video), type: 'video/mp4' }];
+  }
+  return renditions.map((r) => ({ src: videoUrl(r), type: r.type }));
+}
+
+/** Pacchetto HLS di una scena, se c'è. */
+export function sceneStream(discipline: string, topic: string, scene: string): MediaStream | null {
+  return loadManifest()?.topics[`${discipline}/${topic}`]?.hls?.[scene] ?? null;
+}
+
+/** URL della master playlist (in sviluppo, la cartella reale in public/media). */
+export function streamUrl(stream: MediaStream): string {
+  return import.meta.env.DEV ? `/media/${stream.path}/master.m3u8` : stream.url;
+}
+
+/** Poster di una scena, se c'è. */
+export function scenePoster(discipline: string, topic: string, scene: string): MediaPoster | null {
+  return loadManifest()?.topics[`${discipline}/${topic}`]?.posters?.[scene] ?? null;
+}
@@ -0,0 +1,264 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Build Scenes - Per-scene incremental build of a topic
+
+Instead of `manim -a <topic>.py`, this script fingerprints every Scene class
+of the topic (see fingerprint.py) and renders only the scenes whose
+fingerprint changed or whose video is missing. The state lives in a small
+build database per topic and quality:
+
+    media/<discipline>/<topic>/videos/<quality_dir>/scenes.json
+
+The database is also the Make target of the topic (it replaces the old
+.built marker). When some scenes are still to be rendered (a failure, or a
+build limited with --scene) its modification time is reset, so make runs
+this script again next time.
+
+Usage:
+    python3 tools/build_scenes.py sistemi_lineari --quality ql --manim manim
+    python3 tools/build_scenes.py sistemi_lineari --scene CramerTeoriaEsempio
+    python3 tools/build_scenes.py sistemi_lineari --dry-run
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from common import MEDIA_DIR, QUALITIES, RENDER_SOCKET, find_topic, relative
+from fingerprint import topic_fingerprints
+import render_client
+import telemetry
+
+DB_NAME = "scenes.json"
+DB_VERSION = 1
+
+
+def db_path(topic, quality):
+    """Database di build dell'argomento per la qualità ``quality``."""
+    return MEDIA_DIR / topic.path / "videos" / QUALITIES[quality]["dir"] / DB_NAME
+
+
+def load_db(topic, quality):
+    path = db_path(topic, quality)
+    try:
+        db = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        db = {}
+    if db.get("version") != DB_VERSION:
+        db = {"version": DB_VERSION, "topic": topic.path, "quality": quality, "scenes": {}}
+    return db
+
+
+def save_db(topic, quality, db):
+    """Scrittura atomica (file temporaneo + rename): make non vede mai un file a metà."""
+    path = db_path(topic, quality)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(db, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def video_path(topic, quality, scene):
+    """Video prodotto da Manim per ``scene``."""
+    return topic.videos_dir(quality) / f"{scene}.mp4"
+
+
+def stale_scenes(topic, quality, db, fingerprints, force=False):
+    """Scene da renderizzare: impronta cambiata, mai costruite o video mancante."""
+    stale = []
+    for scene, fp in fingerprints.items():
+        entry = db["scenes"].get(scene)
+        if (force or entry is None or entry.get("fingerprint") != fp
+                or not video_path(topic, quality, scene).is_file()):
+            stale.append(scene)
+    return stale
+
+
+def record_scene(db, scene, fingerprint, seconds, **extra):
+    """Registra nel database una scena appena costruita."""
+    db["scenes"][scene] = {
+        "fingerprint": fingerprint,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seconds": seconds,
+        **extra,
+    }
+
+
+def mark_incomplete(topic, quality, db, fingerprints):
+    """
+    Se restano scene da costruire, azzera la data del database: il target Make
+    dell'argomento risulta vecchio e make rilancia il build la volta successiva.
+    """
+    path = db_path(topic, quality)
+    if path.is_file() and stale_scenes(topic, quality, db, fingerprints):
+        os.utime(path, (0, 0))
+
+
+def manim_command(manim, topic, quality, scenes):
+    """Riga di comando Manim (da eseguire nella cartella dell'argomento)."""
+    q = QUALITIES[quality]
+    return [manim, "--media_dir", str(topic.media_dir),
+            "--resolution", q["resolution"], "--frame_rate", str(q["fps"]),
+            topic.source.name, *scenes]
+
+
+def render_with_manim(topic, quality, scenes, manim="manim"):
+    """
+    Renderizza ``scenes`` con un solo processo ``manim``.
+
+    Returns:
+    --------
+    dict
+        ``{scena: secondi}`` per le scene il cui video è stato (ri)scritto
+    """
+    command, metrics_file = telemetry.probe_command(
+        manim, manim_command(manim, topic, quality, scenes))
+    start = time.time()
+    subprocess.run(command, cwd=topic.directory)
+    seconds = round((time.time() - start) / len(scenes), 2)
+    metrics = telemetry.read_probe(metrics_file)
+    built = {}
+    for scene in scenes:
+        video = video_path(topic, quality, scene)
+        if video.is_file() and video.stat().st_mtime >= start - 1:
+            # Con la sonda si conosce la durata della singola scena
+            built[scene] = round(metrics[scene]["wall_seconds"], 2) if scene in metrics else seconds
+            telemetry.record(topic, quality, scene, built[scene], metrics.get(scene))
+    return built
+
+
+def render_with_server(topic, quality, scenes, socket_path=RENDER_SOCKET):
+    """
+    Renderizza ``scenes`` sul render server (una scena per job, in parallelo).
+
+    Returns:
+    --------
+    dict
+        ``{scena: secondi}`` per le scene completate
+    """
+    jobs = [{"file": str(topic.source), "scene": s, "quality": quality,
+             "media_dir": str(topic.media_dir)} for s in scenes]
+    built = {}
+    for result in render_client.submit(jobs, socket_path):
+        if result["ok"]:
+            print(f"  ✓ {result['scene']} ({result['seconds']}s)")
+            built[result["scene"]] = result["seconds"]
+            telemetry.record(topic, quality, result["scene"], result["seconds"],
+                             result.get("metrics"), backend="server")
+        else:
+            print(f"  ✗ {result['scene']} ({result['seconds']}s)\n{result['error']}")
+    return built
+
+
+def build_topic(topic, quality, manim="manim", only=None, force=False, dry_run=False,
+                socket_path=RENDER_SOCKET):
+    """
+    Renderizza le scene non aggiornate di ``topic``.
+
+    Parameters:
+    -----------
+    topic : Topic
+        Argomento da costruire
+    quality : str
+        ql, qm, qh o qk
+    manim : str
+        Eseguibile di Manim
+    only : list of str
+        Limita il build a queste scene (come ``CLASS=`` nel Makefile)
+    force : bool
+        Renderizza anche le scene aggiornate
+    dry_run : bool
+        Mostra solo cosa verrebbe renderizzato
+    socket_path : Path
+        Socket del render server: se c'è un server in ascolto le scene vengono
+        renderizzate lì, altrimenti con ``manim``
+
+    Returns:
+    --------
+    bool
+        True se tutte le scene richieste sono state costruite
+    """
+    fingerprints = topic_fingerprints(topic)
+    if only:
+        missing = [s for s in only if s not in fingerprints]
+        if missing:
+            print(f"Errore: scene non trovate in {relative(topic.source)}: {', '.join(missing)}")
+            return False
+
+    db = load_db(topic, quality)
+    # Scene rimosse dal sorgente: fuori dal database (i video restano)
+    for scene in list(db["scenes"]):
+        if scene not in fingerprints:
+            del db["scenes"][scene]
+
+    stale = stale_scenes(topic, quality, db, fingerprints, force=force)
+    todo = [s for s in stale if not only or s in only]
+    up_to_date = len(fingerprints) - len(stale)
+    print(f"{topic.path} [{quality}]: {len(todo)} scene da renderizzare, "
+          f"{up_to_date} già aggiornate")
+    for scene in todo:
+        print(f"  - {scene}")
+
+    if dry_run:
+        return True
+
+    built = {}
+    if todo:
+        status = render_client.ping(socket_path) if socket_path else None
+        if status is not None:
+            print(f"Render server attivo ({status['workers']} worker): invio {len(todo)} job")
+            built = render_with_server(topic, quality, todo, socket_path)
+        else:
+            built = render_with_manim(topic, quality, todo, manim)
+        for scene, seconds in built.items():
+            record_scene(db, scene, fingerprints[scene], seconds)
+    ok = all(scene in built for scene in todo)
+
+    save_db(topic, quality, db)
+    mark_incomplete(topic, quality, db, fingerprints)
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Renderizza solo le scene di un argomento il cui contenuto è cambiato."
+    )
+    parser.add_argument("topic", help="nome dell'argomento (es. sistemi_lineari)")
+    parser.add_argument("--quality", default="ql", choices=sorted(QUALITIES))
+    parser.add_argument("--manim", default="manim", help="eseguibile di Manim")
+    parser.add_argument("--scene", action="append", default=[],
+                        help="costruisci solo questa scena (ripetibile)")
+    parser.add_argument("--force", action="store_true",
+                        help="renderizza tutte le scene selezionate anche se aggiornate")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="mostra le scene da renderizzare senza eseguire Manim")
+    parser.add_argument("--socket", default=str(RENDER_SOCKET),
+                        help="socket del render server, usato se attivo (\"\" per disattivarlo)")
+    args = parser.parse_args(argv)
+
+    ok = build_topic(find_topic(args.topic), args.quality, manim=args.manim,
+                     only=args.scene, force=args.force, dry_run=args.dry_run,
+                     socket_path=args.socket)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cache Keys - CI cache keys from the exact inputs of each topic
+
+A topic's rendered media depend on: its <topic>.py, the modules of the
+`animations` package it imports (transitively), its manim.cfg, the Manim
+command line used for the quality, and the toolchain (docker/Dockerfile.ci,
+docker/tex-packages.txt and requirements.txt, which also define the CI image,
+plus --toolchain: neither requirements.txt nor the TeX Live installer pin
+versions, so CI passes a hash of the versions actually installed in the
+image, /opt/toolchain-versions.txt). This script hashes
+exactly those inputs, so the CI cache is reused whenever nothing relevant
+changed (editing another topic, a README or a test scene) and is never reused
+when something did (editing animations/gas_module.py busts only the topics
+that import it).
+
+The hashes of the files come from the scene registry (scene_registry.py),
+which already tracks the dependencies of every topic.
+
+Usage:
+    python3 tools/cache_keys.py --quality qh             # chiave per argomento
+    python3 tools/cache_keys.py --quality qh --matrix    # matrice per GitHub Actions
+    python3 tools/cache_keys.py --quality ql gas_perfetto --explain
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+
+from build_scenes import manim_command
+from common import QUALITIES, ROOT, discover_topics, find_topic
+from scene_registry import file_hash, update_registry
+
+# File che definiscono la toolchain di rendering (immagine CI: Manim, LaTeX, ffmpeg)
+TOOLCHAIN_FILES = ("docker/Dockerfile.ci", "docker/tex-packages.txt", "requirements.txt")
+
+# Da incrementare solo se cambia il modo di renderizzare in un modo che i file
+# sopra non catturano
+CACHE_EPOCH = 1
+
+
+def toolchain_inputs(extra=None):
+    """Hash dei file della toolchain (più ``extra``, es. ``manim --version``)."""
+    inputs = {name: file_hash(ROOT / name) for name in TOOLCHAIN_FILES if (ROOT / name).is_file()}
+    if extra:
+        inputs["extra"] = extra
+    return inputs
+
+
+def _command(topic, quality):
+    """Riga di comando di Manim per la qualità, senza percorsi assoluti."""
+    return [arg.replace(str(ROOT) + "/", "") for arg in manim_command("manim", topic, quality, [])]
+
+
+def key_inputs(topic, quality, entry, toolchain):
+    """Tutto ciò da cui dipendono i media di ``topic`` a qualità ``quality``."""
+    return {
+        "epoch": CACHE_EPOCH,
+        "quality": quality,
+        "command": _command(topic, quality),
+        "inputs": {rel: data["sha256"] for rel, data in sorted(entry["inputs"].items())},
+        "toolchain": toolchain,
+    }
+
+
+def cache_key(topic, quality, entry, toolchain):
+    """Chiave di cache ``media-<qualità>-<disciplina>-<argomento>-<hash>``."""
+    payload = json.dumps(key_inputs(topic, quality, entry, toolchain), sort_keys=True)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+    return f"media-{quality}-{topic.discipline}-{topic.name}-{digest}"
+
+
+def scene_key(topic, quality, fingerprint, toolchain):
+    """
+    Chiave di una singola scena: la sua impronta (fingerprint.py, che copre già
+    classe, helper, moduli importati e manim.cfg) più qualità, riga di comando
+    e toolchain.
+    """
+    payload = json.dumps({"epoch": CACHE_EPOCH, "quality": quality,
+                          "command": _command(topic, quality), "fingerprint": fingerprint,
+                          "toolchain": toolchain}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def topic_keys(topics, quality, extra=None):
+    """``[(topic, voce del registro, chiave)]`` per ``topics``."""
+    registry, _ = update_registry(topics)
+    toolchain = toolchain_inputs(extra)
+    result = []
+    for topic in topics if topics is not None else discover_topics():
+        entry = registry["topics"][topic.path]
+        result.append((topic, entry, cache_key(topic, quality, entry, toolchain)))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chiavi di cache CI dagli input esatti.")
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--quality", required=True, choices=sorted(QUALITIES))
+    parser.add_argument("--toolchain", default=None,
+                        help="stringa aggiuntiva per la toolchain (es. hash delle versioni "
+                             "installate nell'immagine CI)")
+    parser.add_argument("--matrix", action="store_true",
+                        help="stampa la matrice {\"include\": [...]} con la chiave di ogni argomento")
+    parser.add_argument("--explain", action="store_true", help="mostra gli input di ogni chiave")
+    args = parser.parse_args(argv)
+
+    topics = [find_topic(t) for t in args.topics] if args.topics else None
+    keys = topic_keys(topics, args.quality, args.toolchain)
+    if args.matrix:
+        print(json.dumps({"include": [
+            {"discipline": t.discipline, "topic": t.name, "cache_key": key}
+            for t, entry, key in keys if entry["scenes"]
+        ]}))
+        return 0
+    toolchain = toolchain_inputs(args.toolchain)
+    for topic, entry, key in keys:
+        print(key)
+        if args.explain:
+            inputs = key_inputs(topic, args.quality, entry, toolchain)
+            for rel, digest in inputs["inputs"].items():
+                print(f"    {digest[:12]}  {rel}")
+            for name, digest in inputs["toolchain"].items():
+                print(f"    {digest[:12]}  {name} (toolchain)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+CI Shards - Scene-level CI sharding balanced by recorded render times
+
+With one CI job per topic the heavy topics (sistemi_lineari, gas_perfetto,
+diffrazione, onde) set the critical path. This script splits the work by
+scene instead, in three steps:
+
+- plan (discover job): every scene whose per-scene cache key
+  (cache_keys.scene_key: fingerprint + quality + toolchain) differs from the
+  one recorded in the build database of the media store is to be rendered.
+  Those scenes are packed into at most --shards bundles of roughly equal
+  estimated duration (longest first into the least loaded bundle), using
+  the render and web encoding times recorded in the build databases:
+  encoding scales with video length and resolution, not with the render
+  time. Output: the job matrix.
+- render (one job per bundle): renders the scenes of a bundle, re-encodes
+  them for the web with --profile (encode_web.py, in parallel across the
+  bundles) and writes their durations and encoding entries to
+  media/.ci-shards/<n>.json. A bundle has no media store, so its
+  encodes.json files would list only its own scenes: they are removed, and
+  collect merges the entries scene by scene.
+- collect (deploy job): records the rendered scenes in the build databases
+  of the media store, with their key, render and encoding time (the timings
+  of the next plan), merges the encoding entries into the store's encodes.json and
+  removes the videos of scenes and topics that no longer exist.
+
+The media store is the whole media/ tree at one quality, cached by CI: a
+scene is rendered again only when its own inputs changed.
+
+Usage:
+    python3 tools/ci_shards.py plan --quality qh --shards 8
+    python3 tools/ci_shards.py render --quality qh --profile web --scenes "fisica/onde:IntroOnde ..."
+    python3 tools/ci_shards.py collect --quality qh
+"""
+
+import argparse
+import heapq
+import json
+import math
+import shutil
+import statistics
+import sys
+
+import encode_web
+from build_scenes import load_db, record_scene, render_with_manim, save_db, video_path
+from cache_keys import scene_key, toolchain_inputs
+from common import MEDIA_DIR, QUALITIES, discover_topics, find_topic
+from fingerprint import topic_fingerprints
+from render_all import DEFAULT_SECONDS, estimate_seconds, load_history
+
+SHARDS_DIR = MEDIA_DIR / ".ci-shards"
+
+
+def current_keys(topics, quality, toolchain):
+    """``{topic.path: {scena: (impronta, chiave)}}`` per lo stato attuale dei sorgenti."""
+    keys = {}
+    for topic in topics:
+        keys[topic.path] = {scene: (fp, scene_key(topic, quality, fp, toolchain))
+                            for scene, fp in topic_fingerprints(topic).items()}
+    return keys
+
+
+def pack(items, bins):
+    """
+    Distribuisce ``items`` (``(peso, valore)``) su ``bins`` gruppi di peso simile.
+
+    Euristica LPT: dal più pesante, ogni elemento va al gruppo meno carico.
+
+    Returns:
+    --------
+    list of tuple
+        ``(peso totale, [valori])`` per ogni gruppo non vuoto
+    """
+    heap = [(0.0, i, []) for i in range(bins)]
+    for weight, value in sorted(items, key=lambda item: item[0], reverse=True):
+        load, i, values = heapq.heappop(heap)
+        values.append(value)
+        heapq.heappush(heap, (load + weight, i, values))
+    return sorted(((load, values) for load, _, values in heap if values),
+                  key=lambda group: group[0], reverse=True)
+
+
+def encode_seconds(entry):
+    """Secondi di codifica web di una scena (somma dei codec di ``encodes.json``)."""
+    times = [r.get("seconds") for r in (entry or {}).get("renditions", {}).values()]
+    return round(sum(t for t in times if t), 2) if any(times) else None
+
+
+def plan(quality, max_shards=8, target_seconds=600, extra=None):
+    """
+    Scene da renderizzare e loro suddivisione in gruppi.
+
+    Parameters:
+    -----------
+    quality : str
+        ql, qm, qh o qk
+    max_shards : int
+        Numero massimo di job di build
+    target_seconds : float
+        Durata stimata desiderata per job: con poco lavoro si usano meno job
+    extra : str
+        Stringa aggiuntiva della toolchain (vedi cache_keys.py)
+
+    Returns:
+    --------
+    list of dict
+        ``shard``, ``shards``, ``estimate`` (secondi) e ``scenes`` (stringa
+        ``disciplina/argomento:Scena`` separate da spazi) per ogni job
+    """
+    topics = discover_topics()
+    keys = current_keys(topics, quality, toolchain_inputs(extra))
+    history = load_history(topics)
+
+    todo = []
+    for topic in topics:
+        recorded = load_db(topic, quality)["scenes"]
+        for scene, (_, key) in keys[topic.path].items():
+            if recorded.get(scene, {}).get("ci_key") != key:
+                todo.append((estimate_seconds(topic, scene, quality, history),
+                             recorded.get(scene, {}).get("encode_seconds"),
+                             f"{topic.path}:{scene}"))
+    if not todo:
+        return []
+
+    # Render più codifica web (se i gruppi hanno già codificato la scena)
+    known = [e for e, _, _ in todo if e is not None]
+    fallback = statistics.median(known) if known else DEFAULT_SECONDS
+    encoded = [e for _, e, _ in todo if e is not None]
+    encode_fallback = statistics.median(encoded) if encoded else 0
+    todo = [((e if e is not None else fallback) + (enc if enc is not None else encode_fallback),
+             label) for e, enc, label in todo]
+    total = sum(e for e, _ in todo)
+    shards = max(1, min(max_shards, len(todo), math.ceil(total / target_seconds)))
+    groups = pack(todo, shards)
+    return [{"shard": i + 1, "shards": len(groups), "estimate": round(load),
+             "scenes": " ".join(sorted(labels))}
+            for i, (load, labels) in enumerate(groups)]
+
+
+def _parse_labels(scenes):
+    """``"fisica/onde:IntroOnde ..."`` -> ``[(Topic, [scena, ...])]``."""
+    by_topic = {}
+    for label in scenes.split():
+        path, _, scene = label.partition(":")
+        by_topic.setdefault(path, []).append(scene)
+    return [(find_topic(path), names) for path, names in by_topic.items()]
+
+
+def render_shard(quality, scenes, shard, manim="manim", profile=None):
+    """
+    Renderizza le scene di un gruppo e ne registra le durate in ``.ci-shards/``;
+    con ``profile`` le ricodifica anche per il web (encode_web.py).
+    """
+    durations = {}
+    parsed = _parse_labels(scenes)
+    for topic, names in parsed:
+        print(f"{topic.path} [{quality}]: {', '.join(names)}", flush=True)
+        built = render_with_manim(topic, quality, names, manim)
+        durations.update({f"{topic.path}:{scene}": seconds for scene, seconds in built.items()})
+    encoded, encodes = True, {}
+    if profile:
+        work, _ = encode_web.pending([t for t, _ in parsed], [quality], profile, set(durations))
+        encoded = encode_web.encode(work, profile)
+        for topic, names in parsed:
+            encodes[topic.path] = encode_web.export_entries(topic, quality, names)
+            # Database parziale (solo le scene del gruppo): non deve arrivare
+            # al media store, dove sostituirebbe quello completo
+            encode_web.db_path(topic, quality).unlink(missing_ok=True)
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    (SHARDS_DIR / f"{shard}.json").write_text(
+        json.dumps({"quality": quality, "durations": durations, "encodes": encodes}, indent=2)
+        + "\n", encoding="utf-8")
+    missing = [s for s in scenes.split() if s not in durations]
+    if missing:
+        print(f"Scene non renderizzate ({len(missing)}): {', '.join(missing)}")
+    return not missing and encoded
+
+
+def prune_store(topics, quality, keys):
+    """Elimina dal media store i video di scene e argomenti che non esistono più."""
+    known = {t.path for t in topics}
+    removed = 0
+    for videos in MEDIA_DIR.glob("*/videos/*"):
+        path = f"{videos.parent.parent.name}/{videos.name}"
+        if path not in known and videos.is_dir():
+            shutil.rmtree(videos)
+            shutil.rmtree(MEDIA_DIR / path, ignore_errors=True)
+            removed += 1
+    for topic in topics:
+        directory = topic.videos_dir(quality)
+        if directory.is_dir():
+            for video in directory.glob("*.mp4"):
+                if video.stem not in keys[topic.path]:
+                    video.unlink()
+                    removed += 1
+    return removed
+
+
+def collect(quality, extra=None):
+    """
+    Registra nei database di build le scene renderizzate dai gruppi.
+
+    Returns:
+    --------
+    bool
+        True se ogni scena ha un video aggiornato
+    """
+    durations, encodes = {}, {}
+    for result in sorted(SHARDS_DIR.glob("*.json")):
+        data = json.loads(result.read_text(encoding="utf-8"))
+        if data.get("quality") == quality:
+            durations.update(data["durations"])
+            for path, entries in data.get("encodes", {}).items():
+                encodes.setdefault(path, {}).update(entries)
+
+    topics = discover_topics()
+    keys = current_keys(topics, quality, toolchain_inputs(extra))
+    stale, recorded = [], 0
+    for topic in topics:
+        db = load_db(topic, quality)
+        db["scenes"] = {s: e for s, e in db["scenes"].items() if s in keys[topic.path]}
+        for scene, (fp, key) in keys[topic.path].items():
+            label = f"{topic.path}:{scene}"
+            if label in durations and video_path(topic, quality, scene).is_file():
+                # Tempo di codifica del gruppo, o quello precedente se la
+                # codifica era già aggiornata
+                seconds = encode_seconds(encodes.get(topic.path, {}).get(scene))
+                seconds = seconds or db["scenes"].get(scene, {}).get("encode_seconds")
+                record_scene(db, scene, fp, durations[label], ci_key=key,
+                             **({"encode_seconds": seconds} if seconds else {}))
+                recorded += 1
+            elif db["scenes"].get(scene, {}).get("ci_key") != key:
+                stale.append(label)
+        save_db(topic, quality, db)
+        encode_web.merge_entries(topic, quality, encodes.get(topic.path))
+
+    removed = prune_store(topics, quality, keys)
+    shutil.rmtree(SHARDS_DIR, ignore_errors=True)
+    print(f"Registrate {recorded} scene renderizzate, {removed} video obsoleti rimossi")
+    if stale:
+        print(f"Scene senza video aggiornato ({len(stale)}): {', '.join(stale)}")
+    return not stale
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suddivisione per scena dei job di build CI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_plan = sub.add_parser("plan", help="matrice dei gruppi di scene da renderizzare")
+    p_render = sub.add_parser("render", help="renderizza un gruppo di scene")
+    p_collect = sub.add_parser("collect", help="registra le scene renderizzate nel media store")
+    for p in (p_plan, p_render, p_collect):
+        p.add_argument("--quality", required=True, choices=sorted(QUALITIES))
+    for p in (p_plan, p_collect):
+        p.add_argument("--toolchain", default=None,
+                       help="stringa aggiuntiva per la toolchain (vedi cache_keys.py)")
+    p_plan.add_argument("--shards", type=int, default=8, help="numero massimo di job (default: 8)")
+    p_plan.add_argument("--target-minutes", type=float, default=10,
+                        help="durata stimata desiderata per job (default: 10)")
+    p_render.add_argument("--scenes", required=True,
+                          help="scene del gruppo: disciplina/argomento:Scena separate da spazi")
+    p_render.add_argument("--shard", default="1", help="identificativo del gruppo")
+    p_render.add_argument("--manim", default="manim", help="eseguibile di Manim")
+    p_render.add_argument("--profile", default=None, choices=sorted(encode_web.PROFILES),
+                          help="ricodifica le scene per il web con questo profilo")
+    args = parser.parse_args(argv)
+
+    if args.command == "plan":
+        shards = plan(args.quality, args.shards, args.target_minutes * 60, args.toolchain)
+        print(json.dumps({"include": shards}))
+        for shard in shards:
+            print(f"gruppo {shard['shard']}/{shard['shards']}: ~{shard['estimate']}s, "
+                  f"{len(shard['scenes'].split())} scene", file=sys.stderr)
+        return 0
+    if args.command == "render":
+        return 0 if render_shard(args.quality, args.scenes, args.shard, args.manim, args.profile) else 1
+    return 0 if collect(args.quality, args.toolchain) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
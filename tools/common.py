@@ -0,0 +1,265 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Common - Shared paths and topic discovery for the build tools
+
+The scripts in tools/ are plain Python (standard library only) so they can
+run both locally and in CI without the Manim virtualenv. This module holds
+what they all need: the project layout, the quality table (the same one as
+the Makefile) and the topic auto-discovery (the same rule as the Makefile and
+the CI workflow: a folder animations/<discipline>/<topic>/ with <topic>.py).
+It also holds the pieces shared by the ffmpeg stages (transcode, encode_web,
+package_hls, posters): their versioned JSON databases and the thread pool
+that runs one ffmpeg per job and prints the progress.
+
+Usage:
+    from common import ROOT, discover_topics, find_topic
+
+    for topic in discover_topics():
+        print(topic.name, topic.source)
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+ANIMATIONS_DIR = ROOT / "animations"
+MEDIA_DIR = ROOT / "media"
+
+# Socket del render server (render_server.py / render_client.py)
+RENDER_SOCKET = MEDIA_DIR / ".render.sock"
+
+DISCIPLINES = ("matematica", "fisica")
+
+# Stessa tabella del Makefile (formato verticale 9:16): la cartella di output
+# di Manim prende il nome dall'altezza e dal frame rate.
+QUALITIES = {
+    "ql": {"dir": "854p15", "resolution": "480,854", "fps": 15},
+    "qm": {"dir": "1280p30", "resolution": "720,1280", "fps": 30},
+    "qh": {"dir": "1920p60", "resolution": "1080,1920", "fps": 60},
+    "qk": {"dir": "3840p60", "resolution": "2160,3840", "fps": 60},
+}
+
+
+class Topic:
+    """
+    Un argomento: cartella ``animations/<discipline>/<name>/`` con ``<name>.py``.
+
+    Parameters:
+    -----------
+    discipline : str
+        ``matematica`` o ``fisica``
+    name : str
+        Nome dell'argomento (= nome della cartella e del file .py)
+    """
+
+    def __init__(self, discipline, name):
+        self.discipline = discipline
+        self.name = name
+
+    def __repr__(self):
+        return f"Topic({self.path!r})"
+
+    @property
+    def path(self):
+        """Percorso relativo ``<discipline>/<name>`` (come ANIM_PATH nel Makefile)."""
+        return f"{self.discipline}/{self.name}"
+
+    @property
+    def directory(self):
+        return ANIMATIONS_DIR / self.discipline / self.name
+
+    @property
+    def source(self):
+        return self.directory / f"{self.name}.py"
+
+    @property
+    def config(self):
+        """``manim.cfg`` dell'argomento (può mancare)."""
+        return self.directory / "manim.cfg"
+
+    @property
+    def media_dir(self):
+        """``--media_dir`` passato a Manim: ``media/<discipline>``."""
+        return MEDIA_DIR / self.discipline
+
+    def videos_dir(self, quality):
+        """Cartella dei video Manim per la qualità ``quality`` (ql, qm, qh, qk)."""
+        return self.media_dir / "videos" / self.name / QUALITIES[quality]["dir"]
+
+    def web_dir(self, quality):
+        """Cartella dei video ricodificati per il web (encode_web.py) per ``quality``."""
+        return self.media_dir / "web" / self.name / QUALITIES[quality]["dir"]
+
+    @property
+    def hls_dir(self):
+        """Cartella dei pacchetti HLS delle scene (package_hls.py)."""
+        return self.media_dir / "hls" / self.name
+
+    @property
+    def posters_dir(self):
+        """Cartella dei poster e delle anteprime delle scene (posters.py)."""
+        return self.media_dir / "posters" / self.name
+
+
+def discover_topics():
+    """Tutti gli argomenti, in ordine (disciplina, nome)."""
+    topics = []
+    for disc in DISCIPLINES:
+        base = ANIMATIONS_DIR / disc
+        if not base.is_dir():
+            continue
+        for name in sorted(os.listdir(base)):
+            if (base / name / f"{name}.py").is_file():
+                topics.append(Topic(disc, name))
+    return topics
+
+
+def find_topic(name):
+    """Argomento per nome (``gas_perfetto``) o percorso (``fisica/gas_perfetto``)."""
+    for topic in discover_topics():
+        if name in (topic.name, topic.path):
+            return topic
+    raise SystemExit(f"Errore: animazione '{name}' non trovata in {ANIMATIONS_DIR}")
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """SHA-256 del contenuto di ``path`` (esadecimale)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def relative(path):
+    """Percorso relativo alla root del progetto (come lo scrive il Makefile)."""
+    return Path(path).resolve().relative_to(ROOT).as_posix()
+
+
+def read_db(path, version):
+    """
+    Database JSON versionato ``path`` (``{"version": ..., "scenes": {...}}``),
+    vuoto se manca, è illeggibile o è di un'altra versione.
+
+    Returns:
+    --------
+    tuple
+        ``(database, completo)``: ``completo`` è False se il file c'è ma non
+        si è potuto leggere e il database è vuoto
+    """
+    try:
+        db = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        db = {}
+    if db.get("version") != version:
+        return {"version": version, "scenes": {}}, not path.exists()
+    return db, True
+
+
+def write_db(path, db):
+    """Scrittura atomica (file temporaneo + rename) di un database JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(db, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def prune_db(db, sources, directory, known):
+    """
+    Elimina da ``db`` le scene senza più sorgente e da ``directory`` i file e
+    le cartelle che il database non registra.
+
+    Parameters:
+    -----------
+    db : dict
+        Database completo della cartella (con uno parziale si eliminerebbero
+        file validi)
+    sources : iterable of str
+        Scene che hanno ancora una sorgente
+    directory : Path
+        Cartella dei file prodotti
+    known : callable
+        ``known(db)`` -> nomi da tenere in ``directory`` (database compreso),
+        calcolati dopo aver tolto le scene; i nomi nascosti restano sempre
+
+    Returns:
+    --------
+    bool
+        True se il database è cambiato
+    """
+    changed = False
+    for scene in [s for s in db["scenes"] if s not in sources]:
+        del db["scenes"][scene]
+        changed = True
+    if directory.is_dir():
+        keep = known(db)
+        for path in directory.iterdir():
+            if path.name.startswith(".") or path.name in keep:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+    return changed
+
+
+def run_parallel(work, task, workers, label, done):
+    """
+    Esegue ``task`` su ogni lavoro di ``work`` in un pool di thread (ognuno
+    lancia il suo processo ffmpeg) e stampa l'avanzamento
+    ``[fatti/totale] ✓/✗ etichetta``.
+
+    Parameters:
+    -----------
+    work : list
+        Lavori da eseguire
+    task : callable
+        ``task(job)`` -> ``(job, risultato, errore)``; risultato None se il
+        lavoro è fallito (si stampa ``errore``)
+    workers : int
+        Thread del pool
+    label : callable
+        ``label(job)`` -> etichetta del lavoro
+    done : callable
+        ``done(job, risultato)`` registra un lavoro riuscito (sotto lock) e
+        restituisce il dettaglio da stampare dopo l'etichetta
+
+    Returns:
+    --------
+    bool
+        True se tutti i lavori sono riusciti
+    """
+    lock = threading.Lock()
+    ok, count = True, 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(task, job) for job in work]
+        for future in concurrent.futures.as_completed(futures):
+            job, result, error = future.result()
+            count += 1
+            if result is None:
+                ok = False
+                print(f"[{count}/{len(work)}] ✗ {label(job)}", flush=True)
+                print(error, flush=True)
+                continue
+            with lock:
+                detail = done(job, result)
+            print(f"[{count}/{len(work)}] ✓ {label(job)} {detail}", flush=True)
+    return ok
@@ -0,0 +1,266 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Deploy Media - Incremental deploy of the rendered videos
+
+Diffs the media manifest (media_manifest.py) against the manifest of the
+previous deploy, which is published with the site
+(<site>/media/media-manifest.json), and derives the minimal upload set:
+only videos whose SHA-256 the remote has never seen are uploaded, every
+other video is reused as is.
+
+Remotes are content-addressed: a video is stored once under its hash,
+whatever its path, and the deployed manifest maps paths to hashes.
+- DirectoryRemote: a local directory (objects/<aa>/<sha256>.<ext> plus
+  media-manifest.json), a stand-in for the remote to test deploys locally.
+- the deployed site (read only): the previous manifest is downloaded from
+  its URL. Vercel also stores the files of a deployment by content hash,
+  so deploying without a tgz archive uploads only the videos in the plan.
+
+stage replaces the full copy of media/ into the site: it links only the
+published files (no Manim intermediates), the videos and posters under
+their content-hashed names and the HLS packages in content-hashed directories
+(the urls in the manifest, served as immutable, see frontend/vercel.json)
+and the JSON indexes.
+
+Usage:
+    python3 tools/deploy_media.py plan --previous https://formule-in-movimento.celata.com
+    python3 tools/deploy_media.py push --remote /tmp/remote-media
+    python3 tools/deploy_media.py stage --dest frontend/dist/media
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from common import MEDIA_DIR, ROOT, relative
+from media_gc import format_size
+from media_manifest import (MANIFEST_PATH, load_manifest, poster_files, published_files,
+                            published_path, stream_files)
+
+MANIFEST_NAME = MANIFEST_PATH.name
+# Indici JSON pubblicati con i video (letti dal frontend)
+INDEXES = (MANIFEST_NAME, "scene-registry.json")
+
+
+def published(manifest):
+    """
+    ``{percorso: (sha256, byte, nome pubblicato)}`` dei file pubblicati del
+    manifest (percorsi relativi a media/): i video web se ci sono, altrimenti
+    quelli di Manim, i file dei pacchetti HLS, i poster e le anteprime.
+    """
+    files = {}
+    for topic in manifest.get("topics", {}).values():
+        for scene in topic["scenes"].values():
+            for video in scene.values():
+                for item in published_files(video):
+                    files[item["path"]] = (item["sha256"], item["bytes"],
+                                           published_path(item["path"], item["sha256"]))
+        for poster in topic.get("posters", {}).values():
+            for item in poster_files(poster):
+                files[item["path"]] = (item["sha256"], item["bytes"],
+                                       published_path(item["path"], item["sha256"]))
+        for stream in topic.get("hls", {}).values():
+            for item in stream_files(stream):
+                files[item["path"]] = (item["sha256"], item["bytes"], item["name"])
+    return files
+
+
+def diff(previous, current):
+    """
+    Confronta due manifest.
+
+    Returns:
+    --------
+    dict
+        ``upload`` (percorsi con un contenuto mai caricato), ``reuse``
+        (contenuto già sul remoto, anche se con un altro percorso),
+        ``remove`` (percorsi non più pubblicati) e ``bytes`` da caricare
+    """
+    old, new = published(previous), published(current)
+    known = {sha for sha, *_ in old.values()}
+    upload, reuse, planned = [], [], set()
+    for path, (sha, *_) in sorted(new.items()):
+        if sha in known or sha in planned:
+            reuse.append(path)
+        else:
+            upload.append(path)
+            planned.add(sha)
+    return {
+        "upload": upload,
+        "reuse": reuse,
+        "remove": sorted(set(old) - set(new)),
+        "bytes": sum(new[path][1] for path in upload),
+    }
+
+
+class DirectoryRemote:
+    """Remoto su cartella locale: oggetti per hash più il manifest pubblicato."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _object(self, sha, suffix=".mp4"):
+        return self.root / "objects" / sha[:2] / f"{sha}{suffix}"
+
+    def load_manifest(self):
+        return load_manifest(self.root / MANIFEST_NAME)
+
+    def has(self, sha, suffix=".mp4"):
+        return self._object(sha, suffix).is_file()
+
+    def put(self, sha, source):
+        target = self._object(sha, Path(source).suffix)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+
+    def save_manifest(self, manifest):
+        # Per ultimo e atomico: chi legge il manifest trova sempre i suoi oggetti
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{MANIFEST_NAME}.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, self.root / MANIFEST_NAME)
+
+    def prune(self, keep):
+        """Elimina gli oggetti non referenziati da ``keep`` (insieme di hash)."""
+        removed = 0
+        for obj in (self.root / "objects").glob("*/*"):
+            if obj.is_file() and obj.stem not in keep:
+                obj.unlink()
+                removed += 1
+        return removed
+
+
+def fetch_manifest(url, timeout=30):
+    """Manifest del deploy precedente da un sito pubblicato (vuoto se non raggiungibile)."""
+    url = url.rstrip("/")
+    if not url.endswith(".json"):
+        url += f"/media/{MANIFEST_NAME}"
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            manifest = json.loads(response.read().decode("utf-8"))
+    except (urllib.error.URLError, OSError, ValueError) as exc:
+        print(f"Manifest precedente non disponibile ({url}: {exc}): si carica tutto")
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def load_previous(source):
+    """Manifest precedente da URL, file o cartella di un ``DirectoryRemote``."""
+    if source.startswith(("http://", "https://")):
+        return fetch_manifest(source)
+    path = ROOT / source
+    return DirectoryRemote(path).load_manifest() if path.is_dir() else load_manifest(path)
+
+
+def push(remote, manifest, prune=False):
+    """
+    Carica su ``remote`` i soli video nuovi, poi il manifest.
+
+    Returns:
+    --------
+    dict
+        Il piano (vedi ``diff``)
+    """
+    plan = diff(remote.load_manifest(), manifest)
+    current = published(manifest)
+    for path in plan["upload"] + plan["reuse"]:
+        sha = current[path][0]
+        # Il manifest remoto potrebbe riferire oggetti persi: si verifica
+        if not remote.has(sha, Path(path).suffix):
+            remote.put(sha, MEDIA_DIR / path)
+    remote.save_manifest(manifest)
+    if prune:
+        plan["pruned"] = remote.prune({sha for sha, *_ in current.values()})
+    return plan
+
+
+def stage(dest, manifest):
+    """
+    Prepara ``dest`` (es. ``frontend/dist/media``) con i soli file pubblicati.
+
+    I file, con il nome pubblicato (hash del contenuto), sono hard link ai
+    file di media/ (copie se il filesystem non li supporta): niente
+    duplicazione su disco.
+    """
+    if dest.is_symlink() or dest.is_file():
+        dest.unlink()
+    elif dest.exists():
+        shutil.rmtree(dest)
+    files = {name: path for path, (_, _, name) in published(manifest).items()}
+    files.update({name: name for name in INDEXES if (MEDIA_DIR / name).is_file()})
+    for name, source in files.items():
+        target = dest / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(MEDIA_DIR / source, target)
+        except OSError:
+            shutil.copy2(MEDIA_DIR / source, target)
+    return len(files)
+
+
+def print_plan(plan):
+    print(f"Da caricare: {len(plan['upload'])} file ({format_size(plan['bytes'])})")
+    for path in plan["upload"]:
+        print(f"  + {path}")
+    print(f"Riusati: {len(plan['reuse'])} file")
+    if plan["remove"]:
+        print(f"Non più pubblicati: {len(plan['remove'])} file")
+        for path in plan["remove"]:
+            print(f"  - {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deploy incrementale dei video renderizzati.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_plan = sub.add_parser("plan", help="video da caricare rispetto al deploy precedente")
+    p_push = sub.add_parser("push", help="carica i video nuovi su un remoto a cartella")
+    p_stage = sub.add_parser("stage", help="prepara i media pubblicati nella dist del sito")
+    for p in (p_plan, p_push, p_stage):
+        p.add_argument("--manifest", default=str(MANIFEST_PATH),
+                       help=f"manifest corrente (default: {relative(MANIFEST_PATH)})")
+    p_plan.add_argument("--previous", required=True,
+                        help="manifest precedente: URL del sito, file o cartella del remoto")
+    p_push.add_argument("--remote", required=True, help="cartella del remoto")
+    p_push.add_argument("--prune", action="store_true", help="elimina gli oggetti non più usati")
+    p_stage.add_argument("--dest", required=True, help="cartella media del sito da pubblicare")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(ROOT / args.manifest)
+    if not manifest["topics"]:
+        print(f"Manifest vuoto: esegui prima make manifest ({relative(ROOT / args.manifest)})")
+        return 1
+    if args.command == "plan":
+        print_plan(diff(load_previous(args.previous), manifest))
+    elif args.command == "push":
+        plan = push(DirectoryRemote(ROOT / args.remote), manifest, args.prune)
+        print_plan(plan)
+        if "pruned" in plan:
+            print(f"Oggetti eliminati: {plan['pruned']}")
+    else:
+        count = stage(ROOT / args.dest, manifest)
+        print(f"Media pubblicati in {args.dest}: {count} file")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
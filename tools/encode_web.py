@@ -0,0 +1,590 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Encode Web - Web-tuned re-encoding of the rendered videos
+
+Manim encodes every quality with the same generic H.264 settings. Our videos
+are mostly flat backgrounds with thin strokes, which modern encoders
+compress much better with tuned settings. This post-render stage re-encodes
+the videos Manim wrote (media/<discipline>/videos/<topic>/<quality_dir>/
+<Scene>.mp4) into a codec ladder in media/<discipline>/web/<topic>/
+<quality_dir>/, with a named profile:
+
+- AV1 (SVT-AV1, <Scene>.av1.mp4) and VP9 (<Scene>.vp9.webm): far fewer bytes
+  for the same quality on browsers that decode them;
+- H.264 (<Scene>.mp4), the fallback every browser plays: x264 preset, tune
+  (animation) and CRF per quality, or an average bitrate in two passes
+  (predictable sizes);
+- a fixed keyframe interval (KEYINT_SECONDS), so seeking is fast and precise;
+- an explicit level per quality, so the player can announce the exact
+  codecs string;
+- +faststart (MP4) and cues first (WebM): playback starts before the whole
+  file is downloaded.
+
+Every (scene, quality, codec) is a separate ffmpeg job and the jobs run in
+parallel. Every encoded video is compared with the raw Manim output (SSIM, or
+VMAF when ffmpeg has libvmaf) and the savings are reported. Results are
+stored in encodes.json next to the videos, keyed by the SHA-256 of the source
+video and by the settings of each codec: a video is encoded again only when
+one of them changes. media_manifest.py publishes the web videos in place of
+the raw ones.
+
+Usage:
+    python3 tools/encode_web.py --quality qh                     # tutti gli argomenti
+    python3 tools/encode_web.py gas_perfetto --quality qh ql --profile web-2pass
+    python3 tools/encode_web.py --quality qh --metric vmaf --force
+    python3 tools/encode_web.py --quality qh --report             # solo riepilogo
+    python3 tools/encode_web.py --list-profiles
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from build_scenes import video_path
+from common import (MEDIA_DIR, QUALITIES, content_hash, discover_topics, find_topic, prune_db,
+                    read_db, run_parallel, write_db)
+from media_gc import format_size
+
+DB_NAME = "encodes.json"
+DB_VERSION = 2
+
+# Da incrementare se cambia il modo di codificare in un modo che i profili
+# non catturano (i video web vengono rifatti)
+ENCODE_EPOCH = 1
+
+# Un keyframe ogni KEYINT_SECONDS secondi
+KEYINT_SECONDS = 2
+
+# Codec dei video web, in ordine di preferenza per il player (il browser usa
+# il primo che supporta): AV1 e VP9 pesano meno a parità di qualità, H.264 lo
+# legge qualunque browser. AV1 sta in MP4 (anche Safari), VP9 in WebM.
+CODECS = {
+    "av1": {"encoder": "libsvtav1", "suffix": ".av1.mp4", "mime": "video/mp4"},
+    "vp9": {"encoder": "libvpx-vp9", "suffix": ".vp9.webm", "mime": "video/webm"},
+    "h264": {"encoder": "libx264", "suffix": ".mp4", "mime": "video/mp4"},
+}
+
+# Livelli per qualità (risoluzione e fps 9:16 di QUALITIES): per H.264 sono
+# imposti all'encoder, per tutti danno la stringa codecs annunciata al player
+H264_LEVELS = {"ql": "3.0", "qm": "3.1", "qh": "4.2", "qk": "5.2"}
+AV1_LEVELS = {"ql": "04", "qm": "05", "qh": "09", "qk": "13"}   # seq_level_idx: 3.0, 3.1, 4.1, 5.1
+VP9_LEVELS = {"ql": "21", "qm": "31", "qh": "41", "qk": "51"}
+
+# Profili di codifica: impostazioni per codec e qualità (i codec assenti non
+# vengono prodotti). Sfondi uniformi e tratti sottili: tune=animation per
+# x264 (più frame di riferimento, deblocking più leggero) e CRF più alti che
+# per riprese dal vero, senza artefatti visibili sui bordi. I preset di
+# SVT-AV1 vanno da 0 (lento) a 13, lo speed di libvpx (cpu-used) da 0 a 5. I
+# bitrate sono in kbit/s.
+PROFILES = {
+    "web": {
+        "description": "AV1, VP9 e H.264 a qualità costante (default del sito)",
+        "av1": {"preset": 8, "crf": {"ql": 42, "qm": 40, "qh": 38, "qk": 35}},
+        "vp9": {"speed": 2, "crf": {"ql": 40, "qm": 37, "qh": 35, "qk": 32}},
+        "h264": {"preset": "slow", "tune": "animation",
+                 "crf": {"ql": 28, "qm": 26, "qh": 24, "qk": 22}},
+    },
+    "web-fast": {
+        "description": "solo H.264, preset veryfast (anteprime)",
+        "h264": {"preset": "veryfast", "tune": "animation",
+                 "crf": {"ql": 28, "qm": 26, "qh": 24, "qk": 22}},
+    },
+    "web-2pass": {
+        "description": "VP9 e H.264 a bitrate medio in due passate (dimensioni prevedibili)",
+        "vp9": {"speed": 2, "bitrate": {"ql": 180, "qm": 420, "qh": 850, "qk": 2500}},
+        "h264": {"preset": "slow", "tune": "animation",
+                 "bitrate": {"ql": 250, "qm": 600, "qh": 1200, "qk": 3500}},
+    },
+}
+DEFAULT_PROFILE = "web"
+
+METRICS = ("ssim", "vmaf", "none")
+SSIM_SCORE = re.compile(r"SSIM .*All:([\d.]+)")
+VMAF_SCORE = re.compile(r"VMAF score[:=]\s*([\d.]+)")
+
+
+def profile_codecs(profile):
+    """Codec prodotti da ``profile``, in ordine di preferenza."""
+    return [codec for codec in CODECS if codec in PROFILES[profile]]
+
+
+def web_path(topic, quality, scene, codec="h264"):
+    """Video web di una scena per ``codec``."""
+    return topic.web_dir(quality) / f"{scene}{CODECS[codec]['suffix']}"
+
+
+def db_path(topic, quality):
+    return topic.web_dir(quality) / DB_NAME
+
+
+def _read_db(topic, quality):
+    """
+    ``(database, completo)``: ``completo`` è False se il file c'è ma non si è
+    potuto leggere (illeggibile o di un'altra versione) e il database è vuoto.
+    """
+    return read_db(db_path(topic, quality), DB_VERSION)
+
+
+def load_db(topic, quality):
+    """
+    Database di codifica, vuoto se manca o è di un'altra versione:
+    ``{"scenes": {scena: {"source_sha256": ..., "renditions": {codec: voce}}}}``.
+    """
+    return _read_db(topic, quality)[0]
+
+
+def save_db(topic, quality, db):
+    write_db(db_path(topic, quality), db)
+
+
+def settings(profile, quality, codec="h264"):
+    """Impostazioni effettive di ``profile`` per ``quality`` e ``codec``."""
+    spec = PROFILES[profile][codec]
+    return {
+        "encoder": CODECS[codec]["encoder"],
+        "preset": spec.get("preset"),
+        "tune": spec.get("tune"),
+        "speed": spec.get("speed"),
+        "crf": spec["crf"][quality] if "crf" in spec else None,
+        "bitrate": spec["bitrate"][quality] if "bitrate" in spec else None,
+        "keyint": KEYINT_SECONDS * QUALITIES[quality]["fps"],
+        "level": H264_LEVELS[quality] if codec == "h264" else None,
+    }
+
+
+def profile_key(profile, quality, codec="h264"):
+    """Hash delle impostazioni di codifica: cambia solo se cambia il risultato."""
+    payload = json.dumps({"epoch": ENCODE_EPOCH, "settings": settings(profile, quality, codec)},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def codecs_string(codec, quality):
+    """Stringa ``codecs`` (RFC 6381) dei video web: profilo principale, 8 bit, livello della qualità."""
+    if codec == "av1":
+        return f"av01.0.{AV1_LEVELS[quality]}M.08"
+    if codec == "vp9":
+        return f"vp09.00.{VP9_LEVELS[quality]}.08"
+    level = int(H264_LEVELS[quality].replace(".", ""))
+    return f"avc1.6400{level:02x}"
+
+
+def video_args(profile, quality, codec="h264", threads=2):
+    """
+    Opzioni ffmpeg del flusso video per ``codec`` a qualità ``quality``:
+    encoder, GOP fisso, livello e qualità (CRF o bitrate medio, una passata).
+    """
+    s = settings(profile, quality, codec)
+    args = ["-map", "0:v:0", "-c:v", s["encoder"], "-pix_fmt", "yuv420p",
+            # GOP fisso: salti a intervalli regolari
+            "-g", str(s["keyint"]), "-keyint_min", str(s["keyint"]), "-threads", str(threads)]
+    if codec == "h264":
+        args += ["-preset", s["preset"], "-tune", s["tune"], "-profile:v", "high",
+                 "-level:v", s["level"], "-sc_threshold", "0"]
+    elif codec == "av1":
+        args += ["-preset", str(s["preset"]), "-svtav1-params", "scd=0"]
+    else:
+        args += ["-deadline", "good", "-cpu-used", str(s["speed"]), "-row-mt", "1"]
+    if s["bitrate"] is None:
+        # libvpx: -b:v 0 per la qualità costante pura
+        return args + ["-crf", str(s["crf"])] + (["-b:v", "0"] if codec == "vp9" else [])
+    return args + ["-b:v", f"{s['bitrate']}k", "-maxrate", f"{2 * s['bitrate']}k",
+                   "-bufsize", f"{4 * s['bitrate']}k"]
+
+
+def encode_commands(source, target, quality, profile, codec="h264", ffmpeg="ffmpeg", threads=2,
+                    passlog=None):
+    """
+    Righe di comando ffmpeg per codificare ``source`` in ``target`` con ``codec``.
+
+    Returns:
+    --------
+    list of list
+        Un comando (CRF) o due (prima e seconda passata, con ``passlog``)
+    """
+    head = [ffmpeg, "-y", "-loglevel", "error", "-i", str(source)]
+    video = video_args(profile, quality, codec, threads)
+    if CODECS[codec]["mime"] == "video/webm":
+        # WebM non ammette AAC; indice (cues) in testa come +faststart per MP4
+        output = ["-map", "0:a?", "-c:a", "libopus", "-b:a", "96k", "-cues_to_front", "1"]
+    else:
+        output = ["-map", "0:a?", "-c:a", "copy", "-movflags", "+faststart"]
+    output.append(str(target))
+
+    if settings(profile, quality, codec)["bitrate"] is None:
+        return [head + video + output]
+    passes = ["-passlogfile", str(passlog)]
+    return [
+        head + video + passes + ["-pass", "1", "-an", "-f", "null", os.devnull],
+        head + video + passes + ["-pass", "2"] + output,
+    ]
+
+
+def _ffmpeg_list(option, ffmpeg="ffmpeg"):
+    """Nomi elencati da ``ffmpeg -filters`` o ``-encoders`` (seconda colonna)."""
+    result = subprocess.run([ffmpeg, "-hide_banner", option], capture_output=True, text=True)
+    return {line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1}
+
+
+def has_filter(name, ffmpeg="ffmpeg"):
+    """True se ffmpeg ha il filtro ``name`` (es. libvmaf, non sempre compilato)."""
+    return name in _ffmpeg_list("-filters", ffmpeg)
+
+
+def has_encoder(name, ffmpeg="ffmpeg"):
+    """True se ffmpeg ha l'encoder ``name`` (es. libsvtav1)."""
+    return name in _ffmpeg_list("-encoders", ffmpeg)
+
+
+def measure(encoded, reference, metric, ffmpeg="ffmpeg"):
+    """
+    Qualità oggettiva di ``encoded`` rispetto a ``reference`` (stessa risoluzione).
+
+    Returns:
+    --------
+    float or None
+        SSIM (0-1) o VMAF (0-100); None se la misura non riesce
+    """
+    lavfi = {"ssim": "[0:v][1:v]ssim", "vmaf": "[0:v][1:v]libvmaf"}[metric]
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-nostats", "-i", str(encoded), "-i", str(reference),
+         "-lavfi", lavfi, "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    match = (SSIM_SCORE if metric == "ssim" else VMAF_SCORE).search(result.stderr)
+    if result.returncode != 0 or not match:
+        return None
+    return round(float(match.group(1)), 4)
+
+
+def source_hash(video, recorded):
+    """SHA-256 del video sorgente: riusa quello registrato se mtime e dimensione coincidono."""
+    st = video.stat()
+    if (recorded and recorded.get("source_mtime_ns") == st.st_mtime_ns
+            and recorded.get("source_bytes") == st.st_size):
+        return recorded["source_sha256"], st
+    return content_hash(video), st
+
+
+def _prune(topic, quality, db, sources):
+    """
+    Elimina dal database le scene senza più sorgente e dalla cartella i file
+    che il database non riferisce (codec di sorgenti precedenti).
+
+    ``db`` deve essere il database completo della cartella (vedi
+    ``_read_db``): con uno parziale si eliminerebbero codifiche valide.
+    """
+    return prune_db(db, sources, topic.web_dir(quality), lambda pruned: {DB_NAME} | {
+        web_path(topic, quality, scene, codec).name
+        for scene, entry in pruned["scenes"].items() for codec in entry["renditions"]})
+
+
+def pending(topics, qualities, profile, scenes=None, force=False):
+    """
+    Video da codificare, uno per scena, qualità e codec del profilo.
+
+    Un video web è aggiornato se il database registra lo stesso hash della
+    sorgente e la stessa chiave del profilo per quel codec, e il file esiste:
+    la cache è per hash del video sorgente, non per data. Se ``scenes`` è None
+    si eliminano anche i video web delle scene senza più sorgente.
+
+    Parameters:
+    -----------
+    topics : list of Topic
+        Argomenti da elaborare
+    qualities : list of str
+        Qualità da codificare
+    profile : str
+        Nome del profilo (vedi ``PROFILES``)
+    scenes : set of str
+        Solo queste scene (``disciplina/argomento:Scena``)
+    force : bool
+        Codifica anche i video aggiornati
+
+    Returns:
+    --------
+    tuple
+        ``(lavori, aggiornati)``: lista di ``(topic, qualità, scena, codec,
+        sha256, stat)`` e numero di video già aggiornati
+    """
+    work, fresh = [], 0
+    for topic in topics:
+        for quality in qualities:
+            directory = topic.videos_dir(quality)
+            sources = {v.stem: v for v in sorted(directory.glob("*.mp4"))
+                       if not v.name.startswith(".")} if directory.is_dir() else {}
+            db, complete = _read_db(topic, quality)
+            changed = _prune(topic, quality, db, sources) if scenes is None and complete else False
+            for scene, video in sources.items():
+                if scenes is not None and f"{topic.path}:{scene}" not in scenes:
+                    continue
+                entry = db["scenes"].get(scene)
+                sha, st = source_hash(video, entry)
+                current = entry if entry and entry["source_sha256"] == sha else None
+                if current and current["source_mtime_ns"] != st.st_mtime_ns:
+                    current["source_mtime_ns"] = st.st_mtime_ns
+                    changed = True
+                for codec in profile_codecs(profile):
+                    done = (current or {}).get("renditions", {}).get(codec)
+                    if (not force and done and done["profile_key"] == profile_key(profile, quality, codec)
+                            and web_path(topic, quality, scene, codec).is_file()):
+                        fresh += 1
+                    else:
+                        work.append((topic, quality, scene, codec, sha, st))
+            if changed:
+                save_db(topic, quality, db)
+    return work, fresh
+
+
+def _encode(job, profile, metric, ffmpeg, threads):
+    topic, quality, scene, codec, sha, _ = job
+    source = video_path(topic, quality, scene)
+    target = web_path(topic, quality, scene, codec)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{scene}.tmp{CODECS[codec]['suffix']}")
+    passlog = target.with_name(f".{scene}.{codec}.passlog")
+    start = time.time()
+    try:
+        for command in encode_commands(source, tmp, quality, profile, codec, ffmpeg, threads,
+                                       passlog):
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                tmp.unlink(missing_ok=True)
+                return job, None, result.stderr.strip()
+    finally:
+        for leftover in target.parent.glob(f"{passlog.name}*"):
+            leftover.unlink()
+    if not tmp.is_file():
+        return job, None, f"{tmp.name} non creato"
+    seconds = round(time.time() - start, 2)
+    entry = {
+        "profile": profile,
+        "profile_key": profile_key(profile, quality, codec),
+        "sha256": content_hash(tmp),
+        "bytes": tmp.stat().st_size,
+        "codecs": codecs_string(codec, quality),
+        "seconds": seconds,
+        "encoded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    if metric != "none":
+        entry[metric] = measure(tmp, source, metric, ffmpeg)
+    os.replace(tmp, target)
+    return job, entry, ""
+
+
+def _record(topic, quality, scene, codec, sha, st, entry):
+    """Registra una codifica; una sorgente nuova azzera i codec della precedente."""
+    db = load_db(topic, quality)
+    scene_entry = db["scenes"].get(scene)
+    if not scene_entry or scene_entry["source_sha256"] != sha:
+        scene_entry = db["scenes"][scene] = {"source_sha256": sha, "renditions": {}}
+    scene_entry.update(source_bytes=st.st_size, source_mtime_ns=st.st_mtime_ns)
+    scene_entry["renditions"][codec] = entry
+    save_db(topic, quality, db)
+
+
+def export_entries(topic, quality, scenes):
+    """Voci del database per ``scenes`` (quelle codificate), da unire altrove."""
+    db = load_db(topic, quality)
+    return {scene: db["scenes"][scene] for scene in scenes if scene in db["scenes"]}
+
+
+def merge_entries(topic, quality, entries):
+    """Unisce al database voci di ``export_entries``, scena per scena."""
+    if not entries:
+        return
+    db = load_db(topic, quality)
+    db["scenes"].update(entries)
+    save_db(topic, quality, db)
+
+
+def encode(work, profile, metric="ssim", jobs_count=None, ffmpeg="ffmpeg"):
+    """
+    Codifica ``work`` (vedi ``pending``) con processi ffmpeg in parallelo.
+
+    I codec il cui encoder manca in ffmpeg vengono saltati con un avviso: il
+    player ripiega sugli altri.
+
+    Parameters:
+    -----------
+    work : list of tuple
+        Lavori di ``pending``
+    profile : str
+        Nome del profilo
+    metric : str
+        ``ssim``, ``vmaf`` (se ffmpeg ha libvmaf, altrimenti SSIM) o ``none``
+    jobs_count : int
+        Processi ffmpeg in parallelo (default: metà dei core, 2 thread ciascuno)
+    ffmpeg : str
+        Eseguibile di ffmpeg
+
+    Returns:
+    --------
+    bool
+        True se tutte le codifiche sono riuscite
+    """
+    if not work:
+        return True
+    if shutil.which(ffmpeg) is None:
+        raise SystemExit(f"Errore: {ffmpeg} non trovato (serve per codificare i video web)")
+    if metric == "vmaf" and not has_filter("libvmaf", ffmpeg):
+        print("Attenzione: ffmpeg senza libvmaf, si misura la SSIM")
+        metric = "ssim"
+    encoders = _ffmpeg_list("-encoders", ffmpeg)
+    for codec in sorted({job[3] for job in work}):
+        if CODECS[codec]["encoder"] not in encoders:
+            print(f"Attenzione: ffmpeg senza {CODECS[codec]['encoder']}, niente video {codec}")
+    work = [job for job in work if CODECS[job[3]]["encoder"] in encoders]
+
+    # Prima i lavori più lenti (AV1, qualità alte), così il pool resta pieno
+    cost = {"av1": 3, "vp9": 2, "h264": 1}
+    work = sorted(work, key=lambda job: (cost[job[3]], job[5].st_size), reverse=True)
+    workers = jobs_count or max((os.cpu_count() or 2) // 2, 1)
+    return run_parallel(work, lambda job: _encode(job, profile, metric, ffmpeg, 2), workers,
+                        _label, functools.partial(_encoded, metric))
+
+
+def _label(job):
+    topic, quality, scene, codec, *_ = job
+    return f"{topic.path}:{scene} [{quality} {codec}]"
+
+
+def _encoded(metric, job, entry):
+    """Registra una codifica riuscita e ne descrive il risultato."""
+    topic, quality, scene, codec, sha, st = job
+    _record(topic, quality, scene, codec, sha, st, entry)
+    score = f", {metric.upper()} {entry[metric]}" if entry.get(metric) is not None else ""
+    return (f"{format_size(st.st_size)} -> {format_size(entry['bytes'])} "
+            f"({_saving(st.st_size, entry['bytes'])}{score}, {entry['seconds']}s)")
+
+
+def _saving(before, after):
+    return f"{(after - before) / before * 100:+.1f}%" if before else "n/d"
+
+
+def renditions(topic, quality, scene, source_sha256, db):
+    """
+    Video web aggiornati di una scena, per il manifest dei media.
+
+    Returns:
+    --------
+    dict
+        ``{codec: voce}`` in ordine di preferenza, con percorso (relativo a
+        media/), hash, byte, tipo MIME con codecs e profilo; vuoto se mancano
+        o non corrispondono alla sorgente
+    """
+    entry = db["scenes"].get(scene)
+    if not entry or entry["source_sha256"] != source_sha256:
+        return {}
+    result = {}
+    for codec in CODECS:
+        done = entry["renditions"].get(codec)
+        path = web_path(topic, quality, scene, codec)
+        if not done or not path.is_file() or path.stat().st_size != done["bytes"]:
+            continue
+        result[codec] = {
+            "path": path.relative_to(MEDIA_DIR).as_posix(),
+            "sha256": done["sha256"],
+            "bytes": done["bytes"],
+            "type": f'{CODECS[codec]["mime"]}; codecs="{done["codecs"]}"',
+            "profile": done["profile"],
+        }
+    return result
+
+
+def report(topics, qualities):
+    """Riepilogo dai database, per codec: risparmio complessivo e qualità media/minima."""
+    totals = {}
+    for topic in topics:
+        for quality in qualities:
+            for scene, entry in load_db(topic, quality)["scenes"].items():
+                for codec, done in entry["renditions"].items():
+                    t = totals.setdefault(codec, {"count": 0, "source": 0, "web": 0,
+                                                  "ssim": [], "vmaf": []})
+                    t["count"] += 1
+                    t["source"] += entry["source_bytes"]
+                    t["web"] += done["bytes"]
+                    for metric in ("ssim", "vmaf"):
+                        if done.get(metric) is not None:
+                            t[metric].append((done[metric], f"{topic.path}:{scene} [{quality}]"))
+    if not totals:
+        print("Nessun video web")
+        return
+    for codec in [c for c in CODECS if c in totals]:
+        t = totals[codec]
+        print(f"{codec}: {t['count']} video, {format_size(t['source'])} -> {format_size(t['web'])} "
+              f"({_saving(t['source'], t['web'])})")
+        for metric in ("ssim", "vmaf"):
+            if t[metric]:
+                worst = min(t[metric])
+                mean = sum(v for v, _ in t[metric]) / len(t[metric])
+                print(f"  {metric.upper()} media {mean:.4f}, minima {worst[0]} ({worst[1]})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ricodifica per il web dei video renderizzati (profili x264, faststart)."
+    )
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--quality", nargs="+", choices=sorted(QUALITIES), default=None,
+                        help="qualità da codificare")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES),
+                        help=f"profilo di codifica (default: {DEFAULT_PROFILE})")
+    parser.add_argument("--metric", default="ssim", choices=METRICS,
+                        help="confronto con il video di Manim (default: ssim)")
+    parser.add_argument("--jobs", type=int, default=None, help="processi ffmpeg in parallelo")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="eseguibile di ffmpeg")
+    parser.add_argument("--force", action="store_true", help="codifica anche i video aggiornati")
+    parser.add_argument("--report", action="store_true", help="solo il riepilogo, senza codificare")
+    parser.add_argument("--list-profiles", action="store_true", help="elenca i profili")
+    args = parser.parse_args(argv)
+
+    if args.list_profiles:
+        for name, spec in PROFILES.items():
+            print(f"  {name:<10} {spec['description']}")
+            for codec in profile_codecs(name):
+                for quality in QUALITIES:
+                    s = settings(name, quality, codec)
+                    rate = f"crf {s['crf']}" if s["crf"] is not None else f"{s['bitrate']}k 2-pass"
+                    speed = s["preset"] if s["speed"] is None else f"speed {s['speed']}"
+                    print(f"    {codec:<4} {quality}: {s['encoder']} {speed}, {rate}, "
+                          f"keyint {s['keyint']}, {codecs_string(codec, quality)}")
+        return 0
+    if not args.quality:
+        parser.error("serve --quality")
+
+    topics = [find_topic(t) for t in args.topics] if args.topics else discover_topics()
+    if not args.report:
+        work, fresh = pending(topics, args.quality, args.profile, force=args.force)
+        print(f"{len(work)} video da codificare con il profilo {args.profile} "
+              f"({fresh} già aggiornati)")
+        ok = encode(work, args.profile, args.metric, args.jobs, args.ffmpeg)
+        if not ok:
+            return 1
+    report(topics, args.quality)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
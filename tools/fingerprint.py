@@ -0,0 +1,285 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fingerprint - Per-scene content hashes from the normalized AST
+
+A scene's fingerprint is a SHA-256 over everything that can change its video:
+  - the normalized AST of the Scene class (no positions, no docstrings, so
+    comments, blank lines and docstring edits do not count; nor the
+    presentation attributes such as POSTER_TIME);
+  - the module-level functions, classes and constants it uses, transitively
+    (helpers, local base classes, shared colour constants, ...);
+  - the module "prelude" (imports and top-level statements that are not
+    definitions, e.g. config tweaks);
+  - the shared modules of the project it uses (whole-module hash, including
+    what they import in turn, see scan_deps.import_closure);
+  - the topic's manim.cfg.
+
+Scene discovery follows inheritance like `manim -a` does at runtime: every
+class defined in the file whose bases lead to a Manim Scene, also through
+local base classes and through classes imported from the project (e.g.
+VerticalTemplate).
+
+Usage:
+    python3 tools/fingerprint.py sistemi_lineari
+"""
+
+import argparse
+import ast
+import copy
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from common import ROOT, find_topic
+from scan_deps import _module_file, import_closure
+
+# Classi Scene di Manim da cui derivano le scene del progetto
+MANIM_SCENES = {
+    "Scene", "MovingCameraScene", "ThreeDScene", "SpecialThreeDScene",
+    "ZoomedScene", "VectorScene", "LinearTransformationScene",
+}
+
+# Da incrementare quando cambia il modo di calcolare le impronte
+FINGERPRINT_VERSION = 1
+
+# Attributi di classe che non influiscono sul video (es. l'istante del poster
+# letto da tools/posters.py): cambiarli non fa renderizzare di nuovo la scena
+PRESENTATION_ATTRIBUTES = {"POSTER_TIME"}
+
+
+def _strip_docstrings(tree):
+    """Copia di ``tree`` senza docstring (non influiscono sul video)."""
+    tree = copy.deepcopy(tree)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if (body and isinstance(body[0], ast.Expr)
+                    and isinstance(body[0].value, ast.Constant)
+                    and isinstance(body[0].value.value, str)):
+                node.body = body[1:] or [ast.Pass()]
+    return tree
+
+
+def _is_presentation(node):
+    """True per ``POSTER_TIME = ...`` e simili (vedi ``PRESENTATION_ATTRIBUTES``)."""
+    targets = node.targets if isinstance(node, ast.Assign) else \
+        [node.target] if isinstance(node, ast.AnnAssign) else []
+    return bool(targets) and all(isinstance(t, ast.Name) and t.id in PRESENTATION_ATTRIBUTES
+                                 for t in targets)
+
+
+def _strip_presentation(tree):
+    """``tree`` senza gli attributi di presentazione nei corpi delle classi."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            node.body = [n for n in node.body if not _is_presentation(n)] or [ast.Pass()]
+    return tree
+
+
+def normalized_dump(node):
+    """
+    Forma canonica di un nodo AST: niente posizioni, commenti, docstring né
+    attributi di presentazione.
+    """
+    return ast.dump(_strip_presentation(_strip_docstrings(node)), annotate_fields=True,
+                    include_attributes=False)
+
+
+def _names_used(node):
+    return {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ModuleInfo:
+    """
+    Definizioni e import di primo livello di un file Python del progetto.
+
+    Parameters:
+    -----------
+    path : Path
+        File da analizzare
+    """
+
+    _cache = {}
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self.tree = ast.parse(self.path.read_text(encoding="utf-8"), filename=str(self.path))
+        search_dirs = (ROOT, self.path.parent)
+
+        self.defs = {}            # nome -> nodo (funzioni, classi, costanti)
+        self.classes = []         # classi nell'ordine del file
+        self.imports = {}         # nome legato -> (file del progetto, nome originale)
+        self.star_modules = []    # moduli del progetto importati con ``*``
+        self.prelude = []         # istruzioni di primo livello che non sono definizioni
+
+        for node in self.tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self.defs[node.name] = node
+                if isinstance(node, ast.ClassDef):
+                    self.classes.append(node)
+                continue
+            if isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                if all(isinstance(t, ast.Name) for t in targets):
+                    for t in targets:
+                        self.defs[t.id] = node
+                    continue
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    target = _module_file(alias.name, search_dirs)
+                    if target is not None:
+                        bound = alias.asname or alias.name.split(".")[0]
+                        self.imports[bound] = (target.resolve(), None)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                module = _module_file(node.module, search_dirs)
+                for alias in node.names:
+                    if alias.name == "*":
+                        if module is not None:
+                            self.star_modules.append(module.resolve())
+                        continue
+                    # ``from animations import gas_module``: il nome è un modulo
+                    sub = _module_file(f"{node.module}.{alias.name}", search_dirs)
+                    if sub is not None:
+                        self.imports[alias.asname or alias.name] = (sub.resolve(), None)
+                    elif module is not None:
+                        self.imports[alias.asname or alias.name] = (module.resolve(), alias.name)
+            if isinstance(node, ast.Expr) and node is self.tree.body[0]:
+                continue  # docstring del modulo
+            self.prelude.append(node)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path).resolve()
+        if path not in cls._cache:
+            cls._cache[path] = cls(path)
+        return cls._cache[path]
+
+    def is_scene_class(self, name, _seen=None):
+        """True se la classe ``name`` (definita o importata qui) deriva da una Scene."""
+        seen = _seen if _seen is not None else set()
+        if (self.path, name) in seen:
+            return False
+        seen.add((self.path, name))
+
+        node = self.defs.get(name)
+        if isinstance(node, ast.ClassDef):
+            for base in node.bases:
+                base_name = base.id if isinstance(base, ast.Name) else getattr(base, "attr", None)
+                if base_name in MANIM_SCENES or (base_name and self.is_scene_class(base_name, seen)):
+                    return True
+            return False
+        if name in self.imports:
+            module, original = self.imports[name]
+            if original is not None:
+                return ModuleInfo.load(module).is_scene_class(original, seen)
+        return False
+
+    def scene_classes(self):
+        """Nomi delle scene definite nel file, nell'ordine in cui compaiono."""
+        return [c.name for c in self.classes if self.is_scene_class(c.name)]
+
+
+def module_digest(path, _cache={}):
+    """Hash di un modulo del progetto e di tutti i moduli che importa."""
+    path = Path(path).resolve()
+    if path not in _cache:
+        parts = [normalized_dump(ModuleInfo.load(path).tree)]
+        parts += [normalized_dump(ModuleInfo.load(dep).tree) for dep in import_closure(path)]
+        _cache[path] = _digest(*parts)
+    return _cache[path]
+
+
+def scene_fingerprint(path, scene, config_text=""):
+    """
+    Impronta di una scena: classe + helper usati + preludio + moduli + config.
+
+    Parameters:
+    -----------
+    path : Path
+        File Python dell'argomento
+    scene : str
+        Nome della classe Scene
+    config_text : str
+        Contenuto del ``manim.cfg`` dell'argomento
+    """
+    info = ModuleInfo.load(path)
+    if scene not in info.defs:
+        raise KeyError(f"{scene} non è definita in {path}")
+
+    parts = {}        # nome -> forma normalizzata della definizione
+    modules = set(info.star_modules)
+    todo = [scene]
+    while todo:
+        name = todo.pop()
+        if name in parts:
+            continue
+        if name in info.defs:
+            node = info.defs[name]
+            parts[name] = normalized_dump(node)
+            todo.extend(_names_used(node) - parts.keys())
+        elif name in info.imports:
+            modules.add(info.imports[name][0])
+
+    prelude = [normalized_dump(node) for node in info.prelude]
+    for node in info.prelude:
+        for name in _names_used(node):
+            if name in info.imports:
+                modules.add(info.imports[name][0])
+
+    payload = json.dumps({
+        "version": FINGERPRINT_VERSION,
+        "scene": scene,
+        "definitions": dict(sorted(parts.items())),
+        "prelude": prelude,
+        "modules": sorted(module_digest(m) for m in modules),
+        "config": config_text,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def topic_scenes(topic):
+    """Scene dell'argomento, nell'ordine del file."""
+    return ModuleInfo.load(topic.source).scene_classes()
+
+
+def topic_fingerprints(topic):
+    """Dizionario ``{scena: impronta}`` per tutte le scene dell'argomento."""
+    config_text = topic.config.read_text(encoding="utf-8") if topic.config.is_file() else ""
+    return {scene: scene_fingerprint(topic.source, scene, config_text)
+            for scene in topic_scenes(topic)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Impronte AST delle scene di un argomento.")
+    parser.add_argument("topic", help="nome dell'argomento (es. sistemi_lineari)")
+    args = parser.parse_args(argv)
+
+    for scene, fp in topic_fingerprints(find_topic(args.topic)).items():
+        print(f"{fp[:16]}  {scene}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
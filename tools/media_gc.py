@@ -0,0 +1,215 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Media GC - Prune Manim intermediates under a disk budget
+
+Manim keeps every partial movie it ever rendered
+(videos/<topic>/<quality>/partial_movie_files/<Scene>/) plus the LaTeX and
+Text intermediates (Tex/, texts/) of each discipline. They speed up
+re-renders but grow without bound. This script sorts them into:
+
+- live: partial movies listed in partial_movie_file_list.txt of a scene
+  whose build database fingerprint matches the current source (see
+  build_scenes.py). Never deleted.
+- orphan: partial movies of scenes, topics or qualities that no longer
+  exist. Always deleted.
+- cache: everything else (older versions of a scene, scenes waiting for a
+  re-render, Tex/Text files). Deleted least recently used first until the
+  intermediates fit the budget.
+
+Final videos (<Scene>.mp4) are never touched.
+
+Usage:
+    python3 tools/media_gc.py --budget 2G
+    python3 tools/media_gc.py --budget 0 --dry-run
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from build_scenes import load_db
+from common import DISCIPLINES, MEDIA_DIR, QUALITIES, discover_topics, relative
+from fingerprint import topic_fingerprints
+
+# Intermedi di Manim per disciplina (tex_dir e text_dir di default)
+CACHE_DIRS = ("Tex", "texts")
+PARTIAL_DIR = "partial_movie_files"
+PARTIAL_LIST = "partial_movie_file_list.txt"
+
+UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(text):
+    """``"2G"`` -> byte (suffissi K, M, G, T; anche ``2GB`` o ``500m``)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"dimensione non valida: {text!r} (es. 500M, 2G)")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _listed_partials(scene_dir):
+    """Nomi dei file nella lista dell'ultimo render della scena (None se manca)."""
+    listing = scene_dir / PARTIAL_LIST
+    if not listing.is_file():
+        return None
+    names = set()
+    for line in listing.read_text(encoding="utf-8", errors="replace").splitlines():
+        # Formato concat di ffmpeg: file 'file:/percorso/assoluto/xxx.mp4'
+        match = re.match(r"\s*file\s+'(?:file:)?(.*)'\s*$", line)
+        if match:
+            names.add(os.path.basename(match.group(1)))
+    return names
+
+
+def classify():
+    """
+    Classifica gli intermedi presenti in ``media/``.
+
+    Returns:
+    --------
+    tuple
+        ``(live, orphan, cache)``: liste di ``(path, size, last_used)``
+    """
+    live, orphan, cache = [], [], []
+    topics = {(t.discipline, t.name): t for t in discover_topics()}
+    quality_by_dir = {q["dir"]: name for name, q in QUALITIES.items()}
+    fingerprints = {}
+
+    def entry(path):
+        st = path.stat()
+        return path, st.st_size, max(st.st_atime, st.st_mtime)
+
+    for disc in DISCIPLINES:
+        for name in CACHE_DIRS:
+            base = MEDIA_DIR / disc / name
+            # Collegata alla cache condivisa (tex_cache.py): non è un intermedio locale
+            if base.is_dir() and not base.is_symlink():
+                # Esclusi i lock dei render (render_probe.py)
+                cache += [entry(p) for p in base.rglob("*")
+                          if p.is_file() and not p.name.startswith(".")]
+
+        for partial_root in sorted((MEDIA_DIR / disc / "videos").glob(f"*/*/{PARTIAL_DIR}")):
+            quality_dir = partial_root.parent
+            topic = topics.get((disc, quality_dir.parent.name))
+            quality = quality_by_dir.get(quality_dir.name)
+            if topic is not None and quality is not None and topic.path not in fingerprints:
+                fingerprints[topic.path] = topic_fingerprints(topic)
+            current = fingerprints.get(topic.path, {}) if topic and quality else {}
+            db = load_db(topic, quality)["scenes"] if current else {}
+
+            for scene_dir in sorted(p for p in partial_root.iterdir() if p.is_dir()):
+                files = [entry(p) for p in scene_dir.iterdir() if p.is_file()]
+                scene = scene_dir.name
+                if scene not in current:
+                    orphan += files
+                    continue
+                listed = None
+                if db.get(scene, {}).get("fingerprint") == current[scene]:
+                    listed = _listed_partials(scene_dir)
+                    # Scena aggiornata senza lista: nel dubbio si conserva tutto
+                    if listed is None:
+                        live += files
+                        continue
+                for item in files:
+                    if listed is not None and (item[0].name in listed or item[0].name == PARTIAL_LIST):
+                        live.append(item)
+                    else:
+                        cache.append(item)
+    return live, orphan, cache
+
+
+def collect(budget, dry_run=False):
+    """
+    Elimina gli orfani e, dal meno usato di recente, la cache oltre ``budget``.
+
+    Parameters:
+    -----------
+    budget : int
+        Spazio massimo (byte) per tutti gli intermedi, vivi compresi
+    dry_run : bool
+        Mostra solo cosa verrebbe eliminato
+
+    Returns:
+    --------
+    dict
+        Byte e file per categoria: ``live``, ``orphan``, ``evicted``, ``kept``
+    """
+    live, orphan, cache = classify()
+    used = sum(size for _, size, _ in live + cache)
+    evicted = []
+    for item in sorted(cache, key=lambda e: e[2]):
+        if used <= budget:
+            break
+        evicted.append(item)
+        used -= item[1]
+    evicted_paths = {p for p, _, _ in evicted}
+    kept = [item for item in cache if item[0] not in evicted_paths]
+
+    if not dry_run:
+        for path, _, _ in orphan + evicted:
+            path.unlink(missing_ok=True)
+        # Cartelle di scena rimaste vuote
+        for path, _, _ in orphan + evicted:
+            parent = path.parent
+            while parent != MEDIA_DIR and parent.is_dir() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+
+    def total(items):
+        return {"files": len(items), "bytes": sum(size for _, size, _ in items)}
+
+    return {"live": total(live), "orphan": total(orphan), "evicted": total(evicted),
+            "kept": total(kept)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Elimina partial movie e intermedi Tex/Text di Manim entro un budget di disco."
+    )
+    parser.add_argument("--budget", type=parse_size, default=parse_size("2G"),
+                        help="spazio massimo per gli intermedi (default: 2G; 0 = solo quelli vivi)")
+    parser.add_argument("--dry-run", action="store_true", help="mostra cosa verrebbe eliminato")
+    args = parser.parse_args(argv)
+
+    if not MEDIA_DIR.is_dir():
+        print(f"Niente da fare: {relative(MEDIA_DIR)} non esiste")
+        return 0
+    report = collect(args.budget, dry_run=args.dry_run)
+    reclaimed = report["orphan"]["bytes"] + report["evicted"]["bytes"]
+    verb = "da recuperare" if args.dry_run else "recuperato"
+    print(f"Intermedi Manim (budget {format_size(args.budget)}):")
+    print(f"  vivi (scene aggiornate)  {report['live']['files']:6d} file  "
+          f"{format_size(report['live']['bytes'])}")
+    print(f"  orfani eliminati         {report['orphan']['files']:6d} file  "
+          f"{format_size(report['orphan']['bytes'])}")
+    print(f"  cache eliminata (LRU)    {report['evicted']['files']:6d} file  "
+          f"{format_size(report['evicted']['bytes'])}")
+    print(f"  cache conservata         {report['kept']['files']:6d} file  "
+          f"{format_size(report['kept']['bytes'])}")
+    print(f"Spazio {verb}: {format_size(reclaimed)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
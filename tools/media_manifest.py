@@ -0,0 +1,337 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Media Manifest - Index of the rendered videos in media/
+
+Scans media/<discipline>/videos/<topic>/<quality_dir>/*.mp4 and writes
+media/media-manifest.json: for every topic and scene the available qualities,
+each with path (relative to media/), bytes, duration, resolution, fps,
+bitrate, codec, SHA-256 content hash and url. Deploy, CI caching and the
+player read this one file instead of walking the media tree.
+
+When encode_web.py has re-encoded a video for the web and the encode matches
+the current video, the entry lists it under "renditions" (path, hash, bytes,
+MIME type with codecs, url): the site publishes and plays those instead of
+the raw Manim output.
+
+The url is the content-hashed name under which the site publishes the video
+(/media/.../<Scene>.<hash>.mp4, see deploy_media.py stage): it changes
+whenever the video does, so it can be cached as immutable.
+
+The HLS packages of package_hls.py that match the current videos are listed
+per topic under "hls": one per scene, with the url of its master playlist
+in a content-hashed directory (/media/.../<Scene>.<hash>/master.m3u8) and
+every file of the package.
+
+The posters of posters.py (AVIF/WebP frame, optional looping preview) that
+match the current videos are listed per topic under "posters", each file
+with its content-hashed url.
+
+The update is incremental: a video whose mtime and size match the manifest
+is neither hashed nor probed again. Video metadata comes from ffprobe; when
+ffprobe is missing only bytes and hash are recorded, and the video is probed
+on the next run where ffprobe is available.
+
+Usage:
+    python3 tools/media_manifest.py                 # tutti gli argomenti
+    python3 tools/media_manifest.py gas_perfetto    # solo questi argomenti
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import subprocess
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import encode_web
+import package_hls
+import posters
+from common import MEDIA_DIR, QUALITIES, ROOT, content_hash, discover_topics, find_topic, relative
+
+MANIFEST_PATH = MEDIA_DIR / "media-manifest.json"
+MANIFEST_VERSION = 2
+
+# Cifre dell'hash nel nome pubblicato dei video
+URL_HASH_LENGTH = 12
+
+# Cartella di output di Manim -> qualità (1920p60 -> qh)
+QUALITY_BY_DIR = {q["dir"]: name for name, q in QUALITIES.items()}
+
+
+def published_path(path, sha256):
+    """``fisica/.../Scena.mp4`` -> ``fisica/.../Scena.<hash>.mp4`` (nome pubblicato)."""
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{sha256[:URL_HASH_LENGTH]}{dot}{suffix}"
+
+
+def _rate(value):
+    """``"60/1"`` -> 60.0 (frame rate come lo scrive ffprobe)."""
+    num, _, den = value.partition("/")
+    try:
+        return round(float(num) / float(den or 1), 3)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def probe(video, ffprobe="ffprobe"):
+    """
+    Metadati del video via ffprobe.
+
+    Returns:
+    --------
+    dict or None
+        ``duration``, ``width``, ``height``, ``fps``, ``bitrate``, ``codec``;
+        None se ffprobe non è disponibile o il file non è leggibile
+    """
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=codec_name,width,height,avg_frame_rate:format=duration,bit_rate",
+         "-of", "json", str(video)],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return None
+    stream = (data.get("streams") or [{}])[0]
+    fmt = data.get("format", {})
+    duration = fmt.get("duration")
+    bitrate = fmt.get("bit_rate")
+    return {
+        "duration": round(float(duration), 3) if duration else None,
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "fps": _rate(stream.get("avg_frame_rate", "")),
+        "bitrate": int(bitrate) if bitrate else None,
+        "codec": stream.get("codec_name"),
+    }
+
+
+def topic_videos(topic):
+    """Video dell'argomento: ``{scena: {qualità: Path}}``."""
+    videos = {}
+    base = topic.media_dir / "videos" / topic.name
+    if not base.is_dir():
+        return videos
+    for quality_dir in sorted(base.iterdir()):
+        if not quality_dir.is_dir():
+            continue
+        quality = QUALITY_BY_DIR.get(quality_dir.name, quality_dir.name)
+        for video in sorted(quality_dir.glob("*.mp4")):
+            # File temporanei (es. transcode.py) iniziano con "."
+            if not video.name.startswith("."):
+                videos.setdefault(video.stem, {})[quality] = video
+    return videos
+
+
+def video_entry(video, cached=None, ffprobe="ffprobe"):
+    """
+    Voce del manifest per ``video``: riusa ``cached`` se mtime e dimensione
+    non sono cambiati (e i metadati erano già stati letti).
+    """
+    st = video.stat()
+    if (cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("bytes") == st.st_size
+            and (cached.get("duration") is not None or ffprobe is None)):
+        return cached, False
+    path = video.relative_to(MEDIA_DIR).as_posix()
+    sha256 = content_hash(video)
+    entry = {
+        "path": path,
+        "url": "/media/" + published_path(path, sha256),
+        "bytes": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": sha256,
+        "duration": None, "width": None, "height": None,
+        "fps": None, "bitrate": None, "codec": None,
+    }
+    if ffprobe:
+        entry.update(probe(video, ffprobe) or {})
+    return entry, True
+
+
+def with_renditions(topic, quality, scene, entry, encodes):
+    """
+    ``entry`` con i video web aggiornati della scena (encode_web.py), ognuno
+    con il suo url pubblicato; ``encodes`` tiene i database già letti.
+    """
+    entry = {k: v for k, v in entry.items() if k != "renditions"}
+    if quality not in QUALITY_BY_DIR.values():
+        return entry
+    if quality not in encodes:
+        encodes[quality] = encode_web.load_db(topic, quality)
+    renditions = encode_web.renditions(topic, quality, scene, entry["sha256"], encodes[quality])
+    for rendition in renditions.values():
+        rendition["url"] = "/media/" + published_path(rendition["path"], rendition["sha256"])
+    if renditions:
+        entry["renditions"] = renditions
+    return entry
+
+
+def published_files(video):
+    """
+    File da pubblicare per un video del manifest: i video web se ci sono,
+    altrimenti l'output di Manim.
+    """
+    return list(video.get("renditions", {}).values()) or [video]
+
+
+def _with_url(item):
+    return dict(item, url="/media/" + published_path(item["path"], item["sha256"]))
+
+
+def poster_with_urls(poster):
+    """Poster di una scena con l'url pubblicato di ogni immagine e dell'anteprima."""
+    poster = dict(poster, images=[_with_url(image) for image in poster["images"]])
+    if "preview" in poster:
+        poster["preview"] = _with_url(poster["preview"])
+    return poster
+
+
+def poster_files(poster):
+    """File da pubblicare per un poster del manifest: immagini e anteprima."""
+    return poster["images"] + ([poster["preview"]] if "preview" in poster else [])
+
+
+def published_dir(path, sha256):
+    """``fisica/hls/onde/Scena`` -> ``fisica/hls/onde/Scena.<hash>`` (cartella pubblicata)."""
+    return f"{path}.{sha256[:URL_HASH_LENGTH]}"
+
+
+def stream_with_url(stream):
+    """Pacchetto HLS con l'url della master playlist nella cartella pubblicata."""
+    url = f"/media/{published_dir(stream['path'], stream['sha256'])}/{package_hls.MASTER}"
+    return {**stream, "url": url}
+
+
+def stream_files(stream):
+    """
+    File da pubblicare per un pacchetto HLS del manifest: ``path`` (in media/),
+    ``sha256``, ``bytes`` e ``name`` (nella cartella pubblicata).
+    """
+    published = published_dir(stream["path"], stream["sha256"])
+    return [{"path": f"{stream['path']}/{name}", "sha256": f["sha256"], "bytes": f["bytes"],
+             "name": f"{published}/{name}"}
+            for name, f in stream["files"].items()]
+
+
+@contextmanager
+def _locked(path):
+    """Lock esclusivo sul manifest (più ``make <topic>`` in parallelo)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "topics": {}}
+    return manifest
+
+
+def update_manifest(topics=None, path=MANIFEST_PATH, ffprobe="ffprobe"):
+    """
+    Aggiorna il manifest dei media e lo restituisce.
+
+    Parameters:
+    -----------
+    topics : list of Topic
+        Argomenti da aggiornare (default: tutti; quelli spariti vengono rimossi)
+    path : Path
+        File del manifest
+    ffprobe : str
+        Eseguibile di ffprobe (se manca si registrano solo dimensione e hash)
+
+    Returns:
+    --------
+    tuple
+        ``(manifest, updated)`` con ``updated`` = numero di video (ri)analizzati
+    """
+    if ffprobe and shutil.which(ffprobe) is None:
+        print(f"Attenzione: {ffprobe} non trovato, durata e risoluzione non registrate")
+        ffprobe = None
+
+    with _locked(path):
+        manifest = load_manifest(path)
+        full = topics is None
+        topics = discover_topics() if full else topics
+        updated = 0
+        for topic in topics:
+            old = manifest["topics"].get(topic.path, {}).get("scenes", {})
+            scenes, encodes = {}, {}
+            for scene, by_quality in topic_videos(topic).items():
+                scenes[scene] = {}
+                for quality, video in by_quality.items():
+                    entry, changed = video_entry(video, old.get(scene, {}).get(quality), ffprobe)
+                    scenes[scene][quality] = with_renditions(topic, quality, scene, entry, encodes)
+                    updated += changed
+            if scenes:
+                manifest["topics"][topic.path] = {
+                    "discipline": topic.discipline,
+                    "topic": topic.name,
+                    "scenes": scenes,
+                }
+                streams = package_hls.streams(topic, scenes)
+                if streams:
+                    manifest["topics"][topic.path]["hls"] = {
+                        scene: stream_with_url(stream) for scene, stream in streams.items()}
+                found = posters.scene_posters(topic, scenes)
+                if found:
+                    manifest["topics"][topic.path]["posters"] = {
+                        scene: poster_with_urls(poster) for scene, poster in found.items()}
+            else:
+                manifest["topics"].pop(topic.path, None)
+        if full:
+            current = {t.path for t in topics}
+            for stale in [k for k in manifest["topics"] if k not in current]:
+                del manifest["topics"][stale]
+        manifest["topics"] = dict(sorted(manifest["topics"].items()))
+        manifest["generated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+    return manifest, updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manifest JSON dei video renderizzati.")
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--output", default=str(MANIFEST_PATH),
+                        help=f"file del manifest (default: {relative(MANIFEST_PATH)})")
+    parser.add_argument("--ffprobe", default="ffprobe", help="eseguibile di ffprobe")
+    args = parser.parse_args(argv)
+
+    selected = [find_topic(t) for t in args.topics] if args.topics else None
+    manifest, updated = update_manifest(selected, ROOT / args.output, args.ffprobe)
+    videos = [v for t in manifest["topics"].values() for s in t["scenes"].values() for v in s.values()]
+    size_mb = sum(v["bytes"] for v in videos) / 1e6
+    print(f"Manifest aggiornato: {len(videos)} video ({size_mb:.1f} MB), "
+          f"{updated} analizzati -> {relative(ROOT / args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,502 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Package HLS - Adaptive streaming packages of the scenes
+
+A single progressive MP4 per scene forces every viewer onto the same
+bitrate: slow connections stall, fast ones wait for a large file before the
+first frame. This stage packages the quality ladder of every scene as HLS
+(fragmented MP4 segments plus a master playlist), so the player starts on
+the lightest variant and switches quality as the bandwidth allows.
+
+For each scene, from the best video Manim rendered (qk, qh, qm or ql):
+
+- one variant per web quality the source reaches without upscaling (qh,
+  qm, ql) and per codec (HLS_CODECS: AV1 when the profile has it and ffmpeg
+  has the encoder, H.264 always), in
+  media/<discipline>/hls/<topic>/<Scene>/<quality_dir>[-av1]/: init.mp4,
+  seg_NNN.m4s and playlist.m3u8 (VOD). Browsers that decode AV1 stream the
+  lighter AV1 ladder, the others H.264;
+- the web encode of that quality and codec (encode_web.py) is repackaged
+  without re-encoding when it matches its source; otherwise the variant is
+  encoded from the source with the same settings (scale and fps decimation
+  as in transcode.py);
+- segments last SEGMENT_SECONDS, a multiple of encode_web.KEYINT_SECONDS:
+  every segment starts on a keyframe and the segments of all variants are
+  aligned, so switching never stalls;
+- master.m3u8 lists the variants from the lightest, with BANDWIDTH (peak
+  segment bitrate), AVERAGE-BANDWIDTH, RESOLUTION, FRAME-RATE and CODECS.
+
+Variants are video only: the scenes have no audio track. Packages are
+recorded in packages.json next to them, keyed by the SHA-256 of the source
+and of the repackaged encodes plus the settings: a scene is packaged again
+only when one of them changes. media_manifest.py lists the packages under
+"hls" and the site publishes each one in a content-hashed directory.
+
+--serve serves a directory (default: the built site, frontend/dist) with the
+HLS MIME types, to try the packages with a plain static server.
+
+Usage:
+    python3 tools/package_hls.py                        # tutti gli argomenti
+    python3 tools/package_hls.py gas_perfetto --force
+    python3 tools/package_hls.py --serve frontend/dist --port 8000
+"""
+
+import argparse
+import functools
+import hashlib
+import http.server
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import encode_web
+from common import (MEDIA_DIR, QUALITIES, ROOT, content_hash, discover_topics, find_topic, prune_db,
+                    read_db, relative, run_parallel, write_db)
+from media_gc import format_size
+from transcode import LADDER, _size
+
+DB_NAME = "packages.json"
+DB_VERSION = 1
+
+# Da incrementare se cambia il modo di impacchettare (i pacchetti vengono rifatti)
+PACKAGE_EPOCH = 1
+
+# Durata dei segmenti: multiplo del GOP dei video web (encode_web.KEYINT_SECONDS)
+SEGMENT_SECONDS = 4
+
+# Qualità della scala HLS, dalla più alta (4K escluso: troppo pesante per il web)
+HLS_LADDER = ("qh", "qm", "ql")
+
+# Codec delle varianti: AV1 pesa meno a parità di qualità, H.264 lo legge
+# qualunque player. VP9 no: in fMP4/HLS lo leggono pochi player.
+HLS_CODECS = ("av1", "h264")
+
+MASTER = "master.m3u8"
+PLAYLIST = "playlist.m3u8"
+INIT = "init.mp4"
+
+# Tipi MIME di --serve (http.server non conosce .m3u8 e .m4s)
+MIME_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".m4s": "video/iso.segment"}
+
+
+def rungs(source):
+    """Qualità di ``HLS_LADDER`` ricavabili da ``source`` senza ingrandire, dalla più alta."""
+    sw, sh = _size(source)
+    sfps = QUALITIES[source]["fps"]
+    return [q for q in HLS_LADDER
+            if _size(q)[0] <= sw and _size(q)[1] <= sh and sfps % QUALITIES[q]["fps"] == 0]
+
+
+def hls_codecs(profile, ffmpeg="ffmpeg"):
+    """Codec delle varianti: H.264 sempre, AV1 se ``profile`` lo prevede e ffmpeg ha l'encoder."""
+    return [codec for codec in HLS_CODECS
+            if codec == "h264" or (codec in encode_web.PROFILES[profile]
+                                   and encode_web.has_encoder(encode_web.CODECS[codec]["encoder"],
+                                                              ffmpeg))]
+
+
+def variant_dir(quality, codec="h264"):
+    """Cartella di una variante nel pacchetto: ``1920p60``, ``1920p60-av1``."""
+    directory = QUALITIES[quality]["dir"]
+    return directory if codec == "h264" else f"{directory}-{codec}"
+
+
+def scene_videos(topic):
+    """``{scena: {qualità: Path}}`` dei video di Manim dell'argomento."""
+    videos = {}
+    for quality in LADDER:
+        directory = topic.videos_dir(quality)
+        if directory.is_dir():
+            for video in sorted(directory.glob("*.mp4")):
+                if not video.name.startswith("."):
+                    videos.setdefault(video.stem, {})[quality] = video
+    return videos
+
+
+def db_path(topic):
+    return topic.hls_dir / DB_NAME
+
+
+def load_db(topic):
+    """Database dei pacchetti, vuoto se manca o è di un'altra versione."""
+    return read_db(db_path(topic), DB_VERSION)[0]
+
+
+def save_db(topic, db):
+    write_db(db_path(topic), db)
+
+
+def plan_scene(topic, scene, videos, encodes, profile, recorded=None, codecs=("h264",)):
+    """
+    Piano di impacchettamento di una scena.
+
+    Parameters:
+    -----------
+    topic : Topic
+        Argomento della scena
+    scene : str
+        Nome della scena
+    videos : dict
+        ``{qualità: Path}`` dei video di Manim della scena
+    encodes : dict
+        ``{qualità: database}`` di encode_web.py (letti al bisogno)
+    profile : str
+        Profilo di encode_web.py per le varianti da codificare
+    recorded : dict
+        Voce del database dei pacchetti (riusa l'hash della sorgente)
+    codecs : list of str
+        Codec delle varianti (vedi ``hls_codecs``)
+
+    Returns:
+    --------
+    dict
+        ``source`` (qualità), ``sha256``, ``stat``, ``variants`` (qualità,
+        codec, modo ``copy`` o ``encode``, ingresso relativo a media/) e ``key``
+    """
+    source = next(q for q in LADDER if q in videos)
+    sha, st = encode_web.source_hash(videos[source], recorded)
+    variants = []
+    for quality in rungs(source):
+        web = {}
+        if quality in videos:
+            if quality not in encodes:
+                encodes[quality] = encode_web.load_db(topic, quality)
+            db = encodes[quality]
+            raw = sha if quality == source else \
+                encode_web.source_hash(videos[quality], db["scenes"].get(scene))[0]
+            web = encode_web.renditions(topic, quality, scene, raw, db)
+        for codec in codecs:
+            if codec in web:
+                variants.append({"quality": quality, "codec": codec, "mode": "copy",
+                                 "input": web[codec]["path"],
+                                 "input_sha256": web[codec]["sha256"]})
+            else:
+                variants.append({"quality": quality, "codec": codec, "mode": "encode",
+                                 "input": videos[source].relative_to(MEDIA_DIR).as_posix(),
+                                 "input_sha256": sha,
+                                 "profile_key": encode_web.profile_key(profile, quality, codec)})
+    payload = json.dumps({"epoch": PACKAGE_EPOCH, "segment_seconds": SEGMENT_SECONDS,
+                          "variants": [{k: v for k, v in variant.items() if k != "input"}
+                                       for variant in variants]}, sort_keys=True)
+    return {"source": source, "sha256": sha, "stat": st, "variants": variants,
+            "key": hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]}
+
+
+def hls_command(source, directory, quality, mode, profile, ffmpeg="ffmpeg", threads=2,
+                codec="h264"):
+    """
+    Riga di comando ffmpeg per la variante ``quality`` e ``codec`` in
+    ``directory``: ``copy`` riconfeziona un video web, ``encode`` codifica
+    dalla sorgente.
+    """
+    if mode == "copy":
+        video = ["-map", "0:v:0", "-c:v", "copy"]
+    else:
+        width, height = _size(quality)
+        video = ["-vf", f"fps={QUALITIES[quality]['fps']},scale={width}:{height}:flags=lanczos"]
+        video += encode_web.video_args(profile, quality, codec, threads)
+    return [
+        ffmpeg, "-y", "-loglevel", "error", "-i", str(source), *video, "-an",
+        "-f", "hls", "-hls_time", str(SEGMENT_SECONDS), "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4", "-hls_fmp4_init_filename", INIT,
+        "-hls_segment_filename", str(directory / "seg_%03d.m4s"),
+        "-hls_flags", "independent_segments",
+        str(directory / PLAYLIST),
+    ]
+
+
+def read_playlist(path):
+    """``[(durata, file)]`` dei segmenti di una playlist di variante."""
+    segments, duration = [], None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line.startswith("#EXTINF:"):
+            duration = float(line[len("#EXTINF:"):].split(",")[0])
+        elif line and not line.startswith("#") and duration is not None:
+            segments.append((duration, line))
+            duration = None
+    return segments
+
+
+def variant_info(directory, quality, codec="h264"):
+    """
+    Attributi di una variante impacchettata per la master playlist: banda di
+    picco (segmento più pesante) e media in bit/s, risoluzione, fps e codecs.
+    """
+    segments = read_playlist(directory / PLAYLIST)
+    if not segments:
+        raise ValueError(f"{relative(directory / PLAYLIST)} senza segmenti")
+    sizes = [(seconds, (directory / name).stat().st_size) for seconds, name in segments]
+    total = sum(seconds for seconds, _ in sizes)
+    width, height = _size(quality)
+    return {
+        "quality": quality,
+        "codec": codec,
+        "uri": f"{variant_dir(quality, codec)}/{PLAYLIST}",
+        "bandwidth": max(int(size * 8 / seconds) for seconds, size in sizes if seconds > 0),
+        "average_bandwidth": int(sum(size for _, size in sizes) * 8 / total),
+        "resolution": f"{width}x{height}",
+        "fps": QUALITIES[quality]["fps"],
+        "codecs": encode_web.codecs_string(codec, quality),
+        "duration": round(total, 3),
+        "segments": len(segments),
+    }
+
+
+def master_playlist(variants):
+    """Testo della master playlist, dalla variante più leggera (avvio rapido)."""
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for v in sorted(variants, key=lambda v: v["bandwidth"]):
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={v['bandwidth']},"
+                     f"AVERAGE-BANDWIDTH={v['average_bandwidth']},RESOLUTION={v['resolution']},"
+                     f"FRAME-RATE={v['fps']:.3f},CODECS=\"{v['codecs']}\"")
+        lines.append(v["uri"])
+    return "\n".join(lines) + "\n"
+
+
+def package_hash(files):
+    """Hash del pacchetto: cambia se cambia uno qualunque dei suoi file."""
+    digest = hashlib.sha256()
+    for name, f in sorted(files.items()):
+        digest.update(f"{name} {f['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _prune(topic, db, sources):
+    """Elimina i pacchetti delle scene senza più sorgente e le cartelle non registrate."""
+    return prune_db(db, sources, topic.hls_dir, lambda pruned: {DB_NAME} | set(pruned["scenes"]))
+
+
+def pending(topics, profile=encode_web.DEFAULT_PROFILE, scenes=None, force=False, codecs=("h264",)):
+    """
+    Scene da impacchettare.
+
+    Un pacchetto è aggiornato se il database registra la stessa chiave (hash
+    della sorgente, dei video web riconfezionati e delle impostazioni) e la
+    sua cartella esiste. Se ``scenes`` è None si eliminano anche i pacchetti
+    delle scene senza più sorgente.
+
+    Parameters:
+    -----------
+    topics : list of Topic
+        Argomenti da elaborare
+    profile : str
+        Profilo di encode_web.py per le varianti senza video web
+    scenes : set of str
+        Solo queste scene (``disciplina/argomento:Scena``)
+    force : bool
+        Impacchetta anche le scene aggiornate
+    codecs : list of str
+        Codec delle varianti (vedi ``hls_codecs``)
+
+    Returns:
+    --------
+    tuple
+        ``(lavori, aggiornati)``: lista di ``(topic, scena, piano)`` e numero
+        di pacchetti già aggiornati
+    """
+    work, fresh = [], 0
+    for topic in topics:
+        sources = scene_videos(topic)
+        db = load_db(topic)
+        changed = _prune(topic, db, sources) if scenes is None else False
+        encodes = {}
+        for scene, videos in sources.items():
+            if scenes is not None and f"{topic.path}:{scene}" not in scenes:
+                continue
+            entry = db["scenes"].get(scene)
+            plan = plan_scene(topic, scene, videos, encodes, profile, entry, codecs)
+            if not force and entry and entry["key"] == plan["key"] \
+                    and (topic.hls_dir / scene / MASTER).is_file():
+                if entry["source_mtime_ns"] != plan["stat"].st_mtime_ns:
+                    entry["source_mtime_ns"] = plan["stat"].st_mtime_ns
+                    changed = True
+                fresh += 1
+            else:
+                work.append((topic, scene, plan))
+        if changed:
+            save_db(topic, db)
+    return work, fresh
+
+
+def _package(job, profile, ffmpeg, threads):
+    topic, scene, plan = job
+    tmp = topic.hls_dir / f".{scene}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    start = time.time()
+    try:
+        variants = []
+        for variant in plan["variants"]:
+            quality, codec = variant["quality"], variant["codec"]
+            directory = tmp / variant_dir(quality, codec)
+            directory.mkdir(parents=True)
+            result = subprocess.run(
+                hls_command(MEDIA_DIR / variant["input"], directory, quality, variant["mode"],
+                            profile, ffmpeg, threads, codec),
+                capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                return job, None, result.stderr.strip()
+            variants.append(variant_info(directory, quality, codec))
+        (tmp / MASTER).write_text(master_playlist(variants), encoding="utf-8")
+    except (OSError, ValueError) as exc:
+        return job, None, str(exc)
+    finally:
+        if not (tmp / MASTER).is_file():
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    files = {path.relative_to(tmp).as_posix(): {"sha256": content_hash(path),
+                                                "bytes": path.stat().st_size}
+             for path in sorted(tmp.rglob("*")) if path.is_file()}
+    st = plan["stat"]
+    entry = {
+        "key": plan["key"],
+        "source_quality": plan["source"],
+        "source_sha256": plan["sha256"],
+        "source_bytes": st.st_size,
+        "source_mtime_ns": st.st_mtime_ns,
+        "sha256": package_hash(files),
+        "bytes": sum(f["bytes"] for f in files.values()),
+        "files": files,
+        "variants": [{k: v[k] for k in ("quality", "codec", "resolution", "bandwidth", "codecs")}
+                     for v in variants],
+        "modes": {variant_dir(v["quality"], v["codec"]): v["mode"] for v in plan["variants"]},
+        "seconds": round(time.time() - start, 2),
+        "packaged_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    target = topic.hls_dir / scene
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return job, entry, ""
+
+
+def package(work, profile=encode_web.DEFAULT_PROFILE, jobs_count=None, ffmpeg="ffmpeg"):
+    """
+    Impacchetta ``work`` (vedi ``pending``), una scena per processo ffmpeg in parallelo.
+
+    Returns:
+    --------
+    bool
+        True se tutti i pacchetti sono riusciti
+    """
+    if not work:
+        return True
+    if shutil.which(ffmpeg) is None:
+        raise SystemExit(f"Errore: {ffmpeg} non trovato (serve per i pacchetti HLS)")
+    workers = jobs_count or max((os.cpu_count() or 2) // 2, 1)
+    return run_parallel(work, lambda job: _package(job, profile, ffmpeg, 2), workers,
+                        lambda job: f"{job[0].path}:{job[1]}", _packaged)
+
+
+def _packaged(job, entry):
+    """Registra un pacchetto riuscito e ne descrive la scala."""
+    topic, scene, plan = job
+    db = load_db(topic)
+    db["scenes"][scene] = entry
+    save_db(topic, db)
+    ladder = ", ".join(f"{v['quality']} {v['codec']} {v['bandwidth'] // 1000}k"
+                       for v in entry["variants"])
+    return f"[{plan['source']}] {ladder} ({format_size(entry['bytes'])}, {entry['seconds']}s)"
+
+
+def streams(topic, scenes):
+    """
+    Pacchetti HLS aggiornati di un argomento, per il manifest dei media.
+
+    Parameters:
+    -----------
+    topic : Topic
+        Argomento
+    scenes : dict
+        Scene del manifest (``{scena: {qualità: voce}}``): un pacchetto vale
+        solo se la sua sorgente è il video registrato
+
+    Returns:
+    --------
+    dict
+        ``{scena: voce}`` con cartella (relativa a media/), hash e byte del
+        pacchetto, file e varianti
+    """
+    result = {}
+    for scene, entry in load_db(topic)["scenes"].items():
+        video = scenes.get(scene, {}).get(entry["source_quality"])
+        if not video or video["sha256"] != entry["source_sha256"]:
+            continue
+        directory = topic.hls_dir / scene
+        if any(not (directory / name).is_file() or (directory / name).stat().st_size != f["bytes"]
+               for name, f in entry["files"].items()):
+            continue
+        result[scene] = {
+            "path": directory.relative_to(MEDIA_DIR).as_posix(),
+            "sha256": entry["sha256"],
+            "bytes": entry["bytes"],
+            "variants": entry["variants"],
+            "files": entry["files"],
+        }
+    return result
+
+
+def serve(directory, port):
+    """Server statico di ``directory`` con i tipi MIME di HLS (prove in locale)."""
+    handler = type("HLSHandler", (http.server.SimpleHTTPRequestHandler,), {
+        "extensions_map": {**http.server.SimpleHTTPRequestHandler.extensions_map, **MIME_TYPES},
+    })
+    server = http.server.ThreadingHTTPServer(("", port),
+                                             functools.partial(handler, directory=str(directory)))
+    print(f"{relative(directory)} su http://localhost:{port}/ (Ctrl+C per uscire)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pacchetti HLS (fMP4) della scala di qualità delle scene.")
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--profile", default=encode_web.DEFAULT_PROFILE,
+                        choices=sorted(encode_web.PROFILES),
+                        help="profilo delle varianti senza video web (con AV1 se lo "
+                             f"prevede; default: {encode_web.DEFAULT_PROFILE})")
+    parser.add_argument("--jobs", type=int, default=None, help="processi ffmpeg in parallelo")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="eseguibile di ffmpeg")
+    parser.add_argument("--force", action="store_true", help="impacchetta anche le scene aggiornate")
+    parser.add_argument("--serve", nargs="?", const="frontend/dist", default=None, metavar="DIR",
+                        help="serve DIR con i tipi MIME di HLS (default: frontend/dist)")
+    parser.add_argument("--port", type=int, default=8000, help="porta di --serve (default: 8000)")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        directory = ROOT / args.serve
+        if not directory.is_dir():
+            print(f"Cartella {args.serve} non trovata (make frontend-build?)")
+            return 1
+        return serve(directory, args.port)
+
+    topics = [find_topic(t) for t in args.topics] if args.topics else discover_topics()
+    # senza ffmpeg non c'è nulla da sondare: package() lo segnala se serve
+    codecs = hls_codecs(args.profile, args.ffmpeg) if shutil.which(args.ffmpeg) else ["h264"]
+    work, fresh = pending(topics, args.profile, force=args.force, codecs=codecs)
+    print(f"{len(work)} scene da impacchettare in HLS ({fresh} già aggiornate)")
+    return 0 if package(work, args.profile, args.jobs, args.ffmpeg) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Posters - Poster frames and animated previews of the scenes
+
+Without a poster a <video preload="none"> is a blank box, and with a
+preload the browser downloads video data just to paint the first frame: on
+pages with many scenes (sistemi_lineari has 8) that is megabytes before the
+reader presses play. This stage extracts from the best video Manim rendered
+for every scene, into media/<discipline>/posters/<topic>/:
+
+- a poster frame, AVIF (<Scene>.avif) and WebP (<Scene>.webp), at most
+  POSTER_WIDTH pixels wide: the last frame, where a Manim scene shows its
+  complete result, or the instant given by the POSTER_TIME class attribute
+  of the scene (seconds, negative = from the end; it does not change the
+  scene fingerprint, so editing it does not render the scene again);
+- with --preview, a short muted looping preview (<Scene>.preview.mp4): the
+  whole scene sped up to PREVIEW_SECONDS, small and at a low bitrate.
+
+A format whose encoder ffmpeg lacks (libaom-av1/libsvtav1, libwebp) is
+skipped with a warning. Results are stored in posters.json, keyed by the
+SHA-256 of the source video and the settings: a poster is extracted again
+only when one of them changes. media_manifest.py lists them under "posters"
+and the player shows them in place of the video until it is played.
+
+Usage:
+    python3 tools/posters.py                        # tutti gli argomenti
+    python3 tools/posters.py sistemi_lineari --preview
+    python3 tools/posters.py --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import encode_web
+from common import (MEDIA_DIR, content_hash, discover_topics, find_topic, prune_db, read_db,
+                    run_parallel, write_db)
+from fingerprint import ModuleInfo
+from media_gc import format_size
+from package_hls import scene_videos
+from scene_registry import poster_time
+from transcode import LADDER
+
+DB_NAME = "posters.json"
+DB_VERSION = 1
+
+# Da incrementare se cambia il modo di estrarre poster e anteprime (vengono rifatti)
+POSTER_EPOCH = 1
+
+# Larghezza massima del poster: il player è largo al più 350px CSS, 2x per
+# gli schermi ad alta densità
+POSTER_WIDTH = 720
+
+# Formati del poster, in ordine di preferenza per il player: AVIF pesa meno,
+# WebP lo legge qualunque browser. Il primo encoder disponibile viene usato.
+FORMATS = {
+    "avif": {"suffix": ".avif", "mime": "image/avif", "encoders": {
+        "libaom-av1": ["-still-picture", "1", "-crf", "32", "-b:v", "0", "-cpu-used", "4"],
+        "libsvtav1": ["-crf", "32", "-preset", "6"],
+    }},
+    "webp": {"suffix": ".webp", "mime": "image/webp", "encoders": {
+        "libwebp": ["-quality", "80", "-compression_level", "6"],
+    }},
+}
+
+# Anteprima animata: tutta la scena accelerata a PREVIEW_SECONDS, H.264
+# (muta, in loop) piccola e a bitrate basso
+PREVIEW_SECONDS = 4
+PREVIEW_WIDTH = 360
+PREVIEW_FPS = 12
+PREVIEW_CRF = 32
+PREVIEW_SUFFIX = ".preview.mp4"
+PREVIEW_CODECS = "avc1.64001e"
+
+
+def output_path(topic, scene, kind):
+    """File di una scena per ``kind`` (formato del poster o ``preview``)."""
+    suffix = PREVIEW_SUFFIX if kind == "preview" else FORMATS[kind]["suffix"]
+    return topic.posters_dir / f"{scene}{suffix}"
+
+
+def db_path(topic):
+    return topic.posters_dir / DB_NAME
+
+
+def load_db(topic):
+    """Database dei poster, vuoto se manca o è di un'altra versione."""
+    return read_db(db_path(topic), DB_VERSION)[0]
+
+
+def save_db(topic, db):
+    write_db(db_path(topic), db)
+
+
+def available_encoders(ffmpeg="ffmpeg"):
+    """
+    ``{formato: encoder}`` dei formati del poster che ffmpeg sa produrre; per
+    i mancanti stampa un avviso.
+    """
+    result = {}
+    for fmt, spec in FORMATS.items():
+        found = next((name for name in spec["encoders"] if encode_web.has_encoder(name, ffmpeg)),
+                     None)
+        if found:
+            result[fmt] = found
+        else:
+            print(f"Attenzione: ffmpeg senza {' o '.join(spec['encoders'])}, niente poster {fmt}")
+    return result
+
+
+def settings_key(seconds, encoders, preview):
+    """Hash di istante e impostazioni: cambia solo se cambia il risultato."""
+    payload = json.dumps({
+        "epoch": POSTER_EPOCH,
+        "time": seconds,
+        "width": POSTER_WIDTH,
+        "formats": {fmt: [name, FORMATS[fmt]["encoders"][name]] for fmt, name in encoders.items()},
+        "preview": [PREVIEW_SECONDS, PREVIEW_WIDTH, PREVIEW_FPS, PREVIEW_CRF] if preview else None,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def frame_command(source, target, seconds, ffmpeg="ffmpeg"):
+    """
+    Riga di comando ffmpeg per estrarre in PNG il frame all'istante
+    ``seconds`` (negativo = dalla fine; None = ultimo frame).
+    """
+    if seconds is None:
+        # Decodifica l'ultimo secondo e sovrascrive il file a ogni frame
+        seek, frames = ["-sseof", "-1"], ["-update", "1"]
+    elif seconds < 0:
+        seek, frames = ["-sseof", str(seconds)], ["-frames:v", "1"]
+    else:
+        seek, frames = ["-ss", str(seconds)], ["-frames:v", "1"]
+    return [ffmpeg, "-y", "-loglevel", "error", *seek, "-i", str(source),
+            "-vf", f"scale='min({POSTER_WIDTH},iw)':-2", *frames, str(target)]
+
+
+def image_command(frame, target, fmt, encoder, ffmpeg="ffmpeg"):
+    """Riga di comando ffmpeg per codificare il frame PNG nel formato ``fmt``."""
+    return [ffmpeg, "-y", "-loglevel", "error", "-i", str(frame), "-frames:v", "1",
+            "-c:v", encoder, *FORMATS[fmt]["encoders"][encoder], "-pix_fmt", "yuv420p",
+            str(target)]
+
+
+def preview_command(source, target, duration, ffmpeg="ffmpeg"):
+    """
+    Riga di comando ffmpeg per l'anteprima: la scena accelerata fino a
+    PREVIEW_SECONDS (le scene più brevi restano a velocità normale).
+    """
+    speed = min(PREVIEW_SECONDS / duration, 1.0) if duration else 1.0
+    return [ffmpeg, "-y", "-loglevel", "error", "-i", str(source),
+            "-vf", f"setpts={speed:.6f}*PTS,fps={PREVIEW_FPS},scale={PREVIEW_WIDTH}:-2",
+            "-t", str(PREVIEW_SECONDS), "-an", "-c:v", "libx264", "-preset", "slow",
+            "-tune", "animation", "-crf", str(PREVIEW_CRF), "-profile:v", "high",
+            "-level:v", "3.0", "-pix_fmt", "yuv420p", "-movflags", "+faststart", str(target)]
+
+
+def duration(video, ffprobe="ffprobe"):
+    """Durata del video in secondi via ffprobe (None se non si legge)."""
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(video)],
+        capture_output=True, text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def png_size(path):
+    """``(larghezza, altezza)`` di un PNG, dall'intestazione IHDR."""
+    with open(path, "rb") as fh:
+        header = fh.read(24)
+    return struct.unpack(">II", header[16:24])
+
+
+def _prune(topic, db, sources):
+    """Elimina dal database le scene senza più sorgente e dalla cartella i file non registrati."""
+    return prune_db(db, sources, topic.posters_dir, lambda pruned: {DB_NAME} | {
+        output_path(topic, scene, kind).name
+        for scene, entry in pruned["scenes"].items() for kind in entry["files"]})
+
+
+def pending(topics, encoders, preview=False, scenes=None, force=False):
+    """
+    Scene di cui estrarre poster (e anteprima).
+
+    Un poster è aggiornato se il database registra lo stesso hash della
+    sorgente e la stessa chiave delle impostazioni (istante, formati,
+    anteprima) e i suoi file esistono. Se ``scenes`` è None si eliminano
+    anche i poster delle scene senza più sorgente.
+
+    Parameters:
+    -----------
+    topics : list of Topic
+        Argomenti da elaborare
+    encoders : dict
+        ``{formato: encoder}`` (vedi ``available_encoders``)
+    preview : bool
+        Produce anche l'anteprima animata
+    scenes : set of str
+        Solo queste scene (``disciplina/argomento:Scena``)
+    force : bool
+        Estrae anche i poster aggiornati
+
+    Returns:
+    --------
+    tuple
+        ``(lavori, aggiornati)``: lista di ``(topic, scena, qualità, istante,
+        chiave, sha256, stat)`` e numero di poster già aggiornati
+    """
+    work, fresh = [], 0
+    for topic in topics:
+        sources = scene_videos(topic)
+        db = load_db(topic)
+        changed = _prune(topic, db, sources) if scenes is None else False
+        info = ModuleInfo.load(topic.source) if sources else None
+        for scene, videos in sources.items():
+            if scenes is not None and f"{topic.path}:{scene}" not in scenes:
+                continue
+            quality = next(q for q in LADDER if q in videos)
+            seconds = poster_time(info, scene) if scene in info.defs else None
+            key = settings_key(seconds, encoders, preview)
+            entry = db["scenes"].get(scene)
+            sha, st = encode_web.source_hash(videos[quality], entry)
+            if (not force and entry and entry["source_sha256"] == sha and entry["key"] == key
+                    and all(output_path(topic, scene, kind).is_file() for kind in entry["files"])):
+                if entry["source_mtime_ns"] != st.st_mtime_ns:
+                    entry["source_mtime_ns"] = st.st_mtime_ns
+                    changed = True
+                fresh += 1
+            else:
+                work.append((topic, scene, quality, seconds, key, sha, st))
+        if changed:
+            save_db(topic, db)
+    return work, fresh
+
+
+def _run(command):
+    """Esegue ffmpeg: messaggio d'errore, vuoto se riesce."""
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        return result.stderr.strip() or f"{command[0]} terminato con codice {result.returncode}"
+    return ""
+
+
+def _extract(job, encoders, preview, ffmpeg, ffprobe):
+    topic, scene, quality, seconds, key, sha, st = job
+    source = scene_videos(topic)[scene][quality]
+    topic.posters_dir.mkdir(parents=True, exist_ok=True)
+    start = time.time()
+    outputs = {}
+    with tempfile.TemporaryDirectory(dir=topic.posters_dir, prefix=f".{scene}.") as tmp:
+        frame = Path(tmp) / "frame.png"
+        error = _run(frame_command(source, frame, seconds, ffmpeg))
+        if error or not frame.is_file():
+            return job, None, error or f"nessun frame a {seconds}s"
+        width, height = png_size(frame)
+        for fmt, encoder in encoders.items():
+            target = Path(tmp) / f"poster{FORMATS[fmt]['suffix']}"
+            error = _run(image_command(frame, target, fmt, encoder, ffmpeg))
+            if error or not target.is_file():
+                return job, None, error or f"{target.name} non creato"
+            outputs[fmt] = target
+        if preview:
+            target = Path(tmp) / f"poster{PREVIEW_SUFFIX}"
+            error = _run(preview_command(source, target, duration(source, ffprobe), ffmpeg))
+            if error or not target.is_file():
+                return job, None, error or f"{target.name} non creato"
+            outputs["preview"] = target
+        files = {kind: {"sha256": content_hash(path), "bytes": path.stat().st_size}
+                 for kind, path in outputs.items()}
+        for kind, path in outputs.items():
+            os.replace(path, output_path(topic, scene, kind))
+    # File di un'estrazione precedente non più prodotti (es. anteprima tolta)
+    for kind in [*FORMATS, "preview"]:
+        if kind not in outputs:
+            output_path(topic, scene, kind).unlink(missing_ok=True)
+    entry = {
+        "key": key,
+        "source_quality": quality,
+        "source_sha256": sha,
+        "source_bytes": st.st_size,
+        "source_mtime_ns": st.st_mtime_ns,
+        "time": seconds,
+        "width": width,
+        "height": height,
+        "files": files,
+        "seconds": round(time.time() - start, 2),
+        "extracted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    return job, entry, ""
+
+
+def extract(work, encoders, preview=False, jobs_count=None, ffmpeg="ffmpeg", ffprobe="ffprobe"):
+    """
+    Estrae poster e anteprime di ``work`` (vedi ``pending``) in parallelo.
+
+    Returns:
+    --------
+    bool
+        True se tutte le estrazioni sono riuscite
+    """
+    if not work:
+        return True
+    if shutil.which(ffmpeg) is None:
+        raise SystemExit(f"Errore: {ffmpeg} non trovato (serve per i poster)")
+    workers = jobs_count or os.cpu_count() or 2
+    return run_parallel(work, lambda job: _extract(job, encoders, preview, ffmpeg, ffprobe), workers,
+                        lambda job: f"{job[0].path}:{job[1]} [{job[2]}]", _extracted)
+
+
+def _extracted(job, entry):
+    """Registra un poster riuscito e ne descrive i file."""
+    topic, scene, quality, seconds, *_ = job
+    db = load_db(topic)
+    db["scenes"][scene] = entry
+    save_db(topic, db)
+    at = "ultimo frame" if seconds is None else f"{seconds}s"
+    sizes = ", ".join(f"{kind} {format_size(f['bytes'])}" for kind, f in entry["files"].items())
+    return f"{at}: {sizes}"
+
+
+def scene_posters(topic, scenes):
+    """
+    Poster e anteprime aggiornati di un argomento, per il manifest dei media.
+
+    Parameters:
+    -----------
+    topic : Topic
+        Argomento
+    scenes : dict
+        Scene del manifest (``{scena: {qualità: voce}}``): un poster vale solo
+        se la sua sorgente è il video registrato
+
+    Returns:
+    --------
+    dict
+        ``{scena: voce}`` con ``width``, ``height``, ``images`` (in ordine di
+        preferenza: formato, percorso relativo a media/, hash, byte, tipo
+        MIME) e, se c'è, ``preview``
+    """
+    result = {}
+    for scene, entry in load_db(topic)["scenes"].items():
+        video = scenes.get(scene, {}).get(entry["source_quality"])
+        if not video or video["sha256"] != entry["source_sha256"]:
+            continue
+        items = {}
+        for kind, f in entry["files"].items():
+            path = output_path(topic, scene, kind)
+            if path.is_file() and path.stat().st_size == f["bytes"]:
+                mime = f'video/mp4; codecs="{PREVIEW_CODECS}"' if kind == "preview" \
+                    else FORMATS[kind]["mime"]
+                items[kind] = {"path": path.relative_to(MEDIA_DIR).as_posix(),
+                               "sha256": f["sha256"], "bytes": f["bytes"], "type": mime}
+        images = [dict(items[fmt], format=fmt) for fmt in FORMATS if fmt in items]
+        if not images:
+            continue
+        result[scene] = {"width": entry["width"], "height": entry["height"], "images": images}
+        if "preview" in items:
+            result[scene]["preview"] = items["preview"]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poster (AVIF/WebP) e anteprime animate delle scene.")
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--preview", action="store_true",
+                        help=f"anche l'anteprima animata ({PREVIEW_SECONDS}s, in loop)")
+    parser.add_argument("--jobs", type=int, default=None, help="processi ffmpeg in parallelo")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="eseguibile di ffmpeg")
+    parser.add_argument("--ffprobe", default="ffprobe", help="eseguibile di ffprobe")
+    parser.add_argument("--force", action="store_true", help="estrae anche i poster aggiornati")
+    args = parser.parse_args(argv)
+
+    if shutil.which(args.ffmpeg) is None:
+        print(f"Errore: {args.ffmpeg} non trovato (serve per i poster)")
+        return 1
+    encoders = available_encoders(args.ffmpeg)
+    if not encoders:
+        return 1
+    topics = [find_topic(t) for t in args.topics] if args.topics else discover_topics()
+    work, fresh = pending(topics, encoders, args.preview, force=args.force)
+    print(f"{len(work)} poster da estrarre ({fresh} già aggiornati)")
+    return 0 if extract(work, encoders, args.preview, args.jobs, args.ffmpeg, args.ffprobe) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
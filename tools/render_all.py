@@ -0,0 +1,353 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Render All - Parallel scene renderer with a longest-job-first scheduler
+
+Expands every topic into one job per out-of-date scene (same fingerprints
+and build databases as build_scenes.py) and renders the jobs in parallel:
+  - the pool is sized on the machine: cores, and available RAM divided by
+    the memory a Manim render needs at the requested quality;
+  - jobs start longest-first, using the durations recorded in the build
+    databases (LPT scheduling), so the total time is bound by the CPU work
+    and not by the slowest topic's chain of scenes;
+  - progress is streamed as jobs finish and a summary is written to
+    media/.render-summary.json.
+
+If the render server is running (see render_server.py) the jobs are sent to
+it in the same order; otherwise each job is one `manim` process, with its
+output in media/.logs/.
+
+Usage:
+    python3 tools/render_all.py --quality qh --manim ~/.virtualenvs/manim/bin/manim
+    python3 tools/render_all.py --quality ql --jobs 4 gas_perfetto onde
+    python3 tools/render_all.py --dry-run
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from build_scenes import (db_path, load_db, manim_command, mark_incomplete, record_scene,
+                          save_db, stale_scenes, video_path)
+from common import MEDIA_DIR, QUALITIES, RENDER_SOCKET, discover_topics, find_topic, relative
+from fingerprint import topic_fingerprints
+import render_client
+import telemetry
+
+SUMMARY_PATH = MEDIA_DIR / ".render-summary.json"
+LOGS_DIR = MEDIA_DIR / ".logs"
+
+# Memoria di picco stimata per un render Manim (GB) per qualità: cresce con i
+# pixel del frame (buffer Cairo, frame in coda a ffmpeg).
+MEMORY_PER_JOB_GB = {"ql": 0.8, "qm": 1.2, "qh": 2.0, "qk": 4.5}
+
+# Durata ipotetica (s) di una scena mai renderizzata, se non c'è storico
+DEFAULT_SECONDS = 60.0
+
+
+def available_memory_gb():
+    """RAM disponibile in GB (None se non determinabile)."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024 ** 2
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES") / 1024 ** 3
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def pool_size(quality):
+    """Numero di processi: il minimo tra core e RAM disponibile / memoria per job."""
+    cores = os.cpu_count() or 1
+    memory = available_memory_gb()
+    if memory is None:
+        return cores
+    return max(1, min(cores, int(memory // MEMORY_PER_JOB_GB[quality])))
+
+
+def _pixel_rate(quality):
+    width, height = (int(v) for v in QUALITIES[quality]["resolution"].split(","))
+    return width * height * QUALITIES[quality]["fps"]
+
+
+def estimate_seconds(topic, scene, quality, history):
+    """
+    Durata attesa di una scena dai database di build.
+
+    Usa la durata registrata alla stessa qualità; altrimenti quella di un'altra
+    qualità scalata sul numero di pixel al secondo; altrimenti ``None``.
+    """
+    durations = history.get((topic.path, scene), {})
+    if quality in durations:
+        return durations[quality]
+    if durations:
+        other, seconds = next(iter(durations.items()))
+        return seconds * _pixel_rate(quality) / _pixel_rate(other)
+    return None
+
+
+def load_history(topics):
+    """
+    ``{(argomento, scena): {qualità: secondi}}`` da tutti i database di build.
+
+    Solo i tempi di render: le qualità ricavate con transcode.py
+    (``derived_from``) non dicono quanto costerebbe renderizzarle.
+    """
+    history = {}
+    for topic in topics:
+        for quality in QUALITIES:
+            if not db_path(topic, quality).is_file():
+                continue
+            for scene, entry in load_db(topic, quality)["scenes"].items():
+                if entry.get("seconds") and not entry.get("derived_from"):
+                    history.setdefault((topic.path, scene), {})[quality] = entry["seconds"]
+    return history
+
+
+class Job:
+    """Una scena da renderizzare."""
+
+    def __init__(self, topic, scene, fingerprint, estimate):
+        self.topic = topic
+        self.scene = scene
+        self.fingerprint = fingerprint
+        self.estimate = estimate
+        self.seconds = None
+        self.ok = None
+        self.error = None
+        self.metrics = None
+
+    @property
+    def label(self):
+        return f"{self.topic.path}:{self.scene}"
+
+
+def plan(topics, quality, force=False):
+    """
+    Job da eseguire, in ordine di durata attesa decrescente (LPT).
+
+    Returns:
+    --------
+    tuple
+        ``(jobs, fingerprints, up_to_date)`` con ``fingerprints`` per argomento
+    """
+    history = load_history(topics)
+    jobs, fingerprints, up_to_date = [], {}, 0
+    for topic in topics:
+        fps = topic_fingerprints(topic)
+        fingerprints[topic.path] = fps
+        stale = stale_scenes(topic, quality, load_db(topic, quality), fps, force=force)
+        up_to_date += len(fps) - len(stale)
+        for scene in stale:
+            jobs.append(Job(topic, scene, fps[scene],
+                            estimate_seconds(topic, scene, quality, history)))
+
+    known = [j.estimate for j in jobs if j.estimate is not None]
+    fallback = statistics.median(known) if known else DEFAULT_SECONDS
+    for job in jobs:
+        if job.estimate is None:
+            job.estimate = fallback
+    jobs.sort(key=lambda j: j.estimate, reverse=True)
+    return jobs, fingerprints, up_to_date
+
+
+def _run_manim(job, quality, manim):
+    """Esegue un job come processo ``manim`` separato, con log su file."""
+    log = LOGS_DIR / job.topic.path / f"{job.scene}-{quality}.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    command, metrics_file = telemetry.probe_command(
+        manim, manim_command(manim, job.topic, quality, [job.scene]))
+    start = time.time()
+    with open(log, "w", encoding="utf-8") as out:
+        result = subprocess.run(command, cwd=job.topic.directory, stdout=out,
+                                stderr=subprocess.STDOUT)
+    job.seconds = round(time.time() - start, 2)
+    job.metrics = telemetry.read_probe(metrics_file).get(job.scene)
+    video = video_path(job.topic, quality, job.scene)
+    job.ok = result.returncode == 0 and video.is_file() and video.stat().st_mtime >= start - 1
+    if not job.ok:
+        tail = log.read_text(encoding="utf-8", errors="replace").splitlines()[-15:]
+        job.error = f"log: {relative(log)}\n" + "\n".join(tail)
+    return job
+
+
+class Progress:
+    """Avanzamento a righe, con stima del tempo residuo sulle durate attese."""
+
+    def __init__(self, jobs, workers):
+        self.total = len(jobs)
+        self.remaining_estimate = sum(j.estimate for j in jobs)
+        self.workers = workers
+        self.done = 0
+        self.start = time.time()
+        self.lock = threading.Lock()
+
+    def update(self, job):
+        with self.lock:
+            self.done += 1
+            self.remaining_estimate -= job.estimate
+            eta = self.remaining_estimate / self.workers
+            mark = "✓" if job.ok else "✗"
+            print(f"[{self.done}/{self.total}] {mark} {job.label} {job.seconds:.1f}s "
+                  f"(stima {job.estimate:.0f}s) · trascorsi {time.time() - self.start:.0f}s "
+                  f"· residuo ~{eta:.0f}s", flush=True)
+            if not job.ok and job.error:
+                print(job.error, flush=True)
+
+
+def render_all(topics, quality, manim="manim", jobs_count=None, force=False, dry_run=False,
+               socket_path=RENDER_SOCKET):
+    """
+    Renderizza in parallelo tutte le scene non aggiornate di ``topics``.
+
+    Parameters:
+    -----------
+    topics : list of Topic
+        Argomenti da costruire
+    quality : str
+        ql, qm, qh o qk
+    manim : str
+        Eseguibile di Manim (se non c'è il render server)
+    jobs_count : int
+        Processi in parallelo (default: ``pool_size(quality)``)
+    force : bool
+        Renderizza anche le scene aggiornate
+    dry_run : bool
+        Mostra solo il piano
+    socket_path : Path
+        Socket del render server, usato se attivo
+
+    Returns:
+    --------
+    dict
+        Riepilogo (scritto anche in ``media/.render-summary.json``)
+    """
+    jobs, fingerprints, up_to_date = plan(topics, quality, force=force)
+    status = render_client.ping(socket_path) if socket_path and not dry_run else None
+    workers = status["workers"] if status else (jobs_count or pool_size(quality))
+    if not status and workers > 1 and not dry_run and telemetry.probe_python(manim) is None:
+        # Senza la sonda non c'è il lock su Tex/ e texts/ (render_probe.py):
+        # processi manim paralleli compilerebbero le stesse formule insieme
+        print(f"Python di Manim non trovato accanto a {manim}: render in serie")
+        workers = 1
+
+    print(f"{len(jobs)} scene da renderizzare ({up_to_date} già aggiornate) "
+          f"su {len(topics)} argomenti, qualità {quality}, {workers} processi"
+          + (" (render server)" if status else ""))
+    if dry_run or not jobs:
+        for job in jobs:
+            print(f"  ~{job.estimate:6.0f}s  {job.label}")
+        return {"jobs": len(jobs), "up_to_date": up_to_date}
+
+    progress = Progress(jobs, workers)
+    db_lock = threading.Lock()
+
+    def record(job):
+        if job.ok:
+            # Il database dell'argomento si aggiorna a ogni scena: un'interruzione
+            # non fa perdere il lavoro già fatto
+            with db_lock:
+                db = load_db(job.topic, quality)
+                record_scene(db, job.scene, job.fingerprint, job.seconds)
+                save_db(job.topic, quality, db)
+            telemetry.record(job.topic, quality, job.scene, job.seconds, job.metrics,
+                             backend="server" if status else "manim")
+        progress.update(job)
+
+    if status:
+        by_key = {(str(j.topic.source), j.scene): j for j in jobs}
+        payload = [{"file": str(j.topic.source), "scene": j.scene, "quality": quality,
+                    "media_dir": str(j.topic.media_dir)} for j in jobs]
+        for result in render_client.submit(payload, socket_path):
+            job = by_key[(result["file"], result["scene"])]
+            job.ok, job.seconds, job.error = result["ok"], result["seconds"], result.get("error")
+            job.metrics = result.get("metrics")
+            record(job)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            # I thread attendono i processi manim: l'ordine di sottomissione è
+            # l'ordine di avvio, quindi i job più lunghi partono per primi
+            futures = [pool.submit(_run_manim, job, quality, manim) for job in jobs]
+            for future in concurrent.futures.as_completed(futures):
+                record(future.result())
+
+    for topic in topics:
+        mark_incomplete(topic, quality, load_db(topic, quality), fingerprints[topic.path])
+
+    wall = time.time() - progress.start
+    cpu = sum(j.seconds for j in jobs)
+    failed = [j for j in jobs if not j.ok]
+    summary = {
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quality": quality,
+        "workers": workers,
+        "jobs": len(jobs),
+        "up_to_date": up_to_date,
+        "failed": [j.label for j in failed],
+        "wall_seconds": round(wall, 1),
+        "job_seconds": round(cpu, 1),
+        "speedup": round(cpu / wall, 2) if wall else None,
+        "slowest": [{"scene": j.label, "seconds": j.seconds}
+                    for j in sorted(jobs, key=lambda j: j.seconds, reverse=True)[:10]],
+    }
+    SUMMARY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SUMMARY_PATH.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+    print("")
+    print(f"Completati {len(jobs) - len(failed)}/{len(jobs)} job in {wall:.0f}s "
+          f"({cpu:.0f}s di lavoro, speedup {summary['speedup']}x)")
+    for item in summary["slowest"][:5]:
+        print(f"  {item['seconds']:8.1f}s  {item['scene']}")
+    if failed:
+        print(f"Falliti ({len(failed)}): " + ", ".join(j.label for j in failed))
+    print(f"Riepilogo: {relative(SUMMARY_PATH)}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Renderizza in parallelo le scene non aggiornate (prima le più lunghe)."
+    )
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--quality", default="ql", choices=sorted(QUALITIES))
+    parser.add_argument("--manim", default="manim", help="eseguibile di Manim")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="processi in parallelo (default: in base a core e RAM)")
+    parser.add_argument("--force", action="store_true",
+                        help="renderizza anche le scene aggiornate")
+    parser.add_argument("--dry-run", action="store_true", help="mostra solo il piano")
+    parser.add_argument("--socket", default=str(RENDER_SOCKET),
+                        help="socket del render server, usato se attivo (\"\" per disattivarlo)")
+    args = parser.parse_args(argv)
+
+    topics = [find_topic(t) for t in args.topics] if args.topics else discover_topics()
+    summary = render_all(topics, args.quality, manim=args.manim, jobs_count=args.jobs,
+                         force=args.force, dry_run=args.dry_run, socket_path=args.socket)
+    return 1 if summary.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Render Client - Thin client for the render server
+
+Submits (file, scene, quality) jobs to render_server.py over its UNIX socket
+and streams back one result per scene. Standard library only and no Manim
+import, so it starts instantly; build_scenes.py uses it automatically when a
+server is listening and falls back to running `manim` otherwise.
+
+Usage:
+    python3 tools/render_client.py --ping
+    python3 tools/render_client.py animations/fisica/onde/onde.py OndeIntro --quality ql
+    python3 tools/render_client.py --shutdown
+"""
+
+import argparse
+import json
+import socket
+import sys
+from pathlib import Path
+
+from common import QUALITIES, RENDER_SOCKET, ROOT
+
+
+def _request(payload, socket_path, timeout=None):
+    """Invia una richiesta e genera gli eventi (righe JSON) della risposta."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                yield json.loads(line)
+
+
+def ping(socket_path=RENDER_SOCKET, timeout=2.0):
+    """Stato del server, o None se non c'è nessun server in ascolto."""
+    if not Path(socket_path).exists():
+        return None
+    try:
+        return next(_request({"cmd": "ping"}, socket_path, timeout), None)
+    except OSError:
+        return None
+
+
+def shutdown(socket_path=RENDER_SOCKET):
+    """Chiede al server di terminare."""
+    return next(_request({"cmd": "shutdown"}, socket_path, 5.0), None)
+
+
+def submit(jobs, socket_path=RENDER_SOCKET):
+    """
+    Invia i job al server e genera un risultato per ogni scena completata.
+
+    Parameters:
+    -----------
+    jobs : list of dict
+        ``{"file": ..., "scene": ..., "quality": ...}`` (vedi render_server.render_job)
+    socket_path : Path
+        Socket del server
+
+    Yields:
+    -------
+    dict
+        ``ok``, ``scene``, ``seconds``, ``video`` oppure ``error``, nell'ordine
+        di completamento
+    """
+    for event in _request({"cmd": "render", "jobs": jobs}, socket_path):
+        if event.get("event") == "done":
+            yield event
+        elif event.get("event") in ("end", "error"):
+            if event.get("event") == "error":
+                raise RuntimeError(event.get("error"))
+            return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Client del render server.")
+    parser.add_argument("file", nargs="?", help="file dell'argomento (<topic>.py)")
+    parser.add_argument("scenes", nargs="*", help="scene da renderizzare")
+    parser.add_argument("--quality", default="ql", choices=sorted(QUALITIES))
+    parser.add_argument("--socket", default=str(RENDER_SOCKET),
+                        help=f"socket UNIX (default: {RENDER_SOCKET.relative_to(ROOT)})")
+    parser.add_argument("--ping", action="store_true", help="verifica se il server è attivo")
+    parser.add_argument("--shutdown", action="store_true", help="arresta il server")
+    args = parser.parse_args(argv)
+
+    if args.ping:
+        status = ping(args.socket)
+        if status is None:
+            print(f"Nessun render server su {args.socket}")
+            return 1
+        print(f"Render server attivo: {status['workers']} worker, pid {status['pid']}, "
+              f"{status['jobs_done']} job completati, uptime {status['uptime']}s")
+        return 0
+    if args.shutdown:
+        if ping(args.socket) is None:
+            print(f"Nessun render server su {args.socket}")
+            return 0
+        shutdown(args.socket)
+        print("Render server arrestato")
+        return 0
+    if not args.file or not args.scenes:
+        parser.error("indica il file dell'argomento e almeno una scena")
+
+    source = str(Path(args.file).resolve())
+    jobs = [{"file": source, "scene": s, "quality": args.quality} for s in args.scenes]
+    ok = True
+    for result in submit(jobs, args.socket):
+        if result["ok"]:
+            print(f"✓ {result['scene']} ({result['seconds']}s) -> {result['video']}")
+        else:
+            ok = False
+            print(f"✗ {result['scene']} ({result['seconds']}s)\n{result['error']}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
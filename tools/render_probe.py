@@ -0,0 +1,246 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Render Probe - Per-scene metrics collected inside Manim
+
+Wraps a few Manim internals to measure, for every rendered scene: wall and
+CPU time (LaTeX subprocesses included), peak RSS (when known, see
+_scene_peak_rss_mb), frames written, time spent
+compiling LaTeX (latex + dvisvgm, cache misses only) and time spent encoding
+and muxing video. Nothing in the scenes changes.
+
+It also locks the LaTeX and Text SVG compilation between processes, one file
+lock per output file in the Tex/ and texts/ directories: Manim only checks
+whether the final .svg exists, so two parallel renders (render_all.py, render
+server workers) of the same formula would compile the same file at the same
+time or read a half-written SVG. Only identical formulas and texts wait on
+each other; different ones compile in parallel.
+
+Two ways to use it, both with the Python of the Manim virtualenv:
+- as a wrapper around the `manim` CLI (build_scenes.py and render_all.py do
+  this through telemetry.probe_command); the metrics are written as JSON;
+- in process, with install() and take_records() (render_server.py).
+
+Usage:
+    ~/.virtualenvs/manim/bin/python tools/render_probe.py metrics.json -- onde.py OndeIntro
+"""
+
+import contextlib
+import fcntl
+import functools
+import hashlib
+import json
+import resource
+import sys
+import time
+from pathlib import Path
+
+_counters = {"latex": 0.0, "encode": 0.0, "frames": 0, "renders": 0}
+_records = []
+_installed = False
+
+# Metodi di SceneFileWriter che codificano o uniscono i video (dipende dalla
+# versione di Manim: si strumentano quelli presenti)
+ENCODE_METHODS = ("write_frame", "close_partial_movie_stream", "combine_to_movie",
+                  "combine_to_section_videos")
+LATEX_FUNCTIONS = ("compile_tex", "convert_to_svg")
+# File di lock nelle cartelle degli SVG, uno per SVG: .render-<hash>.lock
+# (nascosti, ignorati da tex_cache.py e media_gc.py)
+LOCK_PREFIX = ".render-"
+
+
+def _add_timer(owner, name, key):
+    original = getattr(owner, name, None)
+    if original is None:
+        return
+
+    @functools.wraps(original)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            _counters[key] += time.perf_counter() - start
+
+    setattr(owner, name, timed)
+
+
+@contextlib.contextmanager
+def _file_lock(directory, key):
+    """Lock esclusivo tra processi per l'SVG identificato da ``key`` in ``directory``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+    with open(directory / f"{LOCK_PREFIX}{digest}.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _tex_key(expression, environment=None, tex_template=None, *args, **kwargs):
+    """Da cosa dipende l'SVG di ``tex_to_svg_file`` (formula, ambiente, template)."""
+    return expression, environment, getattr(tex_template, "body", None)
+
+
+def _text_key(text, *args, **kwargs):
+    """Hash con cui Manim nomina l'SVG di un Text/MarkupText (``_text2hash``)."""
+    text2hash = getattr(text, "_text2hash", None)
+    if text2hash is not None:
+        return text2hash(*args, **kwargs)
+    return type(text).__name__, getattr(text, "original_text", None), args
+
+
+def _add_lock(owner, name, dir_key, key):
+    """
+    Esegue ``owner.name`` con il lock del suo SVG nella cartella ``dir_key``
+    di Manim; ``key`` ricava dagli argomenti della chiamata cosa identifica
+    l'SVG.
+    """
+    original = getattr(owner, name, None)
+    if original is None:
+        return None
+
+    @functools.wraps(original)
+    def locked(*args, **kwargs):
+        from manim import config
+
+        with _file_lock(config.get_dir(dir_key), key(*args, **kwargs)):
+            return original(*args, **kwargs)
+
+    setattr(owner, name, locked)
+    return original, locked
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _peak_rss_mb():
+    # ru_maxrss è in KB su Linux, in byte su macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _scene_peak_rss_mb(before):
+    """
+    Picco di memoria della scena appena renderizzata, o None se non si conosce.
+
+    ``ru_maxrss`` è il massimo dall'avvio del processo: è il picco della scena
+    solo per la prima scena del processo (il render CLI di una scena) o se la
+    scena ha superato il massimo precedente ``before``. Negli altri casi
+    (worker del render server, più scene in un processo ``manim``) sarebbe il
+    picco di un render precedente: meglio nessun dato che uno sbagliato.
+    """
+    peak = _peak_rss_mb()
+    return peak if _counters["renders"] == 1 or peak > before else None
+
+
+def install():
+    """Strumenta Manim (una volta per processo)."""
+    global _installed
+    if _installed:
+        return
+    from manim import Scene
+    from manim.mobject.text import text_mobject
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim.utils import tex_file_writing
+
+    for name in LATEX_FUNCTIONS:
+        _add_timer(tex_file_writing, name, "latex")
+
+    # Controllo dell'SVG esistente e compilazione sotto lock. tex_to_svg_file
+    # è importato per nome (es. da tex_mobject): si sostituisce ovunque
+    patched = _add_lock(tex_file_writing, "tex_to_svg_file", "tex_dir", _tex_key)
+    if patched:
+        original, locked = patched
+        for module_name, module in list(sys.modules.items()):
+            if module_name.startswith("manim.") and getattr(module, "tex_to_svg_file", None) is original:
+                module.tex_to_svg_file = locked
+    for cls in (text_mobject.Text, text_mobject.MarkupText):
+        _add_lock(cls, "_text2svg", "text_dir", _text_key)
+    for name in ENCODE_METHODS:
+        _add_timer(SceneFileWriter, name, "encode")
+
+    write_frame = SceneFileWriter.write_frame
+
+    @functools.wraps(write_frame)
+    def counted(self, frame_or_renderer, *args, **kwargs):
+        _counters["frames"] += kwargs.get("num_frames", args[0] if args else 1)
+        return write_frame(self, frame_or_renderer, *args, **kwargs)
+
+    SceneFileWriter.write_frame = counted
+
+    render = Scene.render
+
+    @functools.wraps(render)
+    def measured(self, *args, **kwargs):
+        before = dict(_counters)
+        cpu = _cpu_seconds()
+        peak = _peak_rss_mb()
+        start = time.perf_counter()
+        result = render(self, *args, **kwargs)
+        _counters["renders"] += 1
+        _records.append({
+            "scene": type(self).__name__,
+            "wall_seconds": round(time.perf_counter() - start, 3),
+            "cpu_seconds": round(_cpu_seconds() - cpu, 3),
+            "peak_rss_mb": _scene_peak_rss_mb(peak),
+            "frames": _counters["frames"] - before["frames"],
+            "latex_seconds": round(_counters["latex"] - before["latex"], 3),
+            "encode_seconds": round(_counters["encode"] - before["encode"], 3),
+        })
+        return result
+
+    Scene.render = measured
+    _installed = True
+
+
+def take_records():
+    """Metriche delle scene renderizzate dall'ultima chiamata (e azzera l'elenco)."""
+    records = list(_records)
+    _records.clear()
+    return records
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv:
+        print("Uso: render_probe.py <metrics.json> [--] <argomenti di manim>", file=sys.stderr)
+        return 2
+    output = argv.pop(0)
+    if argv and argv[0] == "--":
+        argv.pop(0)
+
+    install()
+    from manim.__main__ import main as manim_main
+
+    sys.argv = ["manim", *argv]
+    code = 0
+    try:
+        manim_main()
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+    finally:
+        with open(output, "w", encoding="utf-8") as fh:
+            json.dump(take_records(), fh, indent=2)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
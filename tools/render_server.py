@@ -0,0 +1,261 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Render Server - Long-lived render daemon with Manim preloaded
+
+Every `manim` invocation pays for importing Manim (Cairo, Pango, NumPy,
+SciPy, ...) and reading its configuration before rendering anything. This
+server pays it once per worker: a pool of processes imports Manim at startup
+and then renders (file, scene, quality) jobs for as long as it runs. Parsed
+Tex/Text SVGs stay in the workers' in-memory caches between jobs.
+
+Jobs arrive on a local UNIX socket as JSON lines (see render_client.py). Each
+job re-executes the topic file and reloads the project modules it imports, so
+edits are always picked up; only third-party imports stay warm.
+
+Must run with the Python of the Manim virtualenv (make render-server does it).
+
+Usage:
+    ~/.virtualenvs/manim/bin/python tools/render_server.py --workers 4
+    python3 tools/render_client.py --ping
+"""
+
+import argparse
+import concurrent.futures
+import importlib.util
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from common import MEDIA_DIR, QUALITIES, RENDER_SOCKET, ROOT
+import render_probe
+
+
+# ----------------------------------------------------------------------------
+# Lato worker (processi del pool)
+# ----------------------------------------------------------------------------
+
+def _init_worker():
+    """Importa Manim una volta per worker e scalda font e Pango."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # il Ctrl-C lo gestisce il server
+    import manim  # noqa: F401  (import costoso: è il motivo del server)
+    from manim import Text, tempconfig
+
+    render_probe.install()
+
+    with tempconfig({"media_dir": str(MEDIA_DIR / ".render-warmup"), "verbosity": "ERROR"}):
+        Text("·")
+
+
+def _forget_project_modules():
+    """Scarica i moduli del progetto (animations.*, argomenti) per rileggerli dal disco."""
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and Path(path).resolve().is_relative_to(ROOT / "animations"):
+            del sys.modules[name]
+
+
+def render_job(job):
+    """
+    Renderizza una scena nel worker corrente.
+
+    Parameters:
+    -----------
+    job : dict
+        ``file`` (percorso del <topic>.py), ``scene`` (classe), ``quality``
+        (ql, qm, qh, qk), ``media_dir`` (``--media_dir``, default
+        ``media/<disciplina>``)
+
+    Returns:
+    --------
+    dict
+        ``ok``, ``seconds``, ``video`` e ``metrics`` (vedi render_probe.py)
+        oppure ``error``
+    """
+    from manim import config, tempconfig
+
+    start = time.time()
+    source = Path(job["file"]).resolve()
+    quality = QUALITIES[job["quality"]]
+    width, height = (int(v) for v in quality["resolution"].split(","))
+    media_dir = job.get("media_dir") or str(MEDIA_DIR / source.parent.parent.name)
+
+    result = {"file": job["file"], "scene": job["scene"], "quality": job["quality"]}
+    cwd = os.getcwd()
+    try:
+        os.chdir(source.parent)
+        _forget_project_modules()
+        with tempconfig({}):
+            # Stessa configurazione di `manim` lanciato nella cartella dell'argomento
+            cfg = source.parent / "manim.cfg"
+            if cfg.is_file():
+                config.digest_file(str(cfg))
+            config.media_dir = media_dir
+            config.pixel_width = width
+            config.pixel_height = height
+            config.frame_rate = quality["fps"]
+            config.input_file = str(source)
+            config.scene_names = [job["scene"]]
+
+            spec = importlib.util.spec_from_file_location(source.stem, source)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[source.stem] = module
+            spec.loader.exec_module(module)
+
+            scene = getattr(module, job["scene"])()
+            render_probe.take_records()
+            scene.render()
+            result["video"] = str(scene.renderer.file_writer.movie_file_path)
+            result["metrics"] = next(iter(render_probe.take_records()), None)
+        result["ok"] = True
+    except Exception:
+        result["ok"] = False
+        result["error"] = traceback.format_exc()
+    finally:
+        os.chdir(cwd)
+    result["seconds"] = round(time.time() - start, 2)
+    return result
+
+
+# ----------------------------------------------------------------------------
+# Lato server
+# ----------------------------------------------------------------------------
+
+class RenderPool:
+    """Pool di worker con Manim caricato; si ricrea se un worker muore."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.jobs_done = 0
+        self.started = time.time()
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker
+        )
+
+    def submit(self, job):
+        with self.lock:
+            try:
+                return self._executor.submit(render_job, job)
+            except BrokenProcessPool:
+                self._executor = self._new_executor()
+                return self._executor.submit(render_job, job)
+
+    def warm_up(self):
+        """Avvia subito tutti i worker: l'import di Manim avviene ora, non al primo job."""
+        futures = [self._executor.submit(os.getpid) for _ in range(self.workers)]
+        return {f.result() for f in futures}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Una connessione = una richiesta JSON; le risposte sono righe JSON."""
+
+    def send(self, event):
+        self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self.send({"event": "error", "error": "richiesta non valida"})
+            return
+
+        pool = self.server.pool
+        cmd = request.get("cmd", "render")
+        if cmd == "ping":
+            self.send({"event": "pong", "workers": pool.workers, "pid": os.getpid(),
+                       "jobs_done": pool.jobs_done,
+                       "uptime": round(time.time() - pool.started, 1)})
+            return
+        if cmd == "shutdown":
+            self.send({"event": "bye"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        futures = {pool.submit(job): job for job in request.get("jobs", [])}
+        self.send({"event": "accepted", "jobs": len(futures)})
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:  # worker morto (segfault, OOM, ...)
+                job = futures[future]
+                result = {**job, "ok": False, "error": f"worker terminato: {exc!r}"}
+            with pool.lock:
+                pool.jobs_done += 1
+            self.send({"event": "done", **result})
+        self.send({"event": "end"})
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(socket_path, workers):
+    """Avvia il server sul socket ``socket_path`` e serve fino a shutdown/Ctrl-C."""
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()  # socket rimasto da un server terminato male
+
+    pool = RenderPool(workers)
+    pool.warm_up()
+    server = RenderServer(str(socket_path), _Handler)
+    server.pool = pool
+    signal.signal(signal.SIGTERM, _stop)
+    print(f"Render server in ascolto su {socket_path} ({workers} worker, pid {os.getpid()})",
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown()
+        if socket_path.exists():
+            socket_path.unlink()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server di rendering Manim persistente.")
+    parser.add_argument("--socket", default=str(RENDER_SOCKET),
+                        help=f"socket UNIX (default: {RENDER_SOCKET.relative_to(ROOT)})")
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help="processi di rendering (default: metà dei core)")
+    args = parser.parse_args(argv)
+    return serve(args.socket, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Scan Deps - Import-graph dependency scanner for the Makefile
+
+For each topic this script follows the imports of <topic>.py that resolve to
+files of the project (the shared `animations` package, e.g.
+animations/gas_module.py, and modules next to the topic), transitively, and
+writes a Make dependency file listing them together with the topic's
+manim.cfg. The Makefile includes these files, so editing a shared module
+rebuilds exactly the topics that import it.
+
+Imports are read with `ast`: nothing is executed, Manim is not needed.
+
+Usage:
+    python3 tools/scan_deps.py --output-dir media/.deps gas_perfetto
+    python3 tools/scan_deps.py --output-dir media/.deps          # tutti
+    python3 tools/scan_deps.py --print onde                      # solo elenco
+"""
+
+import argparse
+import ast
+import sys
+from pathlib import Path
+
+from common import ROOT, discover_topics, find_topic, relative
+
+
+def _module_file(modname, search_dirs):
+    """File del progetto che definisce ``modname`` (None se esterno: manim, numpy, ...)."""
+    parts = modname.split(".")
+    for base in search_dirs:
+        candidate = base.joinpath(*parts)
+        if candidate.with_suffix(".py").is_file():
+            return candidate.with_suffix(".py")
+        if (candidate / "__init__.py").is_file():
+            return candidate / "__init__.py"
+    return None
+
+
+def local_imports(path):
+    """
+    Moduli del progetto importati direttamente da ``path``.
+
+    Si considerano ``import animations.x``, ``from animations.x import y``,
+    ``from animations import x`` e i moduli accanto al file (la cartella dello
+    script è nel ``sys.path`` quando Manim lo esegue). Gli import relativi non
+    sono usati nel progetto e vengono ignorati.
+    """
+    path = Path(path)
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    # animations/ è un namespace package: si risolve a partire dalla root
+    search_dirs = (ROOT, path.parent)
+
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            # ``from pkg import sub``: sub può essere un modulo del package
+            names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+        else:
+            continue
+        for name in names:
+            target = _module_file(name, search_dirs)
+            if target is not None and target.resolve() != path.resolve():
+                found.add(target.resolve())
+    return found
+
+
+def import_closure(path):
+    """Tutti i file del progetto raggiunti dagli import di ``path`` (escluso sé stesso)."""
+    path = Path(path).resolve()
+    seen = set()
+    todo = [path]
+    while todo:
+        current = todo.pop()
+        for dep in local_imports(current):
+            if dep not in seen and dep != path:
+                seen.add(dep)
+                todo.append(dep)
+    return sorted(seen)
+
+
+def topic_dependencies(topic):
+    """Dipendenze di un argomento oltre al suo .py: moduli importati e ``manim.cfg``."""
+    deps = import_closure(topic.source)
+    if topic.config.is_file():
+        deps.append(topic.config.resolve())
+    return deps
+
+
+def depfile_text(topic, depfile):
+    """
+    Contenuto del file di dipendenze di ``topic`` in sintassi Make.
+
+    Il target (database di build, vedi build_scenes.py) usa ``$(QUALITY_DIR)``, espanso dal Makefile che lo
+    include. Anche il file .d stesso dipende dagli stessi sorgenti, così viene
+    rigenerato quando cambia un import. Come ``gcc -MP``, ogni dipendenza ha
+    una regola vuota: se un modulo viene cancellato make non si ferma.
+    """
+    deps = [relative(d) for d in topic_dependencies(topic)]
+    target = f"media/{topic.path}/videos/$(QUALITY_DIR)/scenes.json"
+    lines = [
+        f"# Generato da tools/scan_deps.py per {topic.path}: non modificare.",
+        f"{depfile} {target}: \\",
+    ]
+    lines += [f"  {dep} \\" for dep in deps]
+    lines.append(f"  {relative(topic.source)}")
+    lines.append("")
+    lines += [f"{dep}:" for dep in deps]
+    return "\n".join(lines) + "\n"
+
+
+def write_depfile(topic, output_dir):
+    """Scrive ``<output_dir>/<topic>.d`` solo se il contenuto cambia."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    depfile = output_dir / f"{topic.name}.d"
+    text = depfile_text(topic, relative(depfile))
+    if not depfile.is_file() or depfile.read_text(encoding="utf-8") != text:
+        depfile.write_text(text, encoding="utf-8")
+    else:
+        # Contenuto invariato: aggiorna solo la data, così make non lo rigenera più
+        depfile.touch()
+    return depfile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Genera i file di dipendenze Make dagli import degli argomenti."
+    )
+    parser.add_argument("topics", nargs="*",
+                        help="argomenti da analizzare (default: tutti)")
+    parser.add_argument("--output-dir", default="media/.deps",
+                        help="cartella dei file .d (default: media/.deps)")
+    parser.add_argument("--print", action="store_true", dest="print_only",
+                        help="stampa le dipendenze invece di scrivere i file .d")
+    args = parser.parse_args(argv)
+
+    topics = [find_topic(t) for t in args.topics] if args.topics else discover_topics()
+    for topic in topics:
+        if args.print_only:
+            print(f"{topic.path}:")
+            for dep in topic_dependencies(topic):
+                print(f"  - {relative(dep)}")
+        else:
+            write_depfile(topic, ROOT / args.output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Scene Registry - Machine-readable index of topics and scenes
+
+Writes media/scene-registry.json: for every topic its source, source hash,
+project dependencies and scenes; for every scene its docstring, direct
+bases, base template (the project or Manim class it derives from, e.g.
+VerticalTemplate or MovingCameraScene), poster time (POSTER_TIME, see
+posters.py), line and fingerprint. Scene
+inheritance is resolved across the `animations` package (see
+fingerprint.ModuleInfo), so VerticalTemplate subclasses are included.
+
+The registry doubles as its own cache: every topic entry stores the
+mtime/size and SHA-256 of its inputs (the topic file, the modules it imports
+and manim.cfg). Unchanged files are not re-parsed; a file whose mtime changed
+but whose content did not is only re-hashed.
+
+Usage:
+    python3 tools/scene_registry.py                 # aggiorna il registro
+    python3 tools/scene_registry.py --list onde     # elenco leggibile
+    python3 tools/scene_registry.py --json onde     # JSON su stdout
+    python3 tools/scene_registry.py --matrix        # matrice per GitHub Actions
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from common import MEDIA_DIR, ROOT, discover_topics, find_topic, relative
+from fingerprint import MANIM_SCENES, ModuleInfo, topic_fingerprints
+from scan_deps import topic_dependencies
+
+REGISTRY_PATH = MEDIA_DIR / "scene-registry.json"
+REGISTRY_VERSION = 2
+
+
+def file_hash(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _base_name(node):
+    return node.id if isinstance(node, ast.Name) else getattr(node, "attr", None)
+
+
+def base_template(info, name, _seen=None):
+    """
+    Classe esterna al file da cui la scena ``name`` eredita: un template del
+    progetto (es. ``VerticalTemplate``) o una scena di Manim (es. ``Scene``).
+    Le classi base definite nello stesso file vengono attraversate.
+    """
+    seen = _seen if _seen is not None else set()
+    if name in seen:
+        return None
+    seen.add(name)
+    for base in info.defs[name].bases:
+        base_name = _base_name(base)
+        if base_name in MANIM_SCENES:
+            return base_name
+        if isinstance(info.defs.get(base_name), ast.ClassDef):
+            found = base_template(info, base_name, seen)
+            if found:
+                return found
+        elif base_name in info.imports and info.is_scene_class(base_name):
+            return base_name
+    return None
+
+
+def poster_time(info, name, _seen=None):
+    """
+    Istante del poster della scena ``name`` (attributo di classe
+    ``POSTER_TIME``, secondi; negativo = dalla fine), anche ereditato da una
+    classe dello stesso file; None se non è indicato (ultimo frame).
+    """
+    seen = _seen if _seen is not None else set()
+    if name in seen:
+        return None
+    seen.add(name)
+    node = info.defs[name]
+    for stmt in node.body:
+        if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id == "POSTER_TIME"):
+            try:
+                value = ast.literal_eval(stmt.value)
+            except ValueError:
+                return None
+            return float(value) if isinstance(value, (int, float)) else None
+    for base in node.bases:
+        if isinstance(info.defs.get(_base_name(base)), ast.ClassDef):
+            found = poster_time(info, _base_name(base), seen)
+            if found is not None:
+                return found
+    return None
+
+
+def topic_entry(topic):
+    """Voce del registro per ``topic`` (analisi completa del sorgente)."""
+    info = ModuleInfo.load(topic.source)
+    fingerprints = topic_fingerprints(topic)
+    inputs = [topic.source.resolve()] + topic_dependencies(topic)
+
+    scenes = []
+    for name in info.scene_classes():
+        node = info.defs[name]
+        scenes.append({
+            "name": name,
+            "docstring": ast.get_docstring(node) or "",
+            "bases": [ast.unparse(b) for b in node.bases],
+            "template": base_template(info, name),
+            "poster_time": poster_time(info, name),
+            "line": node.lineno,
+            "fingerprint": fingerprints[name],
+        })
+
+    return {
+        "discipline": topic.discipline,
+        "topic": topic.name,
+        "source": relative(topic.source),
+        "source_hash": file_hash(topic.source),
+        "dependencies": [relative(p) for p in inputs[1:]],
+        "scenes": scenes,
+        # Dati di cache: stat e hash di tutti gli input
+        "inputs": {relative(p): {"mtime_ns": p.stat().st_mtime_ns, "size": p.stat().st_size,
+                                 "sha256": file_hash(p)} for p in inputs},
+    }
+
+
+def _is_fresh(entry):
+    """True se nessun input della voce è cambiato (stat uguale o, altrimenti, stesso hash)."""
+    for rel, cached in entry.get("inputs", {}).items():
+        path = ROOT / rel
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if st.st_mtime_ns == cached["mtime_ns"] and st.st_size == cached["size"]:
+            continue
+        if file_hash(path) != cached["sha256"]:
+            return False
+        # Contenuto uguale, data diversa (checkout, touch): aggiorna solo la stat
+        cached["mtime_ns"], cached["size"] = st.st_mtime_ns, st.st_size
+    return bool(entry.get("inputs"))
+
+
+def load_registry(path=REGISTRY_PATH):
+    try:
+        registry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        registry = {}
+    if registry.get("version") != REGISTRY_VERSION:
+        registry = {"version": REGISTRY_VERSION, "topics": {}}
+    return registry
+
+
+def update_registry(topics=None, path=REGISTRY_PATH):
+    """
+    Aggiorna il registro e lo restituisce.
+
+    Parameters:
+    -----------
+    topics : list of Topic
+        Argomenti da aggiornare (default: tutti; quelli spariti vengono rimossi)
+    path : Path
+        File del registro
+
+    Returns:
+    --------
+    tuple
+        ``(registry, rebuilt)`` con ``rebuilt`` = argomenti rianalizzati
+    """
+    registry = load_registry(path)
+    full = topics is None
+    topics = discover_topics() if full else topics
+    rebuilt = []
+    for topic in topics:
+        entry = registry["topics"].get(topic.path)
+        if entry is None or not _is_fresh(entry):
+            registry["topics"][topic.path] = topic_entry(topic)
+            rebuilt.append(topic.path)
+    if full:
+        current = {t.path for t in topics}
+        for stale in [k for k in registry["topics"] if k not in current]:
+            del registry["topics"][stale]
+    registry["topics"] = dict(sorted(registry["topics"].items()))
+    registry["generated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(registry, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return registry, rebuilt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registro JSON di argomenti e scene.")
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--output", default=str(REGISTRY_PATH),
+                        help=f"file del registro (default: {relative(REGISTRY_PATH)})")
+    parser.add_argument("--list", action="store_true", help="stampa le scene in forma leggibile")
+    parser.add_argument("--json", action="store_true", help="stampa le voci in JSON")
+    parser.add_argument("--matrix", action="store_true",
+                        help="stampa la matrice {\"include\": [...]} per GitHub Actions")
+    args = parser.parse_args(argv)
+
+    selected = [find_topic(t) for t in args.topics] if args.topics else None
+    registry, rebuilt = update_registry(selected, ROOT / args.output)
+    entries = [registry["topics"][t.path] for t in (selected or discover_topics())]
+
+    if args.matrix:
+        print(json.dumps({"include": [{"discipline": e["discipline"], "topic": e["topic"]}
+                                      for e in entries if e["scenes"]]}))
+    elif args.json:
+        print(json.dumps(entries if selected else registry, indent=2, ensure_ascii=False))
+    elif args.list:
+        for entry in entries:
+            if not entry["scenes"]:
+                print("  (no Scene classes found)")
+            for scene in entry["scenes"]:
+                doc = scene["docstring"].splitlines()[0] if scene["docstring"] else ""
+                print(f"  - {scene['name']} ({scene['template']})" + (f" — {doc}" if doc else ""))
+    else:
+        n_scenes = sum(len(e["scenes"]) for e in registry["topics"].values())
+        print(f"Registro aggiornato: {len(registry['topics'])} argomenti, {n_scenes} scene "
+              f"({len(rebuilt)} rianalizzati) -> {relative(ROOT / args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Telemetry - Render-time store and regression report
+
+Every scene rendered by build_scenes.py, render_all.py or the render server
+appends one row to a local SQLite database (.telemetry/renders.sqlite, kept
+outside media/ so `make clean` does not erase the history): topic, scene,
+quality, git revision, backend, wall time, CPU time, peak RSS, frames, LaTeX
+time and encode time. The detailed metrics come from render_probe.py; when
+the probe cannot run (no Manim virtualenv next to the `manim` executable)
+only the wall time is recorded.
+
+The report lists the slowest scenes and flags regressions: a scene whose
+last render took more than --threshold times the median of its previous
+--window renders (same quality).
+
+Usage:
+    python3 tools/telemetry.py                      # report (make render-report)
+    python3 tools/telemetry.py --quality qh --slowest 20
+    python3 tools/telemetry.py --fail-on-regression # exit 1 se ci sono regressioni
+"""
+
+import argparse
+import functools
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+from common import QUALITIES, ROOT, relative
+
+TELEMETRY_DB = ROOT / ".telemetry" / "renders.sqlite"
+PROBE = Path(__file__).resolve().parent / "render_probe.py"
+
+METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb", "frames", "latex_seconds",
+           "encode_seconds")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    scene TEXT NOT NULL,
+    quality TEXT NOT NULL,
+    revision TEXT,
+    backend TEXT,
+    wall_seconds REAL NOT NULL,
+    cpu_seconds REAL,
+    peak_rss_mb REAL,
+    frames INTEGER,
+    latex_seconds REAL,
+    encode_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS renders_scene ON renders (topic, scene, quality, id);
+"""
+
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def git_revision():
+    """Commit corrente (abbreviato), con ``+dirty`` se ci sono modifiche non committate."""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return rev + ("+dirty" if dirty else "")
+
+
+def connect(path=TELEMETRY_DB):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record(topic, quality, scene, seconds, metrics=None, backend="manim", path=TELEMETRY_DB):
+    """
+    Aggiunge al database un render riuscito.
+
+    Parameters:
+    -----------
+    topic : Topic
+        Argomento della scena
+    quality : str
+        ql, qm, qh o qk
+    scene : str
+        Nome della scena
+    seconds : float
+        Durata misurata dal chiamante (usata se manca la sonda)
+    metrics : dict
+        Metriche di render_probe.py (``wall_seconds``, ``cpu_seconds``, ...)
+    backend : str
+        ``manim`` (processo dedicato) o ``server`` (render server)
+    """
+    row = {name: None for name in METRICS}
+    row.update({k: v for k, v in (metrics or {}).items() if k in METRICS})
+    row["wall_seconds"] = row["wall_seconds"] or seconds
+    with _lock, closing(connect(path)) as conn, conn:
+        conn.execute(
+            "INSERT INTO renders (recorded_at, topic, scene, quality, revision, backend, "
+            + ", ".join(METRICS) + ") VALUES (?, ?, ?, ?, ?, ?" + ", ?" * len(METRICS) + ")",
+            (datetime.now(timezone.utc).isoformat(timespec="seconds"), topic.path, scene,
+             quality, git_revision(), backend, *(row[name] for name in METRICS)),
+        )
+
+
+def probe_python(manim):
+    """Python del virtualenv di Manim, accanto all'eseguibile ``manim`` (None se manca)."""
+    exe = shutil.which(manim)
+    python = Path(exe).parent / "python" if exe else None
+    return python if python is not None and python.is_file() else None
+
+
+def probe_command(manim, command):
+    """
+    Riga di comando con la sonda (render_probe.py) attorno a ``manim``.
+
+    La sonda gira con il Python del virtualenv di Manim, cercato accanto
+    all'eseguibile ``manim``; se non c'è il comando resta invariato.
+
+    Returns:
+    --------
+    tuple
+        ``(command, metrics_file)``, con ``metrics_file`` None senza sonda
+    """
+    python = probe_python(manim)
+    if python is None:
+        return command, None
+    fd, metrics_file = tempfile.mkstemp(prefix="render-probe-", suffix=".json")
+    os.close(fd)
+    return [str(python), str(PROBE), metrics_file, "--", *command[1:]], metrics_file
+
+
+def read_probe(metrics_file):
+    """``{scena: metriche}`` scritte dalla sonda (il file viene eliminato)."""
+    if metrics_file is None:
+        return {}
+    try:
+        records = json.loads(Path(metrics_file).read_text(encoding="utf-8") or "[]")
+    except (OSError, ValueError):
+        records = []
+    finally:
+        Path(metrics_file).unlink(missing_ok=True)
+    return {r["scene"]: r for r in records}
+
+
+def latest_runs(conn, quality=None):
+    """Ultimo render di ogni (argomento, scena, qualità)."""
+    query = ("SELECT * FROM renders WHERE id IN (SELECT MAX(id) FROM renders "
+             + ("WHERE quality = ? " if quality else "")
+             + "GROUP BY topic, scene, quality)")
+    return conn.execute(query, (quality,) if quality else ()).fetchall()
+
+
+def regressions(conn, quality=None, window=10, threshold=1.25, min_runs=3, min_delta=1.0):
+    """
+    Scene il cui ultimo render è più lento della mediana dei ``window`` precedenti.
+
+    Parameters:
+    -----------
+    window : int
+        Render precedenti della stessa scena e qualità usati come riferimento
+    threshold : float
+        Rapporto ultimo/mediana oltre cui si segnala la regressione
+    min_runs : int
+        Render precedenti necessari per avere un riferimento
+    min_delta : float
+        Differenza minima in secondi (sotto è rumore)
+
+    Returns:
+    --------
+    list of dict
+        ``topic``, ``scene``, ``quality``, ``seconds``, ``baseline``, ``ratio``,
+        ``revision``, ordinate per rapporto decrescente
+    """
+    found = []
+    for last in latest_runs(conn, quality):
+        previous = [r["wall_seconds"] for r in conn.execute(
+            "SELECT wall_seconds FROM renders WHERE topic = ? AND scene = ? AND quality = ? "
+            "AND id < ? ORDER BY id DESC LIMIT ?",
+            (last["topic"], last["scene"], last["quality"], last["id"], window))]
+        if len(previous) < min_runs:
+            continue
+        baseline = statistics.median(previous)
+        ratio = last["wall_seconds"] / baseline if baseline else None
+        if ratio and ratio > threshold and last["wall_seconds"] - baseline >= min_delta:
+            found.append({"topic": last["topic"], "scene": last["scene"],
+                          "quality": last["quality"], "seconds": last["wall_seconds"],
+                          "baseline": round(baseline, 2), "ratio": round(ratio, 2),
+                          "revision": last["revision"]})
+    return sorted(found, key=lambda r: r["ratio"], reverse=True)
+
+
+def _fmt(value, spec, unit=""):
+    """Valore formattato, o ``-`` allineato se la metrica manca."""
+    text = format(value, spec) + unit if value is not None else "-"
+    return text.rjust(len(format(0, spec)) + len(unit))
+
+
+def report(path=TELEMETRY_DB, quality=None, slowest=10, window=10, threshold=1.25):
+    """Stampa le scene più lente e le regressioni; restituisce le regressioni."""
+    if not path.is_file():
+        print(f"Nessun dato: {relative(path)} non esiste (renderizza qualche scena con make)")
+        return []
+    with closing(connect(path)) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM renders").fetchone()[0]
+        runs = sorted(latest_runs(conn, quality), key=lambda r: r["wall_seconds"], reverse=True)
+        found = regressions(conn, quality, window=window, threshold=threshold)
+
+    print(f"Telemetria: {total} render registrati in {relative(path)}")
+    print("")
+    print(f"Scene più lente (ultimo render{', qualità ' + quality if quality else ''}):")
+    print(f"  {'wall':>8} {'cpu':>8} {'RSS MB':>7} {'frame':>6} {'LaTeX':>7} {'encode':>7}  "
+          f"{'rev':<14} scena")
+    for r in runs[:slowest]:
+        print(f"  {_fmt(r['wall_seconds'], '7.1f', 's')} {_fmt(r['cpu_seconds'], '7.1f', 's')} "
+              f"{_fmt(r['peak_rss_mb'], '7.0f')} {_fmt(r['frames'], '6d')} "
+              f"{_fmt(r['latex_seconds'], '6.1f', 's')} {_fmt(r['encode_seconds'], '6.1f', 's')}  "
+              f"{(r['revision'] or '-'):<14} {r['topic']}:{r['scene']} [{r['quality']}]")
+    print("")
+    if found:
+        print(f"Regressioni (ultimo render > {threshold}x la mediana dei {window} precedenti):")
+        for r in found:
+            print(f"  ✗ {r['topic']}:{r['scene']} [{r['quality']}] {r['seconds']:.1f}s "
+                  f"vs {r['baseline']:.1f}s ({r['ratio']}x) @ {r['revision'] or '-'}")
+    else:
+        print("Nessuna regressione rispetto allo storico.")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report dei tempi di render e regressioni.")
+    parser.add_argument("--db", default=str(TELEMETRY_DB),
+                        help=f"database (default: {relative(TELEMETRY_DB)})")
+    parser.add_argument("--quality", choices=sorted(QUALITIES), help="solo questa qualità")
+    parser.add_argument("--slowest", type=int, default=10, help="scene più lente da mostrare")
+    parser.add_argument("--window", type=int, default=10,
+                        help="render precedenti usati come riferimento")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="rapporto oltre cui un render è una regressione")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="esce con codice 1 se ci sono regressioni")
+    args = parser.parse_args(argv)
+
+    found = report(ROOT / args.db, args.quality, args.slowest, args.window, args.threshold)
+    return 1 if found and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
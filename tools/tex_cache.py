@@ -0,0 +1,194 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Tex Cache - Shared content-addressed cache of Manim's LaTeX and Text files
+
+Manim names the files in Tex/ (compiled formulas: .tex, .dvi, .svg) and in
+texts/ (Text and MarkupText SVGs) after a hash of their content and settings,
+so they can be shared safely between disciplines, machines and CI jobs: the
+same formula, e.g. \\frac{p}{T} = \\text{cost}, is compiled once and reused
+everywhere. This script keeps such a cache outside media/:
+
+- link: media/<discipline>/Tex and media/<discipline>/texts become links into
+  the cache directory (files already there are moved into the cache first),
+  so every render, with the manim CLI or the render server, reads and
+  writes the shared cache. make does this when TEX_CACHE=<dir> is set.
+- snapshot / export: CI restores the cache, takes a snapshot, renders, then
+  exports only the files added by the job.
+- merge: CI merges the exports of all the build jobs into the restored cache
+  and saves it as a new entry (merge on save). The cache key depends on the
+  toolchain (LaTeX and Manim versions), since they shape the output.
+
+Usage:
+    python3 tools/tex_cache.py link --cache .tex-cache
+    python3 tools/tex_cache.py snapshot --cache .tex-cache
+    python3 tools/tex_cache.py export --cache .tex-cache new-files/
+    python3 tools/tex_cache.py merge --cache .tex-cache new-files/ ...
+    python3 tools/tex_cache.py stats --cache .tex-cache
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from common import DISCIPLINES, MEDIA_DIR, ROOT, relative
+from media_gc import CACHE_DIRS, format_size
+
+DEFAULT_CACHE = ROOT / ".tex-cache"
+SNAPSHOT = ".snapshot.json"
+
+
+def _files(directory):
+    """
+    Nomi dei file in ``directory`` (non ricorsivo: Manim non crea sottocartelle),
+    esclusi i file nascosti come i lock dei render (render_probe.py).
+    """
+    if not directory.is_dir():
+        return []
+    return sorted(p.name for p in directory.iterdir() if p.is_file() and not p.name.startswith("."))
+
+
+def _copy_new(source, dest):
+    """
+    Copia in ``dest`` i file di ``source`` che non ci sono già.
+
+    I nomi sono hash del contenuto: un file già presente è identico e non
+    viene riscritto. La copia passa da un file temporaneo, così un render
+    concorrente non legge mai un file a metà.
+
+    Returns:
+    --------
+    int
+        Numero di file copiati
+    """
+    dest.mkdir(parents=True, exist_ok=True)
+    copied = 0
+    for name in _files(source):
+        target = dest / name
+        if target.exists():
+            continue
+        tmp = dest / f".{name}.tmp"
+        shutil.copy2(source / name, tmp)
+        os.replace(tmp, target)
+        copied += 1
+    return copied
+
+
+def link(cache, disciplines=DISCIPLINES):
+    """
+    Collega ``Tex/`` e ``texts/`` di ogni disciplina alla cache.
+
+    Returns:
+    --------
+    int
+        Numero di file locali spostati nella cache
+    """
+    moved = 0
+    for disc in disciplines:
+        for name in CACHE_DIRS:
+            target = cache / name
+            target.mkdir(parents=True, exist_ok=True)
+            local = MEDIA_DIR / disc / name
+            if local.is_symlink():
+                if local.resolve() == target.resolve():
+                    continue
+                local.unlink()
+            elif local.is_dir():
+                moved += _copy_new(local, target)
+                shutil.rmtree(local)
+            local.parent.mkdir(parents=True, exist_ok=True)
+            # Link relativo: vale anche dentro il container (/work) della CI
+            local.symlink_to(os.path.relpath(target.resolve(), local.parent.resolve()),
+                             target_is_directory=True)
+    return moved
+
+
+def snapshot(cache):
+    """Registra i file presenti nella cache (vedi ``export``)."""
+    listing = {name: _files(cache / name) for name in CACHE_DIRS}
+    cache.mkdir(parents=True, exist_ok=True)
+    (cache / SNAPSHOT).write_text(json.dumps(listing) + "\n", encoding="utf-8")
+    return sum(len(files) for files in listing.values())
+
+
+def export(cache, dest):
+    """Copia in ``dest`` i file aggiunti alla cache dopo ``snapshot``."""
+    path = cache / SNAPSHOT
+    known = json.loads(path.read_text(encoding="utf-8")) if path.is_file() else {}
+    exported = 0
+    for name in CACHE_DIRS:
+        before = set(known.get(name, []))
+        new = [f for f in _files(cache / name) if f not in before]
+        if new:
+            (dest / name).mkdir(parents=True, exist_ok=True)
+        for f in new:
+            shutil.copy2(cache / name / f, dest / name / f)
+        exported += len(new)
+    return exported
+
+
+def merge(cache, sources):
+    """Unisce alla cache i file di ``sources`` (cartelle con ``Tex/`` e ``texts/``)."""
+    return sum(_copy_new(Path(source) / name, cache / name)
+               for source in sources for name in CACHE_DIRS)
+
+
+def stats(cache):
+    """``{cartella: (file, byte)}`` della cache."""
+    result = {}
+    for name in CACHE_DIRS:
+        files = [cache / name / f for f in _files(cache / name)]
+        result[name] = (len(files), sum(f.stat().st_size for f in files))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache condivisa degli intermedi Tex/Text di Manim.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    commands = {
+        "link": sub.add_parser("link", help="collega Tex/ e texts/ delle discipline alla cache"),
+        "snapshot": sub.add_parser("snapshot", help="registra i file presenti nella cache"),
+        "export": sub.add_parser("export", help="copia i file aggiunti dopo lo snapshot"),
+        "merge": sub.add_parser("merge", help="unisce alla cache i file di altre cartelle"),
+        "stats": sub.add_parser("stats", help="numero di file e dimensione della cache"),
+    }
+    for p in commands.values():
+        p.add_argument("--cache", default=str(DEFAULT_CACHE),
+                       help=f"cartella della cache (default: {relative(DEFAULT_CACHE)})")
+    commands["export"].add_argument("dest", help="cartella di destinazione")
+    commands["merge"].add_argument("sources", nargs="+", help="cartelle da unire")
+    args = parser.parse_args(argv)
+
+    cache = ROOT / args.cache
+    if args.command == "link":
+        moved = link(cache)
+        print(f"Tex/Text collegati a {args.cache}" + (f" ({moved} file locali spostati)" if moved else ""))
+    elif args.command == "snapshot":
+        print(f"Cache {args.cache}: {snapshot(cache)} file")
+    elif args.command == "export":
+        print(f"File nuovi esportati in {args.dest}: {export(cache, ROOT / args.dest)}")
+    elif args.command == "merge":
+        print(f"File nuovi uniti a {args.cache}: {merge(cache, [ROOT / s for s in args.sources])}")
+    else:
+        for name, (count, size) in stats(cache).items():
+            print(f"  {name:<6} {count:>6} file  {format_size(size):>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
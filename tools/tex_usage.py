@@ -0,0 +1,421 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Tex Usage - LaTeX packages and fonts actually used by the animations
+
+The CI image used to install the whole Debian TeX Live (texlive-latex-extra,
+texlive-fonts-extra, texlive-science, ...), a multi-GB image pulled by every
+cold build job. This script finds what the animations really need:
+
+- formulas: every MathTex/Tex/SingleStringMathTex/Title/BulletedList string
+  in the `animations` tree (constants, f-strings with placeholder values,
+  names bound to constants or iterated from literal lists), plus the digits
+  typeset by DecimalNumber/Integer/Variable and by numbered axes;
+- LaTeX packages: Manim's default preamble (standalone, babel, amsmath,
+  amssymb) plus the packages of the macros and environments used in the
+  formulas and of any custom TexTemplate/add_to_preamble;
+- fonts: the families passed to Text/MarkupText/Paragraph (Pango, not TeX).
+
+`packages` maps them to TeX Live packages, written to
+docker/tex-packages.txt, which docker/Dockerfile.ci installs on a minimal
+TeX Live (scheme-infraonly + tlmgr). `verify`, run with the Python of the
+Manim virtualenv inside the image, compiles every formula found with
+Manim's own LaTeX pipeline and checks Manim's default preamble: the image is
+published only if every formula of the repo renders.
+
+Usage:
+    python3 tools/tex_usage.py                          # riepilogo
+    python3 tools/tex_usage.py packages --write         # aggiorna docker/tex-packages.txt
+    python3 tools/tex_usage.py packages --check         # exit 1 se non è aggiornato
+    /opt/manim-venv/bin/python tools/tex_usage.py verify
+"""
+
+import argparse
+import ast
+import re
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from common import ANIMATIONS_DIR, ROOT, relative
+
+PACKAGES_FILE = ROOT / "docker" / "tex-packages.txt"
+DOCKERFILE = ROOT / "docker" / "Dockerfile.ci"
+
+# Classi di Manim che compilano la stringa con LaTeX -> ambiente
+TEX_CLASSES = {
+    "MathTex": "align*",
+    "SingleStringMathTex": "align*",
+    "Tex": "center",
+    "Title": "center",
+    "BulletedList": "center",
+}
+# Classi che scrivono numeri con SingleStringMathTex, un carattere alla volta
+NUMBER_CLASSES = {"DecimalNumber", "Integer", "Variable"}
+NUMBER_CHARS = list("0123456789.-+")
+# Oggetti con numeri sugli assi solo se richiesto
+NUMBERED_OPTIONS = {"include_numbers", "numbers_to_include", "numbers_with_elongated_ticks"}
+NUMBERED_METHODS = {"add_coordinates", "add_numbers", "get_axis_labels", "get_graph_label"}
+TEXT_CLASSES = {"Text", "MarkupText", "Paragraph"}
+
+# Preambolo di default di Manim (TexTemplate): \documentclass[preview]{standalone}
+# con babel (english), amsmath e amssymb. `verify` controlla che sia ancora così.
+MANIM_PREAMBLE = ("standalone", "preview", "babel", "amsmath", "amssymb")
+
+# Pacchetti TeX Live sempre necessari: motore e conversione DVI -> SVG di Manim
+BASE_PACKAGES = ("latex-bin", "latex", "l3backend", "dvisvgm", "graphics", "tools",
+                 "xkeyval", "cm", "hyphen-english", "babel-english")
+
+# Pacchetto LaTeX -> pacchetto TeX Live (se il nome differisce)
+TEXLIVE_NAMES = {"amssymb": "amsfonts", "mathrsfs": "jknapltx", "dsfont": "doublestroke",
+                 "bbm": "bbm-macros"}
+
+# Macro ed ambienti fuori dal nucleo di LaTeX e dal preambolo di default
+MACRO_PACKAGES = {
+    "cancel": "cancel", "bcancel": "cancel", "xcancel": "cancel", "cancelto": "cancel",
+    "SI": "siunitx", "si": "siunitx", "num": "siunitx", "ang": "siunitx", "unit": "siunitx",
+    "qty": "siunitx",
+    "degree": "gensymb", "celsius": "gensymb", "ohm": "gensymb", "micro": "gensymb",
+    "mathscr": "mathrsfs", "mathds": "dsfont", "mathbbm": "bbm", "bm": "bm",
+    "ce": "mhchem", "pu": "mhchem",
+    "dv": "physics", "pdv": "physics", "abs": "physics", "norm": "physics",
+    "textcolor": "xcolor", "colorbox": "xcolor", "color": "xcolor",
+    "mathclap": "mathtools", "coloneqq": "mathtools", "xleftrightarrow": "mathtools",
+    "tcboxmath": "tcolorbox", "uline": "ulem", "sout": "ulem",
+}
+ENV_PACKAGES = {"CD": "amscd", "tabularx": "tabularx", "tikzpicture": "pgf"}
+
+# Famiglia di font (Pango) -> pacchetto Debian; "" = font di default di Pango
+FONT_PACKAGES = {"": "fonts-dejavu-core", "DejaVu Sans": "fonts-dejavu-core",
+                 "sans-serif": "fonts-dejavu-core", "serif": "fonts-dejavu-core",
+                 "monospace": "fonts-dejavu-core", "Liberation Sans": "fonts-liberation",
+                 "Noto Sans": "fonts-noto-core"}
+
+PLACEHOLDER = "1"
+USEPACKAGE = re.compile(r"\\usepackage\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}")
+DOCUMENTCLASS = re.compile(r"\\documentclass\s*(?:\[([^\]]*)\])?\s*\{([^}]+)\}")
+MACRO = re.compile(r"\\([A-Za-z]+)")
+BEGIN = re.compile(r"\\begin\{([A-Za-z*]+)\}")
+
+
+@dataclass(frozen=True)
+class Formula:
+    expression: str
+    environment: str
+    source: str
+    line: int
+
+
+def _call_name(node):
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _string_values(node, bindings):
+    """
+    Valori possibili di ``node`` come stringa: costanti, f-string (con
+    ``PLACEHOLDER`` al posto delle parti variabili) e nomi legati a costanti.
+    Lista vuota se non è ricavabile.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.JoinedStr):
+        return ["".join(part.value if isinstance(part, ast.Constant) else PLACEHOLDER
+                        for part in node.values)]
+    if isinstance(node, ast.Name):
+        return bindings.get(node.id, [])
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _string_values(node.left, bindings), _string_values(node.right, bindings)
+        return [a + b for a in left for b in right]
+    return []
+
+
+def _bind(target, value, bindings):
+    """Registra in ``bindings`` i valori stringa assegnati a ``target``."""
+    if isinstance(target, ast.Name):
+        values = _string_values(value, bindings)
+        if values:
+            bindings.setdefault(target.id, []).extend(values)
+    elif isinstance(target, (ast.Tuple, ast.List)) and isinstance(value, (ast.Tuple, ast.List)):
+        for t, v in zip(target.elts, value.elts):
+            _bind(t, v, bindings)
+
+
+def _collect_bindings(nodes, bindings=None):
+    """
+    Nomi legati a stringhe note in ``nodes``: ``x = "..."`` e ``for x in [...]``
+    (anche con tuple). Approssimato ma sufficiente per trovare le formule
+    costruite in cicli.
+    """
+    bindings = {k: list(v) for k, v in (bindings or {}).items()}
+    for root in nodes:
+        for node in ast.walk(root):
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    _bind(target, node.value, bindings)
+            elif isinstance(node, (ast.For, ast.comprehension)) and isinstance(node.iter, (ast.List, ast.Tuple)):
+                for item in node.iter.elts:
+                    _bind(node.target, item, bindings)
+    return bindings
+
+
+def _scopes(tree):
+    """
+    ``(nodo, bindings)`` per ogni funzione di primo livello o metodo, con i
+    nomi del modulo più quelli della funzione, e infine per il modulo: lo
+    stesso nome riusato in scene diverse non mescola formule e testi.
+    """
+    functions, module_level = [], []
+    for stmt in tree.body:
+        body = stmt.body if isinstance(stmt, ast.ClassDef) else [stmt]
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                functions.append(node)
+            else:
+                module_level.append(node)
+    module = _collect_bindings(module_level)
+    return [(f, _collect_bindings([f], module)) for f in functions] + [(tree, module)]
+
+
+def _numbered(keywords):
+    """True se le opzioni chiedono numeri sugli assi (anche dentro ``axis_config``)."""
+    options = dict(keywords)
+    for value in keywords.values():
+        if isinstance(value, ast.Dict):
+            options.update({k.value: v for k, v in zip(value.keys, value.values)
+                            if isinstance(k, ast.Constant)})
+    return any(not (isinstance(v, ast.Constant) and not v.value)
+               for k, v in options.items() if k in NUMBERED_OPTIONS)
+
+
+def scan_file(path):
+    """
+    Formule, font e preamboli personalizzati di un file.
+
+    Returns:
+    --------
+    tuple
+        ``(formule, font, preamboli, irrisolte)``: lista di ``Formula``, insieme
+        di famiglie, lista di frammenti di preambolo, lista di ``file:riga``
+        delle formule non ricavabili staticamente
+    """
+    source = relative(path)
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    formulas, fonts, preambles, unresolved = [], set(), [], []
+    numbers = False
+    seen = set()
+    for scope, bindings in _scopes(tree):
+        for node in ast.walk(scope):
+            if not isinstance(node, ast.Call) or id(node) in seen:
+                continue
+            seen.add(id(node))
+            name = _call_name(node)
+            keywords = {k.arg: k.value for k in node.keywords if k.arg}
+            if name in TEX_CLASSES and node.args:
+                parts = [_string_values(arg, bindings) for arg in node.args]
+                if not all(parts) or any(isinstance(a, ast.Starred) for a in node.args):
+                    unresolved.append(f"{source}:{node.lineno}")
+                    continue
+                environment = TEX_CLASSES[name]
+                if "tex_environment" in keywords:
+                    environment = (_string_values(keywords["tex_environment"], bindings)
+                                   or [environment])[0]
+                # MathTex unisce le sottostringhe con uno spazio; un'alternativa per valore
+                expressions = [""]
+                for values in parts:
+                    expressions = [f"{e} {v}".strip() for e in expressions for v in values]
+                formulas += [Formula(e, environment, source, node.lineno) for e in expressions]
+            elif name in NUMBER_CLASSES or name in NUMBERED_METHODS:
+                numbers = True
+            elif name in TEXT_CLASSES:
+                fonts.update(_string_values(keywords["font"], bindings) if "font" in keywords else [""])
+            elif name == "add_to_preamble" and node.args:
+                preambles += _string_values(node.args[0], bindings)
+            elif name == "TexTemplate" and "preamble" in keywords:
+                preambles += _string_values(keywords["preamble"], bindings)
+            numbers = numbers or _numbered(keywords)
+    if numbers:
+        formulas += [Formula(c, "align*", source, 0) for c in NUMBER_CHARS]
+    return formulas, fonts, preambles, unresolved
+
+
+def scan(root=ANIMATIONS_DIR):
+    """``scan_file`` su tutti i file Python di ``root``, risultati uniti."""
+    formulas, fonts, preambles, unresolved = [], set(), [], []
+    for path in sorted(root.rglob("*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        f, fo, p, u = scan_file(path)
+        formulas += f
+        fonts |= fo
+        preambles += p
+        unresolved += u
+    return formulas, fonts, preambles, unresolved
+
+
+def latex_packages(formulas, preambles=()):
+    """Pacchetti LaTeX necessari: preambolo di default, macro, ambienti e preamboli."""
+    packages = set(MANIM_PREAMBLE)
+    for formula in formulas:
+        packages.update(MACRO_PACKAGES[m] for m in MACRO.findall(formula.expression)
+                        if m in MACRO_PACKAGES)
+        packages.update(ENV_PACKAGES[e] for e in BEGIN.findall(formula.expression)
+                        if e in ENV_PACKAGES)
+    for preamble in preambles:
+        for names in USEPACKAGE.findall(preamble):
+            packages.update(n.strip() for n in names.split(","))
+    return packages
+
+
+def texlive_packages(packages):
+    """Pacchetti TeX Live (nomi di tlmgr) per i pacchetti LaTeX ``packages``."""
+    return sorted(set(BASE_PACKAGES) | {TEXLIVE_NAMES.get(p, p) for p in packages})
+
+
+def font_packages(fonts):
+    """``(pacchetti Debian, famiglie senza pacchetto noto)``."""
+    known = {FONT_PACKAGES[f] for f in fonts if f in FONT_PACKAGES}
+    return sorted(known), sorted(f for f in fonts if f not in FONT_PACKAGES)
+
+
+def render_packages_file(texlive):
+    header = ("# Pacchetti TeX Live installati nell'immagine CI (docker/Dockerfile.ci).\n"
+              "# Generato da tools/tex_usage.py packages --write: non modificare a mano.\n")
+    return header + "".join(f"{p}\n" for p in texlive)
+
+
+def read_packages_file(path=PACKAGES_FILE):
+    if not path.is_file():
+        return []
+    return [line.strip() for line in path.read_text(encoding="utf-8").splitlines()
+            if line.strip() and not line.startswith("#")]
+
+
+# ----------------------------------------------------------------------------
+# Verifica (Python del virtualenv di Manim, dentro l'immagine)
+# ----------------------------------------------------------------------------
+
+def verify(formulas, jobs=None):
+    """
+    Compila ogni formula con la pipeline LaTeX di Manim (LaTeX + dvisvgm).
+
+    Returns:
+    --------
+    list of str
+        Errori (vuota se tutto compila e il preambolo di default è quello atteso)
+    """
+    from manim import TexTemplate, config, tempconfig
+    from manim.utils.tex_file_writing import tex_to_svg_file
+
+    errors = []
+    template = TexTemplate()
+    used = set()
+    for names in USEPACKAGE.findall(template.preamble):
+        used.update(n.strip() for n in names.split(","))
+    match = DOCUMENTCLASS.search(getattr(template, "documentclass", ""))
+    if match:
+        used.add(match.group(2))
+        if "preview" in (match.group(1) or ""):
+            used.add("preview")
+    missing = used - set(MANIM_PREAMBLE)
+    if missing:
+        errors.append(f"preambolo di default di Manim cambiato: {', '.join(sorted(missing))} "
+                      "non in MANIM_PREAMBLE")
+
+    unique = {}
+    for formula in formulas:
+        unique.setdefault((formula.expression, formula.environment), formula)
+
+    def compile_one(item):
+        (expression, environment), formula = item
+        try:
+            tex_to_svg_file(expression, environment=environment, tex_template=template)
+        except Exception as exc:  # noqa: BLE001 - si riporta qualunque errore di LaTeX
+            where = f"{formula.source}:{formula.line}" if formula.line else formula.source
+            return f"{where}: {expression!r} ({environment}): {str(exc).strip().splitlines()[-1:]}"
+        return None
+
+    with tempfile.TemporaryDirectory(prefix="tex-verify-") as media_dir:
+        with tempconfig({"media_dir": media_dir, "verbosity": "ERROR"}):
+            config.tex_dir = str(Path(media_dir) / "Tex")
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                errors += [e for e in pool.map(compile_one, sorted(unique.items())) if e]
+    print(f"Formule compilate: {len(unique)}, errori: {len(errors)}")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pacchetti LaTeX e font usati dalle animazioni.")
+    sub = parser.add_subparsers(dest="command")
+    p_packages = sub.add_parser("packages", help="pacchetti TeX Live per l'immagine CI")
+    p_packages.add_argument("--write", action="store_true", help=f"scrive {relative(PACKAGES_FILE)}")
+    p_packages.add_argument("--check", action="store_true",
+                            help=f"exit 1 se {relative(PACKAGES_FILE)} o il Dockerfile non sono aggiornati")
+    p_verify = sub.add_parser("verify", help="compila ogni formula (Python del virtualenv di Manim)")
+    p_verify.add_argument("--jobs", type=int, default=None, help="compilazioni in parallelo")
+    args = parser.parse_args(argv)
+
+    formulas, fonts, preambles, unresolved = scan()
+    texlive = texlive_packages(latex_packages(formulas, preambles))
+    debian_fonts, unknown_fonts = font_packages(fonts)
+
+    if args.command == "verify":
+        errors = verify(formulas, args.jobs)
+        for error in errors:
+            print(f"  ✗ {error}")
+        return 1 if errors else 0
+
+    if args.command == "packages":
+        if args.write:
+            PACKAGES_FILE.write_text(render_packages_file(texlive), encoding="utf-8")
+            print(f"Scritto {relative(PACKAGES_FILE)}: {len(texlive)} pacchetti")
+        elif args.check:
+            problems = [f"pacchetto TeX Live mancante in {relative(PACKAGES_FILE)}: {p}"
+                        for p in sorted(set(texlive) - set(read_packages_file()))]
+            dockerfile = DOCKERFILE.read_text(encoding="utf-8") if DOCKERFILE.is_file() else ""
+            problems += [f"font mancante in {relative(DOCKERFILE)}: {p}"
+                         for p in debian_fonts if p not in dockerfile]
+            for problem in problems:
+                print(f"✗ {problem}")
+            if problems:
+                print("Aggiorna con: python3 tools/tex_usage.py packages --write")
+                return 1
+            print(f"{relative(PACKAGES_FILE)} aggiornato ({len(texlive)} pacchetti)")
+        else:
+            print("\n".join(texlive))
+        return 0
+
+    unique = {(f.expression, f.environment) for f in formulas}
+    print(f"Formule: {len(unique)} distinte ({len(formulas)} occorrenze)")
+    if unresolved:
+        print(f"Formule non ricavabili staticamente: {len(unresolved)} "
+              "(coperte dai render, non dalla verifica)")
+    print(f"Pacchetti LaTeX: {', '.join(sorted(latex_packages(formulas, preambles)))}")
+    print(f"Pacchetti TeX Live: {' '.join(texlive)}")
+    print(f"Font (Pango): {', '.join(sorted(f or '(default)' for f in fonts)) or '-'} "
+          f"-> {' '.join(debian_fonts) or '-'}")
+    if unknown_fonts:
+        print(f"Font senza pacchetto noto (aggiungi a FONT_PACKAGES): {', '.join(unknown_fonts)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
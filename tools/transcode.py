@@ -0,0 +1,195 @@
+# Copyright 2025–2026 Guglielmo Celata
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Transcode - Derive lower qualities from one top-quality render
+
+Rendering ql, qm, qh and qk separately repeats construction, LaTeX and
+rasterization four times. This script takes the videos of one rendered
+quality (e.g. qh, 1920p60) and produces the lower ones with ffmpeg:
+lanczos downscale to the target resolution and frame decimation to the
+target fps (60 -> 30 -> 15, exact divisors), encoded with the same H.264
+settings Manim uses. The ffmpeg processes run in parallel.
+
+A derived video is recorded in the build database of its quality with the
+fingerprint of the source scene (plus "derived_from" and the ffmpeg time as
+"transcode_seconds"; "seconds" stays the render time, unknown here), so
+`make <topic>` at that quality considers it up to date. Only scenes whose source fingerprint
+changed are transcoded again.
+
+Usage:
+    python3 tools/transcode.py --from qh --to qm ql
+    python3 tools/transcode.py gas_perfetto --from qk --to qh qm ql
+"""
+
+import argparse
+import functools
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from build_scenes import load_db, mark_incomplete, record_scene, save_db, stale_scenes, video_path
+from common import QUALITIES, discover_topics, find_topic, run_parallel
+from fingerprint import topic_fingerprints
+
+# Ordine della scala, dalla qualità più alta alla più bassa
+LADDER = ("qk", "qh", "qm", "ql")
+
+
+def _size(quality):
+    width, height = (int(v) for v in QUALITIES[quality]["resolution"].split(","))
+    return width, height
+
+
+def check_ladder(source, targets):
+    """Verifica che ogni qualità di ``targets`` si ottenga da ``source`` senza ingrandire."""
+    sw, sh = _size(source)
+    sfps = QUALITIES[source]["fps"]
+    for target in targets:
+        tw, th = _size(target)
+        tfps = QUALITIES[target]["fps"]
+        if tw > sw or th > sh or tfps > sfps or sfps % tfps:
+            raise SystemExit(
+                f"Errore: {target} ({QUALITIES[target]['dir']}) non si ricava da "
+                f"{source} ({QUALITIES[source]['dir']}): serve una sorgente più grande"
+            )
+
+
+def ffmpeg_command(source_video, target_video, quality, ffmpeg="ffmpeg", threads=2):
+    """
+    Riga di comando ffmpeg per ridurre ``source_video`` alla qualità ``quality``.
+
+    ``fps=`` scarta i frame in eccesso (decimazione esatta, nessuna
+    interpolazione); la codifica è H.264 yuv420p come quella di Manim.
+    """
+    width, height = _size(quality)
+    return [
+        ffmpeg, "-y", "-loglevel", "error", "-i", str(source_video),
+        "-vf", f"fps={QUALITIES[quality]['fps']},scale={width}:{height}:flags=lanczos",
+        "-c:v", "libx264", "-preset", "medium", "-crf", "18", "-pix_fmt", "yuv420p",
+        "-threads", str(threads), "-an", "-movflags", "+faststart",
+        str(target_video),
+    ]
+
+
+def _transcode(job, ffmpeg, threads):
+    topic, scene, source, target = job
+    src = video_path(topic, source, scene)
+    dst = video_path(topic, target, scene)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.stem}.tmp{dst.suffix}")
+    start = time.time()
+    result = subprocess.run(ffmpeg_command(src, tmp, target, ffmpeg, threads),
+                            capture_output=True, text=True)
+    seconds = round(time.time() - start, 2)
+    if result.returncode != 0 or not tmp.is_file():
+        tmp.unlink(missing_ok=True)
+        return job, None, result.stderr.strip()
+    os.replace(tmp, dst)
+    return job, seconds, ""
+
+
+def _transcoded(fingerprints, job, seconds):
+    """Registra un video ricavato nel database della sua qualità."""
+    topic, scene, source, target = job
+    db = load_db(topic, target)
+    # "seconds" è il tempo di render (usato per stimare i job):
+    # quello di ffmpeg si registra a parte
+    record_scene(db, scene, fingerprints[topic.path][scene], None,
+                 derived_from=source, transcode_seconds=seconds)
+    save_db(topic, target, db)
+    return f"({seconds}s)"
+
+
+def derive(topics, source, targets, jobs_count=None, ffmpeg="ffmpeg", force=False):
+    """
+    Produce le qualità ``targets`` dai video già renderizzati a qualità ``source``.
+
+    Parameters:
+    -----------
+    topics : list of Topic
+        Argomenti da elaborare
+    source : str
+        Qualità renderizzata (es. ``qh``)
+    targets : list of str
+        Qualità da ricavare (più basse di ``source``)
+    jobs_count : int
+        Processi ffmpeg in parallelo (default: metà dei core, 2 thread ciascuno)
+    ffmpeg : str
+        Eseguibile di ffmpeg
+    force : bool
+        Ricava anche le scene già aggiornate
+
+    Returns:
+    --------
+    bool
+        True se tutte le trasformazioni sono riuscite
+    """
+    check_ladder(source, targets)
+    if shutil.which(ffmpeg) is None:
+        raise SystemExit(f"Errore: {ffmpeg} non trovato (serve per ricavare le qualità)")
+
+    work, fingerprints, skipped = [], {}, []
+    for topic in topics:
+        fps = topic_fingerprints(topic)
+        fingerprints[topic.path] = fps
+        src_db = load_db(topic, source)
+        # Solo scene con sorgente aggiornata: altrimenti si ricaverebbe un video vecchio
+        fresh = [s for s in fps if s not in stale_scenes(topic, source, src_db, fps)]
+        skipped += [f"{topic.path}:{s}" for s in fps if s not in fresh]
+        for target in targets:
+            stale = set(stale_scenes(topic, target, load_db(topic, target), fps, force=force))
+            work += [(topic, scene, source, target) for scene in fresh if scene in stale]
+
+    print(f"{len(work)} video da ricavare da {source} "
+          f"({QUALITIES[source]['dir']} -> {', '.join(QUALITIES[t]['dir'] for t in targets)})")
+    if skipped:
+        print(f"  {len(skipped)} scene senza video {source} aggiornato (da renderizzare prima)")
+
+    workers = jobs_count or max((os.cpu_count() or 2) // 2, 1)
+    ok = run_parallel(work, lambda job: _transcode(job, ffmpeg, 2), workers,
+                      lambda job: f"{job[0].path}:{job[1]} -> {job[3]}",
+                      functools.partial(_transcoded, fingerprints))
+
+    for topic in topics:
+        for target in targets:
+            mark_incomplete(topic, target, load_db(topic, target), fingerprints[topic.path])
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ricava le qualità più basse da un unico render (ffmpeg in parallelo)."
+    )
+    parser.add_argument("topics", nargs="*", help="argomenti (default: tutti)")
+    parser.add_argument("--from", dest="source", required=True, choices=LADDER,
+                        help="qualità renderizzata da cui partire")
+    parser.add_argument("--to", dest="targets", nargs="+", required=True, choices=LADDER,
+                        help="qualità da ricavare")
+    parser.add_argument("--jobs", type=int, default=None, help="processi ffmpeg in parallelo")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="eseguibile di ffmpeg")
+    parser.add_argument("--force", action="store_true", help="ricava anche i video aggiornati")
+    args = parser.parse_args(argv)
+
+    topics = [find_topic(t) for t in args.topics] if args.topics else discover_topics()
+    targets = [t for t in args.targets if t != args.source]
+    ok = derive(topics, args.source, targets, jobs_count=args.jobs, ffmpeg=args.ffmpeg,
+                force=args.force)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())